@@ -9,6 +9,8 @@ sys.path.append(str(ROOT_DIR))
 
 # Import project modules
 from src.config.settings import APP_CONFIG
+from src.core.health import start_health_monitor
+from src.core.metrics import start_metrics_server
 from src.ui.main_page import render_main_page
 from src.ui.sidebar import render_sidebar
 from src.utils.helpers import load_css
@@ -24,6 +26,11 @@ def main():
             initial_sidebar_state=APP_CONFIG["initial_sidebar_state"]
         )
 
+        # Expose /metrics for local scraping (no-op unless METRICS_PORT is set)
+        start_metrics_server()
+        # Probe backend health in the background (metadata calls, not billed)
+        start_health_monitor()
+
         # Load custom CSS
         css_path = ROOT_DIR / 'src' / 'assets' / 'styles.css'
         if css_path.exists():
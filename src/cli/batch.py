@@ -0,0 +1,244 @@
+"""
+Headless batch generation: one resume against many job descriptions.
+
+The resume is extracted once. Cover letters and analyses for every job
+description then run concurrently through the shared async client, with a
+bounded number of workers. Each finished job is written to the output
+directory immediately and recorded in a manifest, so an interrupted run
+picks up where it stopped when the same command is run again.
+
+Usage:
+    python -m src.cli.batch resume.pdf jobs/ --out results/ --workers 4
+    python -m src.cli.batch resume.docx jobs.jsonl --out results/ --tasks cover_letter
+
+Job descriptions are either a directory of .txt/.md files (one posting per
+file, named by file stem) or a JSONL file with one object per line:
+    {"id": "acme-backend", "job_description": "...", "additional_info": {...}}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..config.settings import BATCH_CONFIG
+from ..core.cache import make_cache_key
+from ..core.ledger import get_usage_ledger
+from ..core.llm_client import GeminiClient, get_gemini_client
+from ..service.file_processor import FileProcessor
+from ..utils.validators import validate_inputs
+
+TASKS = ("cover_letter", "analysis")
+JOB_FILE_SUFFIXES = (".txt", ".md")
+_UNSAFE_ID = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+@dataclass
+class BatchJob:
+    """One job description to process."""
+    job_id: str
+    job_description: str
+    additional_info: Dict = field(default_factory=dict)
+
+
+def _safe_id(value: str) -> str:
+    return _UNSAFE_ID.sub("_", value).strip("._") or "job"
+
+
+def _unique_ids(jobs: List[BatchJob]) -> List[BatchJob]:
+    seen: Dict[str, int] = {}
+    for job in jobs:
+        count = seen.get(job.job_id, 0)
+        seen[job.job_id] = count + 1
+        if count:
+            job.job_id = f"{job.job_id}-{count + 1}"
+    return jobs
+
+
+def load_jobs(source: Path) -> List[BatchJob]:
+    """
+    Load job descriptions from a directory or a JSONL file.
+
+    Args:
+        source (Path): Directory of .txt/.md files, or a .jsonl file
+
+    Returns:
+        List[BatchJob]: Jobs in a stable order with unique, filesystem-safe ids
+    """
+    jobs = []
+    if source.is_dir():
+        for path in sorted(source.iterdir()):
+            if path.suffix.lower() in JOB_FILE_SUFFIXES and path.is_file():
+                jobs.append(BatchJob(_safe_id(path.stem), path.read_text(encoding="utf-8")))
+    else:
+        with open(source, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text = record.get("job_description") or record.get("text") or ""
+                job_id = str(record.get("id") or f"job-{line_number:04d}")
+                jobs.append(BatchJob(_safe_id(job_id), text, record.get("additional_info") or {}))
+    return _unique_ids(jobs)
+
+
+def extract_resume(path: Path) -> str:
+    """Extract resume text once, with the same extractor the app uses."""
+    if path.suffix.lower() in JOB_FILE_SUFFIXES:
+        return path.read_text(encoding="utf-8").strip()
+    with open(path, "rb") as f:
+        return FileProcessor().extract_text(f)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class BatchRunner:
+    """Run every (job, task) pair with bounded concurrency, checkpointing per job."""
+
+    def __init__(self, resume: str, out_dir: Path, tasks: Iterable[str] = TASKS,
+                 workers: Optional[int] = None, client: Optional[GeminiClient] = None,
+                 stream=sys.stderr):
+        self.resume = resume
+        self.resume_hash = make_cache_key(resume)
+        self.out_dir = out_dir
+        self.tasks = tuple(tasks)
+        self.workers = workers or BATCH_CONFIG["workers"]
+        self.client = client or get_gemini_client()
+        self.manifest_path = out_dir / BATCH_CONFIG["manifest_name"]
+        self.stream = stream
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self.total = 0
+        self._started = time.perf_counter()
+
+    def completed_ids(self) -> Set[str]:
+        """Jobs already finished for this resume and task set in an earlier run."""
+        done = set()
+        if not self.manifest_path.exists():
+            return done
+        with open(self.manifest_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted write
+                    continue
+                if (record.get("status") == "done" and record.get("resume_hash") == self.resume_hash
+                        and set(self.tasks) <= set(record.get("tasks", {}))):
+                    done.add(record["job_id"])
+        return done
+
+    def _record(self, record: Dict) -> None:
+        with open(self.manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _progress(self) -> None:
+        finished = sum(self.counts.values())
+        elapsed = time.perf_counter() - self._started
+        self.stream.write(
+            f"\r[{finished}/{self.total}] done={self.counts['done']} failed={self.counts['failed']} "
+            f"skipped={self.counts['skipped']} elapsed={elapsed:.0f}s"
+        )
+        self.stream.flush()
+
+    async def _generate(self, task: str, job: BatchJob) -> Optional[str]:
+        if task == "cover_letter":
+            prompt = self.client.cover_letter_prompt(self.resume, job.job_description, job.additional_info)
+        else:
+            prompt = self.client.analysis_prompt(self.resume, job.job_description)
+        return await self.client.agenerate_content(prompt, task=task, report_errors=False, session="batch")
+
+    async def _run_job(self, job: BatchJob, slots: asyncio.Semaphore) -> None:
+        async with slots:
+            started = time.perf_counter()
+            record = {"job_id": job.job_id, "resume_hash": self.resume_hash, "tasks": {}}
+            is_valid, error_message = validate_inputs(self.resume, job.job_description)
+            if not is_valid:
+                record.update(status="failed", error=error_message)
+            else:
+                results = await asyncio.gather(*(self._generate(task, job) for task in self.tasks))
+                job_dir = self.out_dir / job.job_id
+                job_dir.mkdir(parents=True, exist_ok=True)
+                failed = []
+                for task, text in zip(self.tasks, results):
+                    if text:
+                        _write_atomic(job_dir / f"{task}.md", text)
+                        record["tasks"][task] = f"{job.job_id}/{task}.md"
+                    else:
+                        failed.append(task)
+                record["status"] = "failed" if failed else "done"
+                if failed:
+                    record["error"] = f"generation failed for: {', '.join(failed)}"
+            record["seconds"] = round(time.perf_counter() - started, 2)
+            self._record(record)
+            self.counts["done" if record["status"] == "done" else "failed"] += 1
+            self._progress()
+
+    async def run(self, jobs: List[BatchJob]) -> Dict[str, int]:
+        """
+        Process jobs, skipping those completed by an earlier run.
+
+        Args:
+            jobs (List[BatchJob]): Jobs to process
+
+        Returns:
+            Dict[str, int]: Counts of done, failed and skipped jobs
+        """
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        completed = self.completed_ids()
+        self.total = len(jobs)
+        pending = [job for job in jobs if job.job_id not in completed]
+        self.counts["skipped"] = self.total - len(pending)
+        self._progress()
+
+        slots = asyncio.Semaphore(self.workers)
+        await asyncio.gather(*(self._run_job(job, slots) for job in pending))
+        self.stream.write("\n")
+        return dict(self.counts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate cover letters and analyses for many job descriptions")
+    parser.add_argument("resume", type=Path, help="Resume file (.pdf, .docx or .txt)")
+    parser.add_argument("jobs", type=Path, help="Directory of .txt/.md job descriptions, or a .jsonl file")
+    parser.add_argument("--out", type=Path, default=Path("batch_output"), help="Output directory")
+    parser.add_argument("--workers", type=int, default=BATCH_CONFIG["workers"],
+                        help="Job descriptions processed concurrently")
+    parser.add_argument("--tasks", default=",".join(TASKS),
+                        help=f"Comma-separated subset of: {', '.join(TASKS)}")
+    args = parser.parse_args(argv)
+
+    tasks = [task.strip() for task in args.tasks.split(",") if task.strip()]
+    unknown = set(tasks) - set(TASKS)
+    if unknown or not tasks:
+        parser.error(f"unknown tasks: {', '.join(sorted(unknown)) or '(none given)'}")
+
+    resume = extract_resume(args.resume)
+    jobs = load_jobs(args.jobs)
+    print(f"Resume: {len(resume)} characters · {len(jobs)} job descriptions · {args.workers} workers",
+          file=sys.stderr)
+
+    runner = BatchRunner(resume, args.out, tasks, args.workers)
+    try:
+        counts = asyncio.run(runner.run(jobs))
+    except KeyboardInterrupt:
+        print("\nInterrupted. Run the same command again to resume.", file=sys.stderr)
+        return 130
+    get_usage_ledger().dump_csv(str(args.out / "usage.csv"), session="batch")
+    print(f"Results in {args.out} · manifest: {runner.manifest_path}", file=sys.stderr)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""
+Headless bulk ingestion: extract and parse many resumes into JSONL.
+
+Files are extracted on a process pool (see src.service.ingestion) and each
+normalized document is written as one JSON line as soon as it finishes, with
+its timings, so output can be consumed while the run is still going. Files
+that fail are written as error records and the run continues.
+
+Usage:
+    python -m src.cli.ingest resumes/ --out documents.jsonl --workers 8
+    find archive -name '*.pdf' | python -m src.cli.ingest - > documents.jsonl
+
+Each line holds: index, name, source, status ("ok" or "error"), error,
+bytes, chars, seconds, timings (read/extract/normalize/parse), text and
+document (contact, sections, summary, experience, education, skills).
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+from ..config.settings import INGEST_CONFIG
+from ..service.ingestion import BulkIngestor, iter_paths
+
+
+def _inputs(values: List[str]) -> Iterator[str]:
+    for value in values:
+        if value == "-":
+            for line in sys.stdin:
+                if line.strip():
+                    yield line.strip()
+        else:
+            yield value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract and parse many resumes into JSONL")
+    parser.add_argument("inputs", nargs="+",
+                        help="Resume files or directories (.pdf/.docx); '-' reads paths from stdin")
+    parser.add_argument("--out", type=Path, help="JSONL output file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=INGEST_CONFIG["workers"],
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--no-recursive", action="store_true", help="Do not descend into subdirectories")
+    parser.add_argument("--no-text", action="store_true", help="Omit the full extracted text from each record")
+    args = parser.parse_args(argv)
+
+    ingestor = BulkIngestor(args.workers)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    started = time.perf_counter()
+    print(f"Ingesting with {ingestor.workers} workers", file=sys.stderr)
+    try:
+        for record in ingestor.ingest(iter_paths(_inputs(args.inputs), recursive=not args.no_recursive)):
+            if args.no_text:
+                record.pop("text", None)
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            finished = ingestor.counts["ok"] + ingestor.counts["error"]
+            sys.stderr.write(
+                f"\r[{finished}] ok={ingestor.counts['ok']} failed={ingestor.counts['error']} "
+                f"elapsed={time.perf_counter() - started:.0f}s"
+            )
+            sys.stderr.flush()
+    except KeyboardInterrupt:
+        print("\nInterrupted.", file=sys.stderr)
+        return 130
+    finally:
+        if args.out:
+            out.close()
+    sys.stderr.write("\n")
+    return 1 if ingestor.counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,6 +20,59 @@ APP_CONFIG = {
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GEMINI_MODEL = "gemini-2.5-pro"
 
+# Model tiers: "fast" for extraction and short tips, "heavy" for long-form work
+MODEL_TIERS = {
+    "fast": os.getenv("GEMINI_FAST_MODEL", "gemini-2.5-flash"),
+    "heavy": os.getenv("GEMINI_HEAVY_MODEL", GEMINI_MODEL)
+}
+
+# Task -> model tier. Override with LLM_MODEL_ROUTES="extract_skills=heavy,analysis=fast"
+MODEL_ROUTING = {
+    "default": "heavy",
+    "cover_letter": "heavy",
+    "analysis": "heavy",
+    "fused_analysis": "heavy",
+    "customize_for_company": "heavy",
+    "improvement_priority": "heavy",
+    "match_score": "heavy",
+    "match_score_repair": "fast",
+    "keyword_suggestions": "fast",
+    "formatting_suggestions": "fast",
+    "quick_tips": "fast",
+    "extract_skills": "fast"
+}
+MODEL_ROUTING.update(
+    route.strip().split("=", 1)
+    for route in os.getenv("LLM_MODEL_ROUTES", "").split(",")
+    if "=" in route
+)
+
+# Retry a failed request once on the other tier
+MODEL_FALLBACK_ENABLED = os.getenv("LLM_MODEL_FALLBACK", "true").lower() == "true"
+
+# USD per million tokens, used to estimate cost (and savings from routing) in metrics
+MODEL_PRICING = {
+    "gemini-2.5-pro": {"prompt": 1.25, "cached": 0.31, "output": 10.0},
+    "gemini-2.5-flash": {"prompt": 0.30, "cached": 0.075, "output": 2.50}
+}
+
+# LLM Backend: "gemini", "stub" (in-process) or "http_stub" (src/core/stub_server.py)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+# Deterministic stub backend used for offline load tests and benchmarks
+STUB_BACKEND_CONFIG = {
+    "url": os.getenv("LLM_STUB_URL", "http://127.0.0.1:8765"),
+    "latency_distribution": "lognormal",  # fixed, uniform or lognormal
+    "latency_median_ms": float(os.getenv("LLM_STUB_LATENCY_MS", "800")),
+    "latency_sigma": 0.5,  # lognormal shape
+    "latency_spread_ms": 400,  # uniform half-width
+    "tokens_per_second": float(os.getenv("LLM_STUB_TOKENS_PER_SECOND", "50")),
+    "chunk_tokens": 8,
+    "output_tokens": 300,
+    "error_rate": float(os.getenv("LLM_STUB_ERROR_RATE", "0")),
+    "seed": 42
+}
+
 # File Processing Configuration
 SUPPORTED_FILE_TYPES = {
     "resume": ["pdf", "docx"],
@@ -33,6 +86,152 @@ PREVIEW_LENGTH = 500
 MAX_TOKENS = 4000
 TEMPERATURE = 0.7
 
+# Output token budgets for tasks that need more than MAX_TOKENS.
+# The fused analysis returns six sections in one JSON object.
+TASK_MAX_TOKENS = {
+    "fused_analysis": 12000,
+}
+
+# Prompt input budgets in estimated tokens, per task and field.
+# Oversized inputs are trimmed (whitespace, boilerplate, older experience) to fit.
+# The resume and job description are budgeted once under "shared_context": they
+# form a prefix shared by every task, which must be identical to be cacheable.
+PROMPT_TOKEN_BUDGETS = {
+    "default": {"resume": 2500, "job_description": 1500},
+    "shared_context": {"resume": 3000, "job_description": 1500},
+    "customize_for_company": {"base_cover_letter": 1200, "company_info": 1000}
+}
+
+# Provider-side context caching of the shared resume/job description prefix
+CONTEXT_CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CONTEXT_CACHE", "true").lower() == "true",
+    "ttl_seconds": int(os.getenv("LLM_CONTEXT_CACHE_TTL", "900")),
+    "refresh_margin_seconds": 30,  # don't hand out a handle this close to expiry
+    # Smallest prefix worth caching; Gemini rejects explicit caches below these sizes
+    "min_tokens": {"gemini-2.5-pro": 4096, "gemini-2.5-flash": 1024},
+    "default_min_tokens": 1024
+}
+
+# LLM Client Configuration
+LLM_CLIENT_CONFIG = {
+    "max_in_flight": int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+    "request_timeout": float(os.getenv("LLM_REQUEST_TIMEOUT", "120")),  # seconds per call, retries and backoff included
+    # How often a waiting UI request checks whether a rerun superseded it
+    "cancel_poll_interval": float(os.getenv("LLM_CANCEL_POLL_INTERVAL", "0.25"))  # seconds
+}
+
+# Resilience Configuration (retries, rate limiting, circuit breaker)
+RESILIENCE_CONFIG = {
+    "max_attempts": 4,
+    "base_delay": 1.0,  # seconds, doubled on each retry
+    "max_delay": 30.0,
+    "max_retry_after": 60.0,  # give up if the server asks us to wait longer
+    "requests_per_minute": int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60")),
+    "burst": 5,
+    "failure_threshold": 5,
+    "recovery_timeout": 30.0
+}
+
+# Hedged requests: resend a generation call, or a stream that has not opened
+# (time to first token), once it is slower than recent latency
+HEDGING_CONFIG = {
+    "enabled": os.getenv("LLM_HEDGING", "false").lower() == "true",
+    "percentile": float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),  # of recent latency, per task and tier (streams apart)
+    "min_samples": 20,  # latencies to observe before hedging a task
+    "window": 200,  # recent latencies kept per task and tier
+    "min_delay": 0.5,  # seconds; never hedge sooner than this
+    "max_hedge_ratio": float(os.getenv("LLM_MAX_HEDGE_RATIO", "0.1")),  # hedges per request, long-run cap
+    "burst": 2  # hedges that may be sent back to back
+}
+
+# Token budgets (prompt + output tokens); 0 disables a limit.
+# Past a soft budget requests use the fast tier; past a hard one only cached output is served.
+TOKEN_BUDGET_CONFIG = {
+    "session_soft_tokens": int(os.getenv("LLM_SESSION_SOFT_TOKENS", "150000")),
+    "session_hard_tokens": int(os.getenv("LLM_SESSION_HARD_TOKENS", "300000")),
+    "daily_soft_tokens": int(os.getenv("LLM_DAILY_SOFT_TOKENS", "0")),  # all sessions, per UTC day
+    "daily_hard_tokens": int(os.getenv("LLM_DAILY_HARD_TOKENS", "0")),
+    "soft_limit_tier": "fast",  # tier used once a soft budget is spent
+    "exempt_sessions": ["batch"],  # held to the daily budgets only
+    "session_idle_seconds": 6 * 60 * 60,  # drop a session's totals after this long without calls
+    "max_entries": 10000  # per-call records kept for export
+}
+
+# Metrics Configuration
+METRICS_CONFIG = {
+    # Serve /metrics (Prometheus text) and /metrics.json on this port; 0 disables
+    "exporter_port": int(os.getenv("METRICS_PORT", "0"))
+}
+
+# Backend health checks (metadata probes, never generation requests)
+HEALTH_CONFIG = {
+    "ttl_seconds": 60,  # reuse a probe result for this long
+    "interval_seconds": int(os.getenv("HEALTH_CHECK_INTERVAL", "60")),  # background probing; 0 disables
+    "probe_timeout": 10
+}
+
+# Response Cache Configuration
+CACHE_CONFIG = {
+    "enabled": os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+    "memory_max_entries": 256,
+    "disk_enabled": True,
+    "disk_dir": os.getenv("LLM_CACHE_DIR", ".cache/llm_responses"),
+    "disk_max_bytes": 50 * 1024 * 1024,  # 50MB
+    "ttl_seconds": 7 * 24 * 60 * 60  # 7 days, for both tiers
+}
+
+# PDF text extraction (python -m src.service.pdf_extraction file.pdf compares engines)
+PDF_EXTRACTION_CONFIG = {
+    "engine": os.getenv("PDF_ENGINE", "pypdf2"),  # "pypdf2" or "pypdf"
+    "workers": int(os.getenv("PDF_EXTRACT_WORKERS", "0")),  # process pool size; 0 or 1 is serial
+    "parallel_min_pages": 16,  # smaller documents are not worth the process hop
+    "pages_per_task": 8
+}
+
+# Uploaded documents are parsed in a child process (or on the PDF page pool) with these limits
+EXTRACTION_SANDBOX_CONFIG = {
+    "enabled": os.getenv("EXTRACTION_SANDBOX", "true").lower() == "true",
+    "cpu_seconds": int(os.getenv("EXTRACTION_CPU_SECONDS", "10")),
+    "memory_mb": int(os.getenv("EXTRACTION_MEMORY_MB", "1024")),  # address space, not resident memory
+    "timeout": 30  # wall-clock seconds
+}
+
+# Extracted resume text, keyed by a hash of the uploaded file's bytes.
+# The disk tier is off by default because resumes contain personal data.
+EXTRACTION_CACHE_CONFIG = {
+    "enabled": os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true",
+    "memory_max_entries": 64,
+    "disk_enabled": os.getenv("EXTRACTION_CACHE_DISK", "false").lower() == "true",
+    "disk_dir": os.getenv("EXTRACTION_CACHE_DIR", ".cache/extracted_text"),
+    "disk_max_bytes": 20 * 1024 * 1024,  # 20MB
+    "ttl_seconds": 24 * 60 * 60  # 1 day, for both tiers
+}
+
+# Near-duplicate job description detection (MinHash/LSH)
+SIMILARITY_CONFIG = {
+    "enabled": os.getenv("LLM_SIMILAR_JD_REUSE", "true").lower() == "true",
+    "threshold": float(os.getenv("LLM_SIMILAR_JD_THRESHOLD", "0.85")),  # estimated Jaccard similarity
+    "num_perm": 128,
+    "bands": 16,  # 16 bands x 8 rows: candidates from ~0.7 similarity up
+    "shingle_size": 3,  # words per shingle
+    "max_entries": 50000,
+    "max_entries_per_resume": 1000,  # least recently used postings dropped past this
+    "max_chars": 20_000_000  # job description text kept in the index
+}
+
+# Batch CLI (python -m src.cli.batch)
+BATCH_CONFIG = {
+    "workers": int(os.getenv("BATCH_WORKERS", "4")),  # job descriptions processed concurrently
+    "manifest_name": "manifest.jsonl"  # per-job checkpoint records in the output directory
+}
+
+# Bulk resume ingestion (python -m src.cli.ingest). Each file is processed in a
+# fork of its worker with the CPU and memory limits of EXTRACTION_SANDBOX_CONFIG.
+INGEST_CONFIG = {
+    "workers": int(os.getenv("INGEST_WORKERS", "0")),  # worker processes; 0 uses one per CPU
+    "pending_per_worker": 4  # files in flight per worker, which bounds memory on large corpora
+}
+
 # Export Configuration
 EXPORT_FORMATS = ["docx", "pdf", "txt"]
 
@@ -46,11 +245,20 @@ COLORS = {
     "info": "#17a2b8"
 }
 
+# Text normalization applied to extracted resumes and pasted input (see src/utils/normalization.py)
+NORMALIZATION_CONFIG = {
+    "stages": [
+        stage.strip() for stage in os.getenv("TEXT_NORMALIZATION_STAGES", "control,html,bullets,whitespace").split(",")
+        if stage.strip()
+    ],
+    "bullet": "- "  # replacement for bullet glyphs at the start of a line
+}
+
 # Validation Rules
 VALIDATION_RULES = {
     "min_resume_length": 100,
     "min_job_description_length": 50,
-    "max_input_length": 10000
+    "max_input_length": 50000  # hard cap; prompts are fitted to PROMPT_TOKEN_BUDGETS
 }
 
 # Feature Flags
@@ -59,5 +267,14 @@ FEATURES = {
     "docx_export": True,
     "resume_analysis": True,
     "cover_letter_generation": True,
-    "file_upload": True
+    "file_upload": True,
+    "speculative_prefetch": True  # offer the opt-in background prefetch in the sidebar
+}
+
+# Speculative prefetch of the cover letter and analysis once both inputs are set
+PREFETCH_CONFIG = {
+    # Wait this long for inputs to stop changing before calling the API
+    "debounce_seconds": float(os.getenv("LLM_PREFETCH_DEBOUNCE", "1.5")),
+    # How long a button press waits for an in-flight prefetch before going direct
+    "wait_timeout": 120.0
 }
\ No newline at end of file
@@ -0,0 +1,460 @@
+"""
+Pluggable text generation backends.
+
+The client talks to an LLMBackend instead of google.generativeai directly.
+Besides Gemini, two deterministic stub backends are provided so the app can
+be load-tested and benchmarked offline without a billed key: an in-process
+stub and an HTTP client for the stand-in server in ``stub_server.py``.
+"""
+
+import asyncio
+import datetime
+import functools
+import hashlib
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from ..config.settings import GEMINI_API_KEY, LLM_BACKEND, STUB_BACKEND_CONFIG
+
+
+@dataclass
+class LLMResponse:
+    """Text returned by a backend plus any token usage it reported."""
+    text: str
+    usage: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class ContextHandle:
+    """A provider-side cached prompt prefix that later requests can reference."""
+    name: str
+    expires_at: float
+    tokens: int = 0
+    ref: Any = None  # provider object, e.g. genai.caching.CachedContent
+
+    def expires_in(self) -> float:
+        """Seconds until the provider drops the cached context."""
+        return self.expires_at - time.time()
+
+
+class BackendHTTPError(Exception):
+    """Non-success HTTP response from a backend server."""
+
+    def __init__(self, code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{code} {message}")
+        self.code = code
+        self.retry_after = retry_after
+
+
+class LLMBackend:
+    """Interface implemented by every text generation backend."""
+
+    name = "base"
+    supports_context_cache = False
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    async def generate(self, prompt: str, generation_config: Dict,
+                       context: Optional[ContextHandle] = None) -> LLMResponse:
+        """
+        Generate a complete response.
+
+        Args:
+            prompt (str): The prompt to send (only the suffix when context is given)
+            generation_config (Dict): max_output_tokens, temperature, ...
+            context (Optional[ContextHandle]): Cached prefix to prepend to the prompt
+
+        Returns:
+            LLMResponse: Generated text and usage
+        """
+        raise NotImplementedError
+
+    async def open_stream(self, prompt: str, generation_config: Dict,
+                          context: Optional[ContextHandle] = None) -> AsyncIterator[str]:
+        """
+        Start a streamed response.
+
+        Returns once the upstream has accepted the request, so that opening
+        the stream can be retried independently of consuming it.
+
+        Args:
+            prompt (str): The prompt to send (only the suffix when context is given)
+            generation_config (Dict): max_output_tokens, temperature, ...
+            context (Optional[ContextHandle]): Cached prefix to prepend to the prompt
+
+        Returns:
+            AsyncIterator[str]: Text chunks as they arrive
+        """
+        raise NotImplementedError
+
+    async def create_context_cache(self, prefix: str, ttl_seconds: int) -> ContextHandle:
+        """
+        Cache a prompt prefix on the provider side.
+
+        Only called when supports_context_cache is True.
+
+        Args:
+            prefix (str): Prompt prefix shared by later requests
+            ttl_seconds (int): How long the provider should keep it
+
+        Returns:
+            ContextHandle: Handle to pass as context to generate/open_stream
+        """
+        raise NotImplementedError
+
+    async def health_probe(self) -> Dict[str, Any]:
+        """
+        Check that the backend is reachable without generating any text.
+
+        Probes must be cheap metadata calls that do not count against the
+        generation quota.
+
+        Returns:
+            Dict[str, Any]: Details reported by the backend, e.g. model limits
+        """
+        raise NotImplementedError
+
+
+class GeminiBackend(LLMBackend):
+    """Google Gemini via google.generativeai."""
+
+    name = "gemini"
+    supports_context_cache = True
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        import google.generativeai as genai
+
+        if not GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in environment variables")
+        genai.configure(api_key=GEMINI_API_KEY)
+        self._genai = genai
+        self.model = genai.GenerativeModel(model_name)
+
+    def _config(self, generation_config: Dict):
+        return self._genai.types.GenerationConfig(**generation_config)
+
+    @staticmethod
+    def _usage(response) -> Dict[str, int]:
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is None:
+            return {}
+        return {
+            "prompt_tokens": getattr(metadata, "prompt_token_count", 0) or 0,
+            "output_tokens": getattr(metadata, "candidates_token_count", 0) or 0,
+            "total_tokens": getattr(metadata, "total_token_count", 0) or 0,
+            "cached_tokens": getattr(metadata, "cached_content_token_count", 0) or 0,
+        }
+
+    def _model_for(self, context: Optional[ContextHandle]):
+        if context is None:
+            return self.model
+        return self._genai.GenerativeModel.from_cached_content(cached_content=context.ref)
+
+    async def generate(self, prompt: str, generation_config: Dict,
+                       context: Optional[ContextHandle] = None) -> LLMResponse:
+        response = await self._model_for(context).generate_content_async(
+            prompt,
+            generation_config=self._config(generation_config)
+        )
+        return LLMResponse(response.text, self._usage(response))
+
+    async def open_stream(self, prompt: str, generation_config: Dict,
+                          context: Optional[ContextHandle] = None) -> AsyncIterator[str]:
+        response = await self._model_for(context).generate_content_async(
+            prompt,
+            generation_config=self._config(generation_config),
+            stream=True
+        )
+
+        async def chunks():
+            async for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+
+        return chunks()
+
+    async def create_context_cache(self, prefix: str, ttl_seconds: int) -> ContextHandle:
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, functools.partial(
+            self._genai.caching.CachedContent.create,
+            model=f"models/{self.model_name}",
+            contents=[prefix],
+            ttl=datetime.timedelta(seconds=ttl_seconds)
+        ))
+        metadata = getattr(cached, "usage_metadata", None)
+        return ContextHandle(
+            name=cached.name,
+            expires_at=time.time() + ttl_seconds,
+            tokens=getattr(metadata, "total_token_count", 0) or 0,
+            ref=cached
+        )
+
+    async def health_probe(self) -> Dict[str, Any]:
+        # Model metadata lookup: not billed and not a generation request
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(None, self._genai.get_model, f"models/{self.model_name}")
+        return {
+            "model": model.name,
+            "input_token_limit": getattr(model, "input_token_limit", None),
+            "output_token_limit": getattr(model, "output_token_limit", None),
+        }
+
+
+_STUB_WORDS = (
+    "experience skills team project results led built improved delivered "
+    "customer data python cloud design stakeholders growth impact strategy "
+    "communication analysis platform scalable ownership mentoring metrics "
+    "collaborated launched optimized role position company opportunity"
+).split()
+
+
+class StubModel:
+    """
+    Deterministic fake model shared by the stub backend and stub server.
+
+    The same prompt always produces the same text. Latencies are drawn from a
+    seeded distribution, so a benchmark run is reproducible end to end.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = dict(STUB_BACKEND_CONFIG, **(config or {}))
+        self._rng = random.Random(self.config["seed"])
+
+    def sample_latency(self) -> float:
+        """Draw a time-to-first-byte in seconds from the configured distribution."""
+        cfg = self.config
+        median = cfg["latency_median_ms"] / 1000.0
+        distribution = cfg["latency_distribution"]
+        if distribution == "fixed":
+            return median
+        if distribution == "uniform":
+            spread = cfg["latency_spread_ms"] / 1000.0
+            return max(0.0, self._rng.uniform(median - spread, median + spread))
+        return median * math.exp(self._rng.gauss(0.0, cfg["latency_sigma"]))
+
+    def should_fail(self) -> bool:
+        """Whether to inject an upstream error for this request."""
+        return self._rng.random() < self.config["error_rate"]
+
+    def _from_schema(self, schema: Dict, rng: random.Random) -> Any:
+        """Build a deterministic value that conforms to a response schema."""
+        kind = str(schema.get("type", "string")).lower()
+        if kind == "object":
+            return {name: self._from_schema(sub, rng) for name, sub in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self._from_schema(schema.get("items", {}), rng) for _ in range(3)]
+        if kind == "integer":
+            return rng.randint(schema.get("minimum", 1), schema.get("maximum", 10))
+        if kind == "number":
+            return round(rng.uniform(schema.get("minimum", 0), schema.get("maximum", 100)), 1)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return " ".join(rng.choice(_STUB_WORDS) for _ in range(12))
+
+    def generate_text(self, prompt: str, generation_config: Dict) -> LLMResponse:
+        """Build the deterministic response for a prompt."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        rng = random.Random(digest)
+        schema = generation_config.get("response_schema")
+        if schema is not None:
+            text = json.dumps(self._from_schema(schema, rng))
+            n_tokens = max(1, len(text) // 4)
+        else:
+            max_tokens = generation_config.get("max_output_tokens") or self.config["output_tokens"]
+            n_tokens = min(self.config["output_tokens"], max_tokens)
+            text = " ".join(rng.choice(_STUB_WORDS) for _ in range(n_tokens))
+        prompt_tokens = max(1, len(prompt) // 4)
+        return LLMResponse(text, {
+            "prompt_tokens": prompt_tokens,
+            "output_tokens": n_tokens,
+            "total_tokens": prompt_tokens + n_tokens,
+        })
+
+    def chunks(self, text: str) -> List[str]:
+        """Split text into stream chunks of chunk_tokens words each."""
+        words = text.split(" ")
+        size = self.config["chunk_tokens"]
+        return [" ".join(words[i:i + size]) + (" " if i + size < len(words) else "")
+                for i in range(0, len(words), size)]
+
+    @property
+    def chunk_interval(self) -> float:
+        """Seconds between stream chunks at the configured token rate."""
+        return self.config["chunk_tokens"] / self.config["tokens_per_second"]
+
+
+class StubBackend(LLMBackend):
+    """In-process deterministic backend with simulated latency."""
+
+    name = "stub"
+    supports_context_cache = True
+
+    def __init__(self, model_name: str, config: Optional[Dict] = None):
+        super().__init__(f"stub/{model_name}")
+        self.stub = StubModel(config)
+        # Simulated provider-side context cache: name -> (prefix, expires_at)
+        self.contexts: Dict[str, Tuple[str, float]] = {}
+
+    def _maybe_fail(self) -> None:
+        if self.stub.should_fail():
+            raise BackendHTTPError(503, "Stub backend injected failure", retry_after=0.1)
+
+    def _with_context(self, prompt: str, context: Optional[ContextHandle]) -> Tuple[str, int]:
+        """Expand a suffix into the full prompt, as the provider would."""
+        if context is None:
+            return prompt, 0
+        prefix, expires_at = self.contexts.get(context.name, (None, 0.0))
+        if prefix is None or expires_at <= time.time():
+            self.contexts.pop(context.name, None)
+            raise BackendHTTPError(404, f"Cached content {context.name} not found or expired")
+        return prefix + prompt, max(1, len(prefix) // 4)
+
+    def _generate_text(self, prompt: str, generation_config: Dict,
+                       context: Optional[ContextHandle]) -> LLMResponse:
+        # Output depends only on the full prompt, cached prefix or not
+        full_prompt, cached_tokens = self._with_context(prompt, context)
+        response = self.stub.generate_text(full_prompt, generation_config)
+        if cached_tokens:
+            response.usage["cached_tokens"] = cached_tokens
+        return response
+
+    async def create_context_cache(self, prefix: str, ttl_seconds: int) -> ContextHandle:
+        await asyncio.sleep(0)
+        name = "cachedContents/stub-" + hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:16]
+        expires_at = time.time() + ttl_seconds
+        self.contexts[name] = (prefix, expires_at)
+        return ContextHandle(name=name, expires_at=expires_at, tokens=max(1, len(prefix) // 4))
+
+    async def generate(self, prompt: str, generation_config: Dict,
+                       context: Optional[ContextHandle] = None) -> LLMResponse:
+        response = self._generate_text(prompt, generation_config, context)
+        await asyncio.sleep(self.stub.sample_latency())
+        self._maybe_fail()
+        # A full response takes as long as streaming every token would
+        await asyncio.sleep(response.usage["output_tokens"] / self.stub.config["tokens_per_second"])
+        return response
+
+    async def open_stream(self, prompt: str, generation_config: Dict,
+                          context: Optional[ContextHandle] = None) -> AsyncIterator[str]:
+        response = self._generate_text(prompt, generation_config, context)
+        await asyncio.sleep(self.stub.sample_latency())
+        self._maybe_fail()
+
+        async def chunks():
+            for i, chunk in enumerate(self.stub.chunks(response.text)):
+                if i:
+                    await asyncio.sleep(self.stub.chunk_interval)
+                yield chunk
+
+        return chunks()
+
+    async def health_probe(self) -> Dict[str, Any]:
+        await asyncio.sleep(0)
+        return {"model": self.model_name}
+
+
+class HttpStubBackend(LLMBackend):
+    """Backend that talks to the stub server over plain HTTP/1.0."""
+
+    name = "http_stub"
+
+    def __init__(self, model_name: str, url: Optional[str] = None):
+        super().__init__(f"stub/{model_name}")
+        parsed = urlparse(url or STUB_BACKEND_CONFIG["url"])
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+
+    async def _request(self, path: str, payload: Optional[Dict] = None):
+        """POST payload as JSON to path, or GET path when there is no payload."""
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        if payload is None:
+            writer.write(f"GET {path} HTTP/1.0\r\nHost: {self.host}\r\n\r\n".encode("ascii"))
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            writer.write(
+                f"POST {path} HTTP/1.0\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+            )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if status != 200:
+            message = (await reader.read()).decode("utf-8", "replace")
+            writer.close()
+            retry_after = headers.get("retry-after")
+            raise BackendHTTPError(status, message, float(retry_after) if retry_after else None)
+        return reader, writer
+
+    async def generate(self, prompt: str, generation_config: Dict,
+                       context: Optional[ContextHandle] = None) -> LLMResponse:
+        reader, writer = await self._request("/generate", {
+            "model": self.model_name, "prompt": prompt, "generation_config": generation_config
+        })
+        try:
+            data = json.loads(await reader.read())
+        finally:
+            writer.close()
+        return LLMResponse(data["text"], data.get("usage", {}))
+
+    async def open_stream(self, prompt: str, generation_config: Dict,
+                          context: Optional[ContextHandle] = None) -> AsyncIterator[str]:
+        reader, writer = await self._request("/stream", {
+            "model": self.model_name, "prompt": prompt, "generation_config": generation_config
+        })
+
+        async def chunks():
+            try:
+                async for line in reader:
+                    if line.strip():
+                        yield json.loads(line)["text"]
+            finally:
+                writer.close()
+
+        return chunks()
+
+    async def health_probe(self) -> Dict[str, Any]:
+        reader, writer = await self._request("/health")
+        try:
+            data = json.loads(await reader.read())
+        finally:
+            writer.close()
+        return dict(data, model=self.model_name)
+
+
+BACKENDS = {
+    GeminiBackend.name: GeminiBackend,
+    StubBackend.name: StubBackend,
+    HttpStubBackend.name: HttpStubBackend,
+}
+
+def create_backend(model_name: str, backend_name: Optional[str] = None) -> LLMBackend:
+    """
+    Create the configured backend.
+
+    Args:
+        model_name (str): Model to generate with
+        backend_name (Optional[str]): Backend to use, defaults to LLM_BACKEND
+
+    Returns:
+        LLMBackend: Backend instance
+    """
+    backend_name = backend_name or LLM_BACKEND
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend: {backend_name}. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[backend_name](model_name)
@@ -0,0 +1,311 @@
+"""
+Content-addressed caching for LLM responses.
+
+Responses are stored in two tiers: a small in-memory LRU that is shared by
+every session in the process, and an optional on-disk tier that survives
+restarts and is bounded by total size. Both tiers honour the same TTL; an
+entry promoted from disk keeps its original creation time.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config.settings import CACHE_CONFIG
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Build a stable content hash from the given parts.
+
+    Args:
+        *parts: Values that identify the request (model, prompt, settings...)
+
+    Returns:
+        str: Hex SHA-256 digest of the parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache, with an optional TTL per entry."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (value, expiry time or None)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any, created: Optional[float] = None) -> None:
+        """
+        Store a value.
+
+        Args:
+            key (str): Cache key
+            value (Any): Value to store
+            created (Optional[float]): When the value was first stored, e.g. in
+                the disk tier, so it expires here when it would have there;
+                defaults to now
+        """
+        expires_at = None
+        if self.ttl_seconds:
+            expires_at = (time.time() if created is None else created) + self.ttl_seconds
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """
+    JSON-file cache with TTL and size-bounded eviction.
+
+    Each entry lives in its own file, sharded by the first two characters of
+    the key. File modification times double as last-access times, so eviction
+    removes the least recently used entries first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: Optional[float]):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._size = None
+        self.evictions = 0
+        self.expirations = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob("*/*.json"))
+        return self._size
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get the value stored under key and when it was stored, or None."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            created = entry.get("created", 0)
+            if self.ttl_seconds and time.time() - created > self.ttl_seconds:
+                self._remove(path)
+                self.expirations += 1
+                return None
+
+            try:
+                os.utime(path, None)
+            except OSError:
+                pass
+            return entry.get("value"), created
+
+    def put(self, key: str, value: Any) -> None:
+        path = self._path(key)
+        data = json.dumps({"created": time.time(), "value": value}, ensure_ascii=False)
+        tmp_path = None
+        with self._lock:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                size = self._current_size()
+                if path.exists():
+                    size -= path.stat().st_size
+                # A unique temporary name: other processes may write the same key at once
+                with tempfile.NamedTemporaryFile(
+                    "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+                ) as f:
+                    tmp_path = f.name
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._size = size + path.stat().st_size
+            except OSError:
+                if tmp_path is not None:
+                    try:
+                        os.unlink(tmp_path)
+                    except OSError:
+                        pass
+                return
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            if self._size is not None:
+                self._size -= size
+        except OSError:
+            pass
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is at 90% of its budget."""
+        entries = []
+        for p in self.directory.glob("*/*.json"):
+            try:
+                stat = p.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, p))
+        entries.sort()
+
+        target = int(self.max_bytes * 0.9)
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self) -> None:
+        with self._lock:
+            for p in self.directory.glob("*/*.json"):
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+            self._size = 0
+
+
+class ResponseCache:
+    """Two-tier (memory + disk) cache for generated LLM responses."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or CACHE_CONFIG
+        self.enabled = config.get("enabled", True)
+        self.memory = LRUCache(config.get("memory_max_entries", 256), config.get("ttl_seconds"))
+        self.disk = None
+        if config.get("disk_enabled", True):
+            self.disk = DiskCache(
+                config.get("disk_dir", ".cache/llm_responses"),
+                config.get("disk_max_bytes", 50 * 1024 * 1024),
+                config.get("ttl_seconds"),
+            )
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from make_cache_key
+
+        Returns:
+            Optional[Any]: Cached value or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        if self.disk is not None:
+            entry = self.disk.get_entry(key)
+            if entry is not None and entry[0] is not None:
+                value, created = entry
+                self.memory.put(key, value, created)
+                self._count("disk_hits")
+                return value
+
+        self._count("misses")
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a response in both tiers."""
+        if not self.enabled or value is None:
+            return
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+        self._count("writes")
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and tier sizes.
+
+        Returns:
+            Dict[str, Any]: Cache statistics
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_evictions"] = self.memory.evictions
+        stats["memory_expirations"] = self.memory.expirations
+        if self.disk is not None:
+            stats["disk_evictions"] = self.disk.evictions
+            stats["disk_expirations"] = self.disk.expirations
+        return stats
+
+
+# Global cache instance
+_cache = None
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the shared response cache."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,169 @@
+"""
+Cancellation of LLM requests that a Streamlit rerun has superseded.
+
+Streamlit reruns the script when an input changes or another button is
+pressed. A blocking generate call would otherwise keep the old run alive until
+the model answers, spending quota on a result nobody sees. Requests issued from
+the UI therefore carry a CancellationToken tied to the session and to a hash of
+their inputs:
+
+- While waiting, the client calls the token's checkpoint every poll interval.
+  In a script run this touches an empty placeholder, which is where Streamlit
+  raises its rerun/stop exception, so a pending rerun interrupts the wait and
+  the upstream request is cancelled.
+- When a rerun arrives with different inputs, SessionCancellation.supersede
+  cancels every token issued for the old inputs, including streams that are
+  no longer being read.
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+import streamlit as st
+from .cache import make_cache_key
+
+
+class RequestCancelledError(Exception):
+    """Raised when a request is cancelled before it completes."""
+
+
+def rerun_checkpoint() -> Callable[[], None]:
+    """
+    Create a checkpoint at which a pending Streamlit rerun can stop the script.
+
+    Streamlit only interrupts a script when it emits an element, so the
+    checkpoint clears an (invisible) empty placeholder each time it is called.
+
+    Returns:
+        Callable[[], None]: Checkpoint to call from the script thread
+    """
+    placeholder = None
+
+    def checkpoint() -> None:
+        nonlocal placeholder
+        if placeholder is None:
+            placeholder = st.empty()
+        else:
+            placeholder.empty()
+
+    return checkpoint
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag for one request."""
+
+    def __init__(self, key: str = "", checkpoint: Optional[Callable[[], None]] = None):
+        """
+        Initialize the token.
+
+        Args:
+            key (str): Hash of the inputs the request was made for
+            checkpoint (Optional[Callable[[], None]]): Called periodically while
+                the request is awaited; may raise to abort the wait
+        """
+        self.key = key
+        self.reason: Optional[str] = None
+        self._checkpoint = checkpoint
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+    def cancel(self, reason: str = "superseded") -> bool:
+        """
+        Cancel the token and run its callbacks.
+
+        Args:
+            reason (str): Why the request was cancelled
+
+        Returns:
+            bool: False if the token was already cancelled
+        """
+        with self._lock:
+            if self.reason is not None:
+                return False
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+        return True
+
+    def add_callback(self, callback: Callable[[], None]) -> None:
+        """Run callback on cancellation (immediately if already cancelled)."""
+        with self._lock:
+            if self.reason is None:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback: Callable[[], None]) -> None:
+        """Forget a callback whose request has finished (no-op if it is not registered)."""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def checkpoint(self) -> None:
+        """
+        Abort the wait if the token was cancelled, then run the host checkpoint.
+
+        Raises:
+            RequestCancelledError: If the token was cancelled
+        """
+        if self.reason is not None:
+            raise RequestCancelledError(self.reason)
+        if self._checkpoint is not None:
+            self._checkpoint()
+
+
+class SessionCancellation:
+    """Cancellation tokens for one session, one live token per slot."""
+
+    def __init__(self):
+        self._tokens: Dict[str, CancellationToken] = {}
+        self._lock = threading.Lock()
+
+    def token(self, slot: str, *inputs, checkpoint: Optional[Callable[[], None]] = None) -> CancellationToken:
+        """
+        Issue a token for a new request, cancelling the slot's previous one.
+
+        Args:
+            slot (str): What the request produces, e.g. "cover_letter"
+            *inputs: Inputs the request depends on (hashed into the token key)
+            checkpoint (Optional[Callable[[], None]]): Host checkpoint, defaults
+                to rerun_checkpoint()
+
+        Returns:
+            CancellationToken: Token to pass to the client
+        """
+        token = CancellationToken(make_cache_key(*inputs), checkpoint or rerun_checkpoint())
+        with self._lock:
+            previous = self._tokens.get(slot)
+            self._tokens[slot] = token
+        if previous is not None:
+            previous.cancel("superseded")
+        return token
+
+    def supersede(self, *inputs) -> int:
+        """
+        Cancel every token issued for inputs other than these.
+
+        Args:
+            *inputs: The current inputs, hashed the same way as in token()
+
+        Returns:
+            int: Number of tokens cancelled
+        """
+        key = make_cache_key(*inputs)
+        with self._lock:
+            stale = {slot: token for slot, token in self._tokens.items() if token.key != key}
+            for slot in stale:
+                del self._tokens[slot]
+        return sum(token.cancel("superseded") for token in stale.values())
+
+
+def get_session_cancellation() -> SessionCancellation:
+    """Get or create the cancellation tokens of the current Streamlit session."""
+    if 'cancellation' not in st.session_state:
+        st.session_state.cancellation = SessionCancellation()
+    return st.session_state.cancellation
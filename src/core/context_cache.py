@@ -0,0 +1,95 @@
+"""
+Reusable provider-side context caches for shared prompt prefixes.
+
+Prompts built with build_context_prompt start with the same resume/job
+description prefix for every task. The first request on a (model, prefix)
+pair caches that prefix with the provider; follow-up tasks reference the
+handle and send only their instructions, paying the cached-token rate for
+the prefix. Handles expire with the provider TTL and are recreated on demand.
+"""
+
+from typing import Any, Dict, Optional
+
+from ..config.settings import CONTEXT_CACHE_CONFIG
+from .backends import ContextHandle, LLMBackend
+from .cache import make_cache_key
+from .prompt_builder import estimate_tokens
+from .singleflight import SingleFlight
+
+
+class ContextCacheManager:
+    """
+    Create and reuse context handles per (model, prefix).
+
+    Must be used from the client's event loop.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or CONTEXT_CACHE_CONFIG
+        self.enabled = config.get("enabled", True)
+        self.ttl = config.get("ttl_seconds", 900)
+        self.refresh_margin = config.get("refresh_margin_seconds", 30)
+        self.min_tokens = config.get("min_tokens", {})
+        self.default_min_tokens = config.get("default_min_tokens", 1024)
+        self._handles: Dict[str, ContextHandle] = {}
+        # Concurrent tasks on new inputs create the context only once
+        self._creating = SingleFlight()
+        self._counters = {"hits": 0, "creates": 0, "create_errors": 0, "expired": 0, "invalidated": 0}
+
+    def _min_tokens_for(self, model_name: str) -> int:
+        # Stub backends report "stub/<model>"
+        return self.min_tokens.get(model_name.split("/")[-1], self.default_min_tokens)
+
+    def _prune(self) -> None:
+        for key, handle in list(self._handles.items()):
+            if handle.expires_in() <= self.refresh_margin:
+                del self._handles[key]
+                self._counters["expired"] += 1
+
+    async def acquire(self, backend: LLMBackend, prefix: str) -> Optional[ContextHandle]:
+        """
+        Get a live handle for a prefix, creating it if needed.
+
+        Args:
+            backend (LLMBackend): Backend the request will be sent to
+            prefix (str): Shared prompt prefix
+
+        Returns:
+            Optional[ContextHandle]: Handle, or None to send the full prompt
+                (caching disabled or unsupported, prefix too small, or creation failed)
+        """
+        if not (self.enabled and prefix and backend.supports_context_cache):
+            return None
+        if estimate_tokens(prefix) < self._min_tokens_for(backend.model_name):
+            return None
+
+        self._prune()
+        key = make_cache_key(backend.model_name, prefix)
+        handle = self._handles.get(key)
+        if handle is not None:
+            self._counters["hits"] += 1
+            return handle
+
+        try:
+            handle = await self._creating.do(key, lambda: backend.create_context_cache(prefix, self.ttl))
+        except Exception:
+            self._counters["create_errors"] += 1
+            return None
+        if key not in self._handles:
+            self._handles[key] = handle
+            self._counters["creates"] += 1
+        return handle
+
+    def invalidate(self, backend: LLMBackend, prefix: str) -> None:
+        """Forget a handle the provider no longer recognizes."""
+        if self._handles.pop(make_cache_key(backend.model_name, prefix), None) is not None:
+            self._counters["invalidated"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get context cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, creates, errors, expirations and live handles
+        """
+        return dict(self._counters, live_handles=len(self._handles))
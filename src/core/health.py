@@ -0,0 +1,186 @@
+"""
+Cheap, cached health checks for the LLM backends.
+
+Each model tier is probed with a metadata lookup (see LLMBackend.health_probe)
+instead of a generation request, so checks are not billed. Probes also bypass
+the resilience layer's rate limiter and the client's in-flight semaphore, so
+they never take quota or concurrency from user traffic. Results are cached
+for a TTL and refreshed by a background thread.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from ..config.settings import HEALTH_CONFIG
+from .backends import LLMBackend
+
+
+@dataclass
+class TierHealth:
+    """Probe result for one model tier."""
+    model: str
+    healthy: bool
+    latency_ms: float
+    error: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class HealthStatus:
+    """Aggregate health of every model tier."""
+    status: str  # "ok", "degraded" (some tiers down) or "down"
+    checked_at: float
+    tiers: Dict[str, TierHealth] = field(default_factory=dict)
+
+    @property
+    def healthy(self) -> bool:
+        return self.status != "down"
+
+    @property
+    def age(self) -> float:
+        """Seconds since the probe ran."""
+        return time.time() - self.checked_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(asdict(self), healthy=self.healthy, age_seconds=round(self.age, 1))
+
+
+class HealthMonitor:
+    """Probe backends on demand or on a schedule, caching the result for a TTL."""
+
+    def __init__(self, backends: Dict[str, LLMBackend], config: Optional[Dict] = None):
+        config = config or HEALTH_CONFIG
+        self.backends = backends
+        self.ttl = config.get("ttl_seconds", 60)
+        self.interval = config.get("interval_seconds", 60)
+        self.probe_timeout = config.get("probe_timeout", 10)
+        self._status: Optional[HealthStatus] = None
+        self._lock = threading.Lock()
+        # Held for the length of a probe; readers never wait on it for a cached result
+        self._probe_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    async def _probe_tier(self, backend: LLMBackend) -> TierHealth:
+        started = time.perf_counter()
+        try:
+            details = await asyncio.wait_for(backend.health_probe(), timeout=self.probe_timeout)
+            error = None
+        except asyncio.TimeoutError:
+            details, error = {}, f"probe timed out after {self.probe_timeout:.0f}s"
+        except Exception as e:
+            details, error = {}, str(e)
+        return TierHealth(
+            model=backend.model_name,
+            healthy=error is None,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            error=error,
+            details=details
+        )
+
+    async def _probe(self) -> HealthStatus:
+        tiers = list(self.backends)
+        results = await asyncio.gather(*(self._probe_tier(self.backends[tier]) for tier in tiers))
+        healthy = sum(result.healthy for result in results)
+        if healthy == len(results):
+            status = "ok"
+        elif healthy:
+            status = "degraded"
+        else:
+            status = "down"
+        return HealthStatus(status=status, checked_at=time.time(), tiers=dict(zip(tiers, results)))
+
+    def check(self, force: bool = False) -> HealthStatus:
+        """
+        Get the current health, probing only if the cached result is stale.
+
+        The probe runs outside the lock. While another thread is probing,
+        a stale result is returned instead of waiting for it; callers block
+        only when nothing has been probed yet or when forcing.
+
+        Args:
+            force (bool): Probe even if the cached result is fresh
+
+        Returns:
+            HealthStatus: Current health
+        """
+        status = self._status
+        if not force and status is not None and status.age < self.ttl:
+            return status
+        if not self._probe_lock.acquire(blocking=force or status is None):
+            return status
+        try:
+            status = self._status
+            # A probe may have finished while this call waited for the lock
+            if force or status is None or status.age >= self.ttl:
+                status = asyncio.run(self._probe())
+                self._status = status
+            return status
+        finally:
+            self._probe_lock.release()
+
+    def status(self) -> Optional[HealthStatus]:
+        """Get the last probe result without probing."""
+        return self._status
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get health gauges for the metrics registry.
+
+        Returns:
+            Dict[str, Any]: Overall status and per-tier up/latency values
+        """
+        status = self._status
+        if status is None:
+            return {"status": "unknown"}
+        stats = {"status": status.status, "age_seconds": round(status.age, 1)}
+        for tier, result in status.tiers.items():
+            stats[f"{tier}_up"] = int(result.healthy)
+            stats[f"{tier}_latency_ms"] = result.latency_ms
+        return stats
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.check(force=True)
+            except Exception:
+                pass
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start background probing every interval_seconds (once per process)."""
+        with self._lock:
+            if self._thread is not None or not self.interval:
+                return
+            self._thread = threading.Thread(target=self._run, name="llm-health-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop background probing."""
+        self._stop.set()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get the health monitor of the shared client."""
+    from .llm_client import get_gemini_client
+
+    return get_gemini_client().health
+
+
+def start_health_monitor() -> Optional[HealthMonitor]:
+    """
+    Start background health probing for the shared client.
+
+    Returns:
+        Optional[HealthMonitor]: The monitor, or None if the client could not
+            be created (e.g. no API key configured)
+    """
+    try:
+        monitor = get_health_monitor()
+    except Exception:
+        return None
+    monitor.start()
+    return monitor
@@ -0,0 +1,193 @@
+"""
+Hedged requests for tail-latency reduction.
+
+Most of the spread between p50 and p99 generation latency is upstream
+variance, not prompt size. When a request has not returned by a percentile of
+recent latency for its task, an identical duplicate is sent; the first
+successful response wins and the other is cancelled. A token budget caps
+hedges at a fraction of requests so quota use stays bounded.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from ..config.settings import HEDGING_CONFIG
+
+
+class LatencyWindow:
+    """Sliding window of recent latencies with percentile lookup."""
+
+    def __init__(self, size: int):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Get the nearest-rank percentile of the window.
+
+        Args:
+            p (float): Percentile between 0 and 100
+
+        Returns:
+            Optional[float]: Latency in seconds, or None if the window is empty
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(0, min(len(samples) - 1, int(round(p / 100 * len(samples))) - 1))
+        return samples[rank]
+
+
+class HedgingPolicy:
+    """
+    Fire a duplicate of a slow request and keep whichever answers first.
+
+    Latencies are tracked per key (task and tier). No hedge is sent until a
+    key has ``min_samples`` observations. Every request adds ``max_hedge_ratio``
+    to a shared budget (capped at ``burst``) and every hedge spends one, so
+    over time hedges stay at or below that fraction of requests.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or HEDGING_CONFIG
+        self.enabled = config.get("enabled", False)
+        self.percentile = config.get("percentile", 95)
+        self.min_samples = config.get("min_samples", 20)
+        self.window_size = config.get("window", 200)
+        self.min_delay = config.get("min_delay", 0.5)
+        self.max_hedge_ratio = config.get("max_hedge_ratio", 0.1)
+        self.burst = config.get("burst", 2)
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._budget = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"requests": 0, "hedges": 0, "hedge_wins": 0, "budget_denied": 0}
+
+    def _window(self, key: str) -> LatencyWindow:
+        with self._lock:
+            if key not in self._windows:
+                self._windows[key] = LatencyWindow(self.window_size)
+            return self._windows[key]
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """
+        Get how long to wait before hedging a request for key.
+
+        Args:
+            key (str): Latency key, e.g. "cover_letter/heavy"
+
+        Returns:
+            Optional[float]: Delay in seconds, or None if hedging is off or
+                there are too few samples yet
+        """
+        window = self._window(key)
+        if not self.enabled or len(window) < self.min_samples:
+            return None
+        return max(self.min_delay, window.percentile(self.percentile))
+
+    def _request_started(self) -> None:
+        with self._lock:
+            self._counters["requests"] += 1
+            self._budget = min(self.burst, self._budget + self.max_hedge_ratio)
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._budget < 1:
+                self._counters["budget_denied"] += 1
+                return False
+            self._budget -= 1
+            self._counters["hedges"] += 1
+            return True
+
+    async def _timed(self, fn: Callable[[], Awaitable[Any]]):
+        started = time.perf_counter()
+        result = await fn()
+        return result, time.perf_counter() - started
+
+    async def call(self, key: str, fn: Callable[[], Awaitable[Any]],
+                   on_hedge: Optional[Callable[[], None]] = None,
+                   on_hedge_win: Optional[Callable[[], None]] = None) -> Any:
+        """
+        Call fn, sending a duplicate if it is slower than the hedge delay.
+
+        Errors raised before the hedge fires are not hedged (retries belong to
+        the resilience layer). Once both calls are in flight, a failure of one
+        waits for the other; the first error is raised only if both fail.
+
+        Args:
+            key (str): Latency key, e.g. "cover_letter/heavy"
+            fn (Callable[[], Awaitable[Any]]): Zero-argument coroutine function
+                issuing one complete upstream request
+            on_hedge (Optional[Callable[[], None]]): Called when a duplicate is sent
+            on_hedge_win (Optional[Callable[[], None]]): Called when the duplicate wins
+
+        Returns:
+            Any: Result of the first successful call
+        """
+        self._request_started()
+        window = self._window(key)
+        delay = self.hedge_delay(key)
+        primary = asyncio.ensure_future(self._timed(fn))
+        pending = {primary}
+        try:
+            if delay is not None:
+                await asyncio.wait(pending, timeout=delay)
+                if not primary.done() and self._take_budget():
+                    pending.add(asyncio.ensure_future(self._timed(fn)))
+                    if on_hedge:
+                        on_hedge()
+
+            first_error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        first_error = first_error or task.exception()
+                        continue
+                    result, elapsed = task.result()
+                    window.observe(elapsed)
+                    if task is not primary:
+                        with self._lock:
+                            self._counters["hedge_wins"] += 1
+                        if on_hedge_win:
+                            on_hedge_win()
+                    return result
+            raise first_error
+        finally:
+            # Cancel the loser, or both calls if the caller was cancelled
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hedging counters and the remaining hedge budget.
+
+        Returns:
+            Dict[str, Any]: Hedging statistics
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["budget"] = self._budget
+        stats["enabled"] = str(self.enabled).lower()
+        return stats
+
+
+# Global hedging policy shared by every client in the process
+_policy = None
+
+def get_hedging_policy() -> HedgingPolicy:
+    """Get or create the shared hedging policy."""
+    global _policy
+    if _policy is None:
+        _policy = HedgingPolicy()
+    return _policy
@@ -0,0 +1,265 @@
+"""
+Token and cost accounting per call, session and task.
+
+Every upstream call is recorded with the session that issued it. Totals are
+kept per session and per UTC day across all sessions, and compared against
+the soft and hard budgets in TOKEN_BUDGET_CONFIG:
+
+- Past a soft budget, requests are routed to the fast model tier.
+- Past a hard budget, only cached responses are served; new requests are refused.
+
+Streams do not report usage, so their tokens are estimated from text length.
+
+Session totals are keyed on the Streamlit session id, which changes when the
+page is reloaded: a reload starts with a fresh session budget. The daily
+budgets are the limit that holds across reloads. Totals of sessions idle for
+longer than ``session_idle_seconds`` are dropped.
+"""
+
+import csv
+import io
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+from typing import Any, Deque, Dict, List, Optional
+
+from ..config.settings import TOKEN_BUDGET_CONFIG
+
+OK = "ok"
+SOFT_LIMIT = "soft_limit"
+HARD_LIMIT = "hard_limit"
+
+
+class BudgetExceededError(Exception):
+    """Raised when a request is refused because a hard token budget is spent."""
+
+    def __init__(self, scope: str, used: int, limit: int):
+        super().__init__(f"{scope} token budget exhausted ({used:,} of {limit:,} tokens)")
+        self.scope = scope
+        self.used = used
+        self.limit = limit
+
+
+def current_session_id() -> str:
+    """
+    Get the id of the Streamlit session running on this thread.
+
+    Returns:
+        str: Session id, or "background" outside a Streamlit script thread
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        ctx = None
+    return ctx.session_id if ctx is not None else "background"
+
+
+@dataclass
+class LedgerEntry:
+    """Token usage of one upstream call."""
+    timestamp: float
+    session: str
+    task: str
+    tier: str
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    cached_tokens: int
+    cost_usd: float
+    estimated: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+
+def _utc_day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class UsageLedger:
+    """Thread-safe ledger of token usage with per-session and daily budgets."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or TOKEN_BUDGET_CONFIG
+        self.session_soft = config.get("session_soft_tokens", 0)
+        self.session_hard = config.get("session_hard_tokens", 0)
+        self.daily_soft = config.get("daily_soft_tokens", 0)
+        self.daily_hard = config.get("daily_hard_tokens", 0)
+        self.exempt_sessions = set(config.get("exempt_sessions", ()))
+        self._entries: Deque[LedgerEntry] = deque(maxlen=config.get("max_entries", 10000))
+        self.session_idle_seconds = config.get("session_idle_seconds", 6 * 60 * 60)
+        # Session -> task totals, least recently active first
+        self._sessions: "OrderedDict[str, Dict[str, Dict[str, float]]]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self.expired_sessions = 0
+        self._day = _utc_day(time.time())
+        self._day_tokens = 0
+        self._lock = threading.Lock()
+
+    def _roll_day(self, timestamp: float) -> None:
+        day = _utc_day(timestamp)
+        if day != self._day:
+            self._day = day
+            self._day_tokens = 0
+
+    def _expire_sessions(self, now: float) -> None:
+        while self._sessions:
+            session = next(iter(self._sessions))
+            if now - self._last_seen[session] <= self.session_idle_seconds:
+                break
+            del self._sessions[session]
+            del self._last_seen[session]
+            self.expired_sessions += 1
+
+    def record(self, session: str, task: str, tier: str, model: str, usage: Dict[str, int],
+               cost_usd: Optional[float] = None, estimated: bool = False) -> LedgerEntry:
+        """
+        Record the usage of one upstream call.
+
+        Args:
+            session (str): Session that issued the call
+            task (str): Service task name
+            tier (str): Model tier that served the call
+            model (str): Model name
+            usage (Dict[str, int]): prompt_tokens, output_tokens and cached_tokens
+            cost_usd (Optional[float]): Estimated cost, if the model is priced
+            estimated (bool): Whether the token counts are local estimates
+
+        Returns:
+            LedgerEntry: The recorded entry
+        """
+        entry = LedgerEntry(
+            timestamp=time.time(),
+            session=session,
+            task=task,
+            tier=tier,
+            model=model,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            output_tokens=usage.get("output_tokens", 0),
+            cached_tokens=usage.get("cached_tokens", 0),
+            cost_usd=cost_usd or 0.0,
+            estimated=estimated
+        )
+        with self._lock:
+            self._roll_day(entry.timestamp)
+            self._entries.append(entry)
+            self._day_tokens += entry.total_tokens
+            totals = self._sessions.setdefault(session, {}).setdefault(
+                task, {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0}
+            )
+            self._sessions.move_to_end(session)
+            self._last_seen[session] = entry.timestamp
+            if self.session_idle_seconds:
+                self._expire_sessions(entry.timestamp)
+            totals["calls"] += 1
+            totals["prompt_tokens"] += entry.prompt_tokens
+            totals["output_tokens"] += entry.output_tokens
+            totals["cached_tokens"] += entry.cached_tokens
+            totals["cost_usd"] += entry.cost_usd
+        return entry
+
+    def session_tokens(self, session: str) -> int:
+        """Total prompt and output tokens spent by a session."""
+        with self._lock:
+            tasks = self._sessions.get(session, {})
+            return int(sum(t["prompt_tokens"] + t["output_tokens"] for t in tasks.values()))
+
+    def daily_tokens(self) -> int:
+        """Total prompt and output tokens spent today (UTC) across all sessions."""
+        with self._lock:
+            self._roll_day(time.time())
+            return self._day_tokens
+
+    def budget_state(self, session: str) -> str:
+        """
+        Compare a session's usage, and today's total, with the budgets.
+
+        Exempt sessions (e.g. the batch CLI) are held to the daily budgets only.
+
+        Args:
+            session (str): Session to check
+
+        Returns:
+            str: OK, SOFT_LIMIT or HARD_LIMIT
+        """
+        session_used = 0 if session in self.exempt_sessions else self.session_tokens(session)
+        daily_used = self.daily_tokens()
+        if (self.session_hard and session_used >= self.session_hard) or \
+                (self.daily_hard and daily_used >= self.daily_hard):
+            return HARD_LIMIT
+        if (self.session_soft and session_used >= self.session_soft) or \
+                (self.daily_soft and daily_used >= self.daily_soft):
+            return SOFT_LIMIT
+        return OK
+
+    def budget_error(self, session: str) -> BudgetExceededError:
+        """Describe which hard budget a session has hit."""
+        session_used = 0 if session in self.exempt_sessions else self.session_tokens(session)
+        if self.session_hard and session_used >= self.session_hard:
+            return BudgetExceededError("Session", session_used, self.session_hard)
+        return BudgetExceededError("Daily", self.daily_tokens(), self.daily_hard)
+
+    def session_summary(self, session: str) -> Dict[str, Dict[str, float]]:
+        """
+        Get a session's totals by task.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Task -> calls, token counts and cost
+        """
+        with self._lock:
+            return {task: dict(totals) for task, totals in self._sessions.get(session, {}).items()}
+
+    def entries(self, session: Optional[str] = None) -> List[LedgerEntry]:
+        """Get recorded calls, optionally for one session, oldest first."""
+        with self._lock:
+            return [e for e in self._entries if session is None or e.session == session]
+
+    def to_jsonl(self, session: Optional[str] = None) -> str:
+        """Export recorded calls as JSON lines."""
+        return "".join(json.dumps(asdict(e)) + "\n" for e in self.entries(session))
+
+    def dump_csv(self, path: str, session: Optional[str] = None) -> None:
+        """Write recorded calls to a CSV file."""
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(self.to_csv(session))
+
+    def to_csv(self, session: Optional[str] = None) -> str:
+        """Export recorded calls as CSV."""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=list(LedgerEntry.__dataclass_fields__))
+        writer.writeheader()
+        for entry in self.entries(session):
+            writer.writerow(asdict(entry))
+        return output.getvalue()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get ledger-wide totals.
+
+        Returns:
+            Dict[str, Any]: Sessions, today's tokens and the daily budgets
+        """
+        with self._lock:
+            sessions = len(self._sessions)
+        return {
+            "sessions": sessions,
+            "expired_sessions": self.expired_sessions,
+            "daily_tokens": self.daily_tokens(),
+            "daily_soft_tokens": self.daily_soft,
+            "daily_hard_tokens": self.daily_hard
+        }
+
+
+# Global ledger shared by every session in the process
+_ledger = None
+
+def get_usage_ledger() -> UsageLedger:
+    """Get or create the shared usage ledger."""
+    global _ledger
+    if _ledger is None:
+        _ledger = UsageLedger()
+    return _ledger
@@ -1,38 +1,727 @@
-import google.generativeai as genai
-from typing import Dict, Optional
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Union
 import streamlit as st
-from ..config.settings import GEMINI_API_KEY, GEMINI_MODEL, MAX_TOKENS, TEMPERATURE
+from ..config.settings import (
+    LLM_BACKEND, MAX_TOKENS, TASK_MAX_TOKENS, TEMPERATURE, LLM_CLIENT_CONFIG,
+    MODEL_FALLBACK_ENABLED, MODEL_PRICING, MODEL_ROUTING, MODEL_TIERS, TOKEN_BUDGET_CONFIG
+)
+from .backends import ContextHandle, LLMBackend, create_backend
+from .cache import get_response_cache, make_cache_key
+from .cancellation import CancellationToken, RequestCancelledError
+from .context_cache import ContextCacheManager
+from .health import HealthMonitor
+from .hedging import get_hedging_policy
+from .ledger import HARD_LIMIT, OK, SOFT_LIMIT, BudgetExceededError, current_session_id, get_usage_ledger
+from .metrics import SIZE_BUCKETS, get_metrics_registry
+from .prompt_builder import BuiltPrompt, build_context_prompt, estimate_tokens
+from .resilience import CircuitOpenError, get_resilience_policy, status_code_of
+from .singleflight import SingleFlight
+
+_STREAM_END = object()
+
+class ContentStream:
+    """
+    Iterator over generated text chunks that records time-to-first-token.
+
+    on_complete, if set, receives the full text once the stream ends without
+    an error; it is not called for failed, cancelled or abandoned streams.
+    """
+
+    def __init__(self, chunks: Iterator[str], on_first_token: Optional[Callable[[float], None]] = None):
+        self._chunks = chunks
+        self._parts = []
+        self._started = time.perf_counter()
+        self._on_first_token = on_first_token
+        self.on_complete: Optional[Callable[[str], None]] = None
+        self.ttft = None
+        self.error = None
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._chunks:
+                if self.ttft is None:
+                    self.ttft = time.perf_counter() - self._started
+                    if self._on_first_token:
+                        self._on_first_token(self.ttft)
+                self._parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            self.error = e
+            return
+        if self.on_complete and self._parts:
+            self.on_complete(self.text)
+
+    @property
+    def text(self) -> str:
+        """Text received so far (the full response once iteration completes)."""
+        return "".join(self._parts)
+
 class GeminiClient:
-    def __init__(self):
-        if not GEMINI_API_KEY:
-            raise ValueError("GEMINI_API_KEY not found in environment variables")
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(GEMINI_MODEL)
-    def generate_content(self, prompt: str) -> Optional[str]:
+    def __init__(self, backend: Optional[LLMBackend] = None, max_in_flight: Optional[int] = None,
+                 request_timeout: Optional[float] = None,
+                 backends: Optional[Dict[str, LLMBackend]] = None):
+        # One backend per model tier (see MODEL_TIERS); a single backend serves every tier
+        self.backends = backends or {
+            tier: backend or create_backend(model) for tier, model in MODEL_TIERS.items()
+        }
+        self.default_tier = MODEL_ROUTING["default"]
+        self.backend = self.backends[self.default_tier]
+        self.policies = {tier: get_resilience_policy(tier) for tier in self.backends}
+        self.resilience = self.policies[self.default_tier]
+        self.cache = get_response_cache()
+        self.health = HealthMonitor(self.backends)
+        self.max_in_flight = max_in_flight or LLM_CLIENT_CONFIG["max_in_flight"]
+        self.request_timeout = request_timeout or LLM_CLIENT_CONFIG["request_timeout"]
+        self.cancel_poll_interval = LLM_CLIENT_CONFIG["cancel_poll_interval"]
+        # Slow generation calls get a duplicate request (opt-in, see HEDGING_CONFIG)
+        self.hedging = get_hedging_policy()
+        # Token usage per session and task, with soft and hard budgets
+        self.ledger = get_usage_ledger()
+        self.soft_limit_tier = TOKEN_BUDGET_CONFIG.get("soft_limit_tier", "fast")
+
+        # All API calls run on one background event loop so the semaphore
+        # bounds in-flight requests across every session in the process.
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None
+        # Identical concurrent prompts share one upstream call
+        self.singleflight = SingleFlight()
+        # Provider-side caches of shared resume/job description prefixes
+        self.context_cache = ContextCacheManager()
+
+        self._init_metrics()
+
+    def _init_metrics(self) -> None:
+        """Create per-task LLM metrics and export component stats."""
+        registry = get_metrics_registry()
+        self.metrics = registry
+        self._requests = registry.counter(
+            "llm_requests_total", "LLM requests by task and outcome (success, cache_hit, error)")
+        self._latency = registry.histogram(
+            "llm_upstream_latency_seconds", "Upstream model latency including retries, by task and tier")
+        self._ttft = registry.histogram(
+            "llm_time_to_first_token_seconds", "Time to first streamed chunk, by task")
+        self._prompt_chars = registry.histogram(
+            "llm_prompt_chars", "Prompt size in characters, by task", SIZE_BUCKETS)
+        self._output_chars = registry.histogram(
+            "llm_output_chars", "Response size in characters, by task", SIZE_BUCKETS)
+        self._tokens = registry.counter(
+            "llm_tokens_total", "Tokens reported by the model, by task and kind (prompt, output, cached)")
+        self._prompt_tokens = registry.histogram(
+            "llm_prompt_estimated_tokens", "Locally estimated prompt tokens after budgeting, by task",
+            SIZE_BUCKETS)
+        self._trimmed = registry.counter(
+            "llm_prompt_trimmed_total", "Prompt fields trimmed to fit the budget, by task, field and stage")
+        self._routed = registry.counter(
+            "llm_routed_requests_total", "Upstream requests by task and the model tier that served them")
+        self._fallbacks = registry.counter(
+            "llm_model_fallbacks_total", "Requests retried on the other tier, by task and tiers")
+        self._cost = registry.counter(
+            "llm_estimated_cost_usd_total", "Estimated spend from reported tokens, by task and tier")
+        self._cost_saved = registry.counter(
+            "llm_estimated_cost_saved_usd_total",
+            "Estimated spend avoided by routing to a cheaper tier than the default, by task")
+        self._cancellations = registry.counter(
+            "llm_cancellations_total", "Requests dropped before completing, by task and reason "
+            "(superseded by newer inputs, interrupted by a rerun, stream abandoned)")
+        self._hedges = registry.counter(
+            "llm_hedged_requests_total",
+            "Duplicate requests sent for slow generation calls and stream opens, by task and tier")
+        self._hedge_wins = registry.counter(
+            "llm_hedge_wins_total", "Hedged requests answered first by the duplicate, by task and tier")
+        self._budget_actions = registry.counter(
+            "llm_budget_actions_total", "Requests changed by a token budget, by task and action "
+            "(downgraded to the fast tier, served from cache, refused)")
+
+        registry.register_collector("llm_cache", self.cache.stats)
+        for tier, policy in self.policies.items():
+            registry.register_collector(f"llm_resilience_{tier}", policy.stats)
+        registry.register_collector("llm_singleflight", self.singleflight.stats)
+        registry.register_collector("llm_health", self.health.stats)
+        registry.register_collector("llm_context_cache", self.context_cache.stats)
+        registry.register_collector("llm_hedging", self.hedging.stats)
+        registry.register_collector("llm_ledger", self.ledger.stats)
+        registry.set_health_check(lambda: self.health.check().to_dict())
+
+    def _resolve_prompt(self, prompt: Union[str, BuiltPrompt], task: str) -> Tuple[str, str, str]:
+        """Get the prompt text, task and shared prefix, recording the budget report of built prompts."""
+        if not isinstance(prompt, BuiltPrompt):
+            return prompt, task, ""
+        if task == "generic":
+            task = prompt.task
+        self._prompt_tokens.observe(prompt.tokens, task=task)
+        for name, report in prompt.fields.items():
+            for stage in report.stages:
+                self._trimmed.inc(task=task, field=name, stage=stage)
+        return prompt.text, task, prompt.prefix
+
+    @staticmethod
+    def _task_of(prompt: Union[str, BuiltPrompt], task: str) -> str:
+        if task == "generic" and isinstance(prompt, BuiltPrompt):
+            return prompt.task
+        return task
+
+    @staticmethod
+    def _estimate_cost(model_name: str, usage: Dict[str, int]) -> Optional[float]:
+        # Stub backends report "stub/<model>"; price them as the model they stand in for
+        pricing = MODEL_PRICING.get(model_name.split("/")[-1])
+        if pricing is None:
+            return None
+        # prompt_tokens includes tokens served from a cached context
+        cached = usage.get("cached_tokens", 0)
+        return ((usage.get("prompt_tokens", 0) - cached) * pricing["prompt"]
+                + cached * pricing["cached"]
+                + usage.get("output_tokens", 0) * pricing["output"]) / 1_000_000
+
+    def _record_usage(self, task: str, tier: str, usage: Dict[str, int], session: str,
+                      estimated: bool = False) -> None:
+        if not estimated:
+            if usage.get("prompt_tokens"):
+                self._tokens.inc(usage["prompt_tokens"], task=task, kind="prompt")
+            if usage.get("output_tokens"):
+                self._tokens.inc(usage["output_tokens"], task=task, kind="output")
+            if usage.get("cached_tokens"):
+                self._tokens.inc(usage["cached_tokens"], task=task, kind="cached")
+
+        model_name = self.backends[tier].model_name
+        cost = self._estimate_cost(model_name, usage)
+        self.ledger.record(session, task, tier, model_name, usage, cost, estimated)
+        if cost is None:
+            return
+        self._cost.inc(cost, task=task, tier=tier)
+        baseline = self._estimate_cost(self.backend.model_name, usage)
+        if baseline is not None and baseline > cost:
+            self._cost_saved.inc(baseline - cost, task=task)
+
+    def route(self, task: str, tier: Optional[str] = None) -> str:
         """
-        Generate content using Gemini AI.
-        
+        Pick the model tier for a task.
+
         Args:
-            prompt (str): The prompt to send to the AI
-            
+            task (str): Service task name
+            tier (Optional[str]): Explicit tier, overriding MODEL_ROUTING
+
         Returns:
-            Optional[str]: Generated content or None if error
+            str: A key of self.backends
         """
+        tier = tier or MODEL_ROUTING.get(task, self.default_tier)
+        return tier if tier in self.backends else self.default_tier
+
+    def _apply_budget(self, session: str, task: str, tier: str) -> Tuple[str, str]:
+        """
+        Check the session's token budget before a request.
+
+        Returns:
+            Tuple[str, str]: Budget state and the tier to use (the fast tier
+                once a soft budget is spent)
+        """
+        state = self.ledger.budget_state(session)
+        if state == SOFT_LIMIT and tier != self.soft_limit_tier and self.soft_limit_tier in self.backends:
+            self._budget_actions.inc(task=task, action="downgraded")
+            tier = self.soft_limit_tier
+        return state, tier
+
+    def _fallback_tier(self, tier: str) -> Optional[str]:
+        """The tier to retry on when a tier fails, if it runs a different model."""
+        if not MODEL_FALLBACK_ENABLED:
+            return None
+        for other, backend in self.backends.items():
+            if other != tier and backend.model_name != self.backends[tier].model_name:
+                return other
+        return None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the client's background event loop on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="gemini-client-loop", daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    async def _dispatch(self, coro: Awaitable):
+        """Await a coroutine on the client loop from any event loop."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def submit(self, coro: Awaitable) -> concurrent.futures.Future:
+        """
+        Schedule a coroutine on the client loop without waiting for it.
+
+        Args:
+            coro (Awaitable): Coroutine to run, e.g. agenerate_content(...)
+
+        Returns:
+            concurrent.futures.Future: Cancelling it cancels the coroutine
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def _generation_config(self, response_schema: Optional[Dict] = None, task: Optional[str] = None) -> Dict:
+        config = {"max_output_tokens": TASK_MAX_TOKENS.get(task, MAX_TOKENS), "temperature": TEMPERATURE}
+        if response_schema is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = response_schema
+        return config
+
+    def _cache_key(self, prompt: str, tier: str, response_schema: Optional[Dict] = None,
+                   task: Optional[str] = None) -> str:
+        model_name = self.backends[tier].model_name
+        max_tokens = TASK_MAX_TOKENS.get(task, MAX_TOKENS)
+        if response_schema is None:
+            return make_cache_key(model_name, prompt, TEMPERATURE, max_tokens)
+        return make_cache_key(model_name, prompt, TEMPERATURE, max_tokens, response_schema)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._semaphore
+
+    async def _with_context(self, backend: LLMBackend, prompt: str, prefix: str,
+                            send: Callable[[str, Optional[ContextHandle]], Awaitable]):
+        """
+        Call send with only the suffix and a cached-context handle when one is
+        available, otherwise with the full prompt.
+        """
+        context = await self.context_cache.acquire(backend, prefix) if prefix else None
+        if context is not None:
+            try:
+                return await send(prompt[len(prefix):], context)
+            except Exception as e:
+                if status_code_of(e) not in (400, 403, 404):
+                    raise
+                # The provider dropped or rejected the cached context
+                self.context_cache.invalidate(backend, prefix)
+        return await send(prompt, None)
+
+    async def _call_tier(self, prompt: str, timeout: float, task: str, tier: str,
+                         response_schema: Optional[Dict] = None, prefix: str = "",
+                         session: str = "background") -> str:
+        """Send a prompt to one tier's model through that tier's resilience policy."""
+        backend = self.backends[tier]
+        config = self._generation_config(response_schema, task)
+
+        async def send(text, context):
+            return await backend.generate(text, config, context=context)
+
+        async def attempt():
+            # The semaphore is held per attempt, never across backoff sleeps
+            async with self._get_semaphore():
+                return await self._with_context(backend, prompt, prefix, send)
+
+        started = time.perf_counter()
+        # timeout covers every attempt and backoff, and a hedge only gets what is left of it
+        deadline = time.monotonic() + timeout
+        # Each hedge is a full resilient call, so it waits on the same rate limiter
+        response = await self.hedging.call(
+            f"{task}/{tier}",
+            lambda: self.policies[tier].call(attempt, deadline - time.monotonic()),
+            on_hedge=lambda: self._hedges.inc(task=task, tier=tier),
+            on_hedge_win=lambda: self._hedge_wins.inc(task=task, tier=tier)
+        )
+        self._latency.observe(time.perf_counter() - started, task=task, tier=tier)
+        self._routed.inc(task=task, tier=tier)
+        self._prompt_chars.observe(len(prompt), task=task)
+        self._output_chars.observe(len(response.text), task=task)
+        self._record_usage(task, tier, response.usage, session)
+        return response.text
+
+    async def _call_model(self, prompt: str, timeout: float, task: str, tier: str,
+                          response_schema: Optional[Dict] = None, prefix: str = "",
+                          session: str = "background") -> Tuple[str, str]:
+        """
+        Send a prompt to the routed tier, falling back to the other tier on failure.
+
+        Returns:
+            Tuple[str, str]: Generated text and the tier that produced it
+        """
+        try:
+            return await self._call_tier(prompt, timeout, task, tier, response_schema, prefix, session), tier
+        except Exception:
+            fallback = self._fallback_tier(tier)
+            if fallback is None:
+                raise
+        self._fallbacks.inc(task=task, from_tier=tier, to_tier=fallback)
+        return await self._call_tier(prompt, timeout, task, fallback, response_schema, prefix, session), fallback
+
+    async def _open_stream(self, prompt: str, timeout: float, task: str, tier: str,
+                           opened: List[AsyncIterator[str]], prefix: str = "") -> AsyncIterator[str]:
+        """
+        Open a stream on one tier's model through that tier's resilience policy.
+
+        Every stream an attempt opens is appended to opened and keeps that
+        attempt's semaphore slot; the caller frees both with _close_streams.
+        When a hedged duplicate opens as well, only the first stream is kept.
+        """
+        backend = self.backends[tier]
+        config = self._generation_config(task=task)
+
+        async def send(text, context):
+            return await backend.open_stream(text, config, context=context)
+
+        async def open_stream():
+            # The semaphore is held per attempt, never across backoff sleeps
+            semaphore = self._get_semaphore()
+            await semaphore.acquire()
+            try:
+                chunks = await self._with_context(backend, prompt, prefix, send)
+            except BaseException:
+                semaphore.release()
+                raise
+            # No await between opening and recording it, so a cancellation cannot drop the slot
+            opened.append(chunks)
+            return chunks
+
+        # A slow open (time to first token) is hedged like a slow generation call,
+        # with its own latency window; timeout covers every attempt, backoff and hedge
+        deadline = time.monotonic() + timeout
+        chunks = await self.hedging.call(
+            f"{task}/{tier}/stream",
+            lambda: self.policies[tier].call(open_stream, deadline - time.monotonic()),
+            on_hedge=lambda: self._hedges.inc(task=task, tier=tier),
+            on_hedge_win=lambda: self._hedge_wins.inc(task=task, tier=tier)
+        )
+        # A duplicate that opened too lost the race; free its slot now, not when the winner ends
+        losers = [other for other in opened if other is not chunks]
+        if losers:
+            opened[:] = [other for other in opened if other is chunks]
+            await self._close_streams(losers)
+        return chunks
+
+    async def _close_streams(self, opened: List[AsyncIterator[str]]) -> None:
+        """Free the semaphore slots held by opened streams, then close the streams."""
+        streams = list(opened)
+        opened.clear()
+        semaphore = self._get_semaphore()
+        # Released before the first await, so even a cancelled close frees every slot
+        for _ in streams:
+            semaphore.release()
+        for chunks in streams:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception:
+                pass
+
+    async def _stream_model(self, prompt: str, timeout: float, task: str, tier: str,
+                            emit: Callable[[str], None], prefix: str = "",
+                            session: str = "background") -> str:
+        """
+        Stream a response from the model, passing each text chunk to emit.
+
+        Returns:
+            str: The tier that produced the stream
+        """
+        started = time.perf_counter()
+        output_chars = 0
+        opened: List[AsyncIterator[str]] = []
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=MAX_TOKENS,
-                    temperature=TEMPERATURE,
+            # Only opening the stream is retried (or moved to the fallback
+            # tier); chunks already emitted cannot be taken back.
+            try:
+                chunks = await self._open_stream(prompt, timeout, task, tier, opened, prefix)
+            except Exception:
+                fallback = self._fallback_tier(tier)
+                if fallback is None:
+                    raise
+                self._fallbacks.inc(task=task, from_tier=tier, to_tier=fallback)
+                tier = fallback
+                chunks = await self._open_stream(prompt, timeout, task, tier, opened, prefix)
+            async for chunk in chunks:
+                output_chars += len(chunk)
+                emit(chunk)
+        finally:
+            # Also reached on errors and cancellation mid-stream
+            await self._close_streams(opened)
+        self._latency.observe(time.perf_counter() - started, task=task, tier=tier)
+        self._routed.inc(task=task, tier=tier)
+        self._prompt_chars.observe(len(prompt), task=task)
+        self._output_chars.observe(output_chars, task=task)
+        # Streams report no usage; charge the ledger an estimate (~4 chars per token)
+        self._record_usage(task, tier, {
+            "prompt_tokens": estimate_tokens(prompt),
+            "output_tokens": -(-output_chars // 4)
+        }, session, estimated=True)
+        return tier
+
+    def _report_error(self, error: Exception, timeout: float) -> None:
+        """Show a user-facing message for a failed generation."""
+        if isinstance(error, CircuitOpenError):
+            st.error(f"⏳ {str(error)}. Please wait before trying again.")
+        elif isinstance(error, BudgetExceededError):
+            st.warning(f"🧾 {str(error)}. Only previously generated results are available.")
+        elif isinstance(error, asyncio.TimeoutError):
+            st.error(f"Error generating content: request timed out after {timeout:.0f}s")
+        else:
+            st.error(f"Error generating content: {str(error)}")
+
+    async def agenerate_content(self, prompt: Union[str, BuiltPrompt], use_cache: bool = True,
+                                timeout: Optional[float] = None,
+                                task: str = "generic",
+                                response_schema: Optional[Dict] = None,
+                                tier: Optional[str] = None,
+                                report_errors: bool = True,
+                                session: Optional[str] = None) -> Optional[str]:
+        """
+        Generate content using the configured backend without blocking the event loop.
+
+        The task is routed to a model tier (see MODEL_ROUTING). Identical
+        requests (same model, prompt and generation settings) are served from
+        the response cache instead of calling the API again. Past the
+        session's soft token budget the fast tier is used; past the hard
+        budget only cached responses are returned.
+
+        Args:
+            prompt (Union[str, BuiltPrompt]): The prompt to send to the AI
+            use_cache (bool): Whether to read and write the response cache
+            timeout (Optional[float]): Per-request timeout in seconds, retries included
+            task (str): Service task that issued the request, used as a metrics label
+                (defaults to the task of a BuiltPrompt)
+            response_schema (Optional[Dict]): Request JSON output matching this schema
+            tier (Optional[str]): Model tier override ("fast" or "heavy")
+            report_errors (bool): Show failures in the UI; background callers
+                without a Streamlit script context turn this off
+            session (Optional[str]): Session charged in the usage ledger,
+                defaults to the current Streamlit session
+
+        Returns:
+            Optional[str]: Generated content or None if error
+        """
+        prompt, task, prefix = self._resolve_prompt(prompt, task)
+        session = session or current_session_id()
+        routed = self.route(task, tier)
+        state, tier = self._apply_budget(session, task, routed)
+        # The disk tier blocks; keep it off whichever loop awaits this (the shared one for prefetches)
+        loop = asyncio.get_running_loop()
+        # Over the hard budget, a cached answer from either tier is still served
+        for candidate in dict.fromkeys((routed, tier)):
+            if use_cache or state == HARD_LIMIT:
+                cached = await loop.run_in_executor(
+                    None, self.cache.get, self._cache_key(prompt, candidate, response_schema, task)
                 )
-            )
-            return response.text
+                if cached is not None:
+                    self._requests.inc(task=task, outcome="cache_hit")
+                    if state != OK:
+                        self._budget_actions.inc(task=task, action="cached")
+                    return cached
+
+        if state == HARD_LIMIT:
+            self._budget_actions.inc(task=task, action="refused")
+            self._requests.inc(task=task, outcome="error")
+            if report_errors:
+                self._report_error(self.ledger.budget_error(session), timeout or self.request_timeout)
+            return None
+
+        cache_key = self._cache_key(prompt, tier, response_schema, task)
+        try:
+            text, served_by = await self._dispatch(self.singleflight.do(
+                cache_key,
+                lambda: self._call_model(prompt, timeout or self.request_timeout, task, tier,
+                                         response_schema, prefix, session)
+            ))
         except Exception as e:
-            st.error(f"Error generating content: {str(e)}")
+            self._requests.inc(task=task, outcome="error")
+            if report_errors:
+                self._report_error(e, timeout or self.request_timeout)
             return None
-    
-    def generate_cover_letter(self, resume: str, job_description: str, 
-                            additional_info: Dict = None) -> Optional[str]:
+
+        self._requests.inc(task=task, outcome="success")
+        # Fallback answers are not cached under the routed model's key
+        if use_cache and served_by == tier:
+            await loop.run_in_executor(None, self.cache.put, cache_key, text)
+        return text
+
+    async def _await_cancellable(self, coro: Awaitable, cancel_token: CancellationToken, task: str):
+        """
+        Await coro, checking cancel_token every cancel_poll_interval.
+
+        A cancelled token drops the request and returns None; an exception
+        raised by the token's checkpoint (a Streamlit rerun) cancels the
+        request and propagates.
+        """
+        work = asyncio.ensure_future(coro)
+        while not work.done():
+            try:
+                await asyncio.wait({work}, timeout=self.cancel_poll_interval)
+                if not work.done():
+                    cancel_token.checkpoint()
+            except RequestCancelledError:
+                work.cancel()
+                self._cancellations.inc(task=task, reason="superseded")
+                return None
+            except BaseException:
+                work.cancel()
+                self._cancellations.inc(task=task, reason="rerun")
+                raise
+        return work.result()
+
+    def generate_content(self, prompt: Union[str, BuiltPrompt], use_cache: bool = True,
+                         timeout: Optional[float] = None,
+                         task: str = "generic",
+                         response_schema: Optional[Dict] = None,
+                         tier: Optional[str] = None,
+                         cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """
+        Generate content using Gemini AI.
+
+        Args:
+            prompt (Union[str, BuiltPrompt]): The prompt to send to the AI
+            use_cache (bool): Whether to read and write the response cache
+            timeout (Optional[float]): Per-request timeout in seconds, retries included
+            task (str): Service task that issued the request, used as a metrics label
+            response_schema (Optional[Dict]): Request JSON output matching this schema
+            tier (Optional[str]): Model tier override ("fast" or "heavy")
+            cancel_token (Optional[CancellationToken]): Abort the request when
+                this token is cancelled or its checkpoint raises
+
+        Returns:
+            Optional[str]: Generated content or None if error or cancelled
+        """
+        coro = self.agenerate_content(prompt, use_cache, timeout, task, response_schema, tier)
+        if cancel_token is None:
+            return asyncio.run(coro)
+        return asyncio.run(self._await_cancellable(coro, cancel_token, self._task_of(prompt, task)))
+
+    def _iter_stream(self, prompt: str, cache_key: Optional[str], timeout: float,
+                     task: str, tier: str, prefix: str = "",
+                     cancel_token: Optional[CancellationToken] = None,
+                     session: str = "background") -> Iterator[str]:
+        chunks = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self._stream_model(prompt, timeout, task, tier, chunks.put, prefix, session), self._ensure_loop()
+        )
+        future.add_done_callback(lambda _: chunks.put(_STREAM_END))
+        if cancel_token is not None:
+            cancel_token.add_callback(future.cancel)
+
+        parts = []
+        # Consumer stopped reading early, unless a checkpoint says otherwise
+        reason = "abandoned"
+        try:
+            while True:
+                try:
+                    chunk = chunks.get(timeout=self.cancel_poll_interval if cancel_token else None)
+                except queue.Empty:
+                    try:
+                        cancel_token.checkpoint()
+                    except RequestCancelledError:
+                        break
+                    except BaseException:
+                        reason = "rerun"
+                        raise
+                    continue
+                if chunk is _STREAM_END:
+                    break
+                parts.append(chunk)
+                yield chunk
+        finally:
+            if cancel_token is not None:
+                # The token may outlive the stream; do not keep the finished future alive on it
+                cancel_token.remove_callback(future.cancel)
+                if cancel_token.cancelled:
+                    reason = "superseded"
+            # Stop the upstream request if the consumer went away early
+            if not future.done() or reason == "superseded":
+                future.cancel()
+                self._cancellations.inc(task=task, reason=reason)
+
+        if reason == "superseded":
+            raise RequestCancelledError(cancel_token.reason)
+
+        try:
+            served_by = future.result()
+        except Exception as e:
+            self._requests.inc(task=task, outcome="error")
+            self._report_error(e, timeout)
+            raise
+
+        self._requests.inc(task=task, outcome="success")
+        if cache_key is not None and served_by == tier:
+            self.cache.put(cache_key, "".join(parts))
+
+    def stream_content(self, prompt: Union[str, BuiltPrompt], use_cache: bool = True,
+                       timeout: Optional[float] = None,
+                       task: str = "generic",
+                       tier: Optional[str] = None,
+                       cancel_token: Optional[CancellationToken] = None,
+                       session: Optional[str] = None) -> ContentStream:
+        """
+        Stream generated content chunk by chunk.
+
+        A cached response is replayed as a single chunk. Otherwise the full
+        text is written to the cache once the stream completes.
+
+        Args:
+            prompt (Union[str, BuiltPrompt]): The prompt to send to the AI
+            use_cache (bool): Whether to read and write the response cache
+            timeout (Optional[float]): Timeout in seconds for the first response, retries included
+            task (str): Service task that issued the request, used as a metrics label
+            tier (Optional[str]): Model tier override ("fast" or "heavy")
+            cancel_token (Optional[CancellationToken]): Stop the stream when
+                this token is cancelled or its checkpoint raises
+            session (Optional[str]): Session charged in the usage ledger,
+                defaults to the current Streamlit session
+
+        Returns:
+            ContentStream: Iterator over text chunks
+        """
+        prompt, task, prefix = self._resolve_prompt(prompt, task)
+        session = session or current_session_id()
+        routed = self.route(task, tier)
+        state, tier = self._apply_budget(session, task, routed)
+        for candidate in dict.fromkeys((routed, tier)):
+            if use_cache or state == HARD_LIMIT:
+                cached = self.cache.get(self._cache_key(prompt, candidate, task=task))
+                if cached is not None:
+                    self._requests.inc(task=task, outcome="cache_hit")
+                    if state != OK:
+                        self._budget_actions.inc(task=task, action="cached")
+                    return ContentStream(iter([cached]))
+
+        if state == HARD_LIMIT:
+            self._budget_actions.inc(task=task, action="refused")
+            self._requests.inc(task=task, outcome="error")
+            error = self.ledger.budget_error(session)
+            self._report_error(error, timeout or self.request_timeout)
+            stream = ContentStream(iter(()))
+            stream.error = error
+            return stream
+
+        cache_key = self._cache_key(prompt, tier, task=task) if use_cache else None
+        chunks = self._iter_stream(
+            prompt, cache_key, timeout or self.request_timeout, task, tier, prefix, cancel_token, session
+        )
+        return ContentStream(chunks, lambda ttft: self._ttft.observe(ttft, task=task))
+
+    def cover_letter_prompt(self, resume: str, job_description: str,
+                            additional_info: Dict = None) -> BuiltPrompt:
+        """Build the cover letter prompt within its token budget."""
+        from .prompts import COVER_LETTER_PROMPT
+
+        return build_context_prompt(
+            "cover_letter",
+            COVER_LETTER_PROMPT,
+            resume,
+            job_description,
+            additional_info=additional_info or {}
+        )
+
+    def analysis_prompt(self, resume: str, job_description: str) -> BuiltPrompt:
+        """Build the resume analysis prompt within its token budget."""
+        from .prompts import RESUME_ANALYSIS_PROMPT
+
+        return build_context_prompt("analysis", RESUME_ANALYSIS_PROMPT, resume, job_description)
+
+    async def agenerate_cover_letter(self, resume: str, job_description: str,
+                                     additional_info: Dict = None) -> Optional[str]:
         """
         Generate a tailored cover letter.
         
@@ -44,17 +733,30 @@ class GeminiClient:
         Returns:
             Optional[str]: Generated cover letter or None if error
         """
-        from .prompts import COVER_LETTER_PROMPT
-        
-        prompt = COVER_LETTER_PROMPT.format(
-            resume=resume,
-            job_description=job_description,
-            additional_info=additional_info or {}
+        prompt = self.cover_letter_prompt(resume, job_description, additional_info)
+        return await self.agenerate_content(prompt, task="cover_letter")
+
+    def generate_cover_letter(self, resume: str, job_description: str,
+                            additional_info: Dict = None,
+                            cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Blocking wrapper around agenerate_cover_letter."""
+        return self.generate_content(
+            self.cover_letter_prompt(resume, job_description, additional_info),
+            task="cover_letter",
+            cancel_token=cancel_token
         )
-        
-        return self.generate_content(prompt)
-    
-    def analyze_resume(self, resume: str, job_description: str) -> Optional[str]:
+
+    def stream_cover_letter(self, resume: str, job_description: str,
+                            additional_info: Dict = None,
+                            cancel_token: Optional[CancellationToken] = None) -> ContentStream:
+        """Stream a tailored cover letter chunk by chunk."""
+        return self.stream_content(
+            self.cover_letter_prompt(resume, job_description, additional_info),
+            task="cover_letter",
+            cancel_token=cancel_token
+        )
+
+    async def aanalyze_resume(self, resume: str, job_description: str) -> Optional[str]:
         """
         Analyze resume and provide improvement suggestions.
         
@@ -65,32 +767,49 @@ class GeminiClient:
         Returns:
             Optional[str]: Analysis and suggestions or None if error
         """
-        from .prompts import RESUME_ANALYSIS_PROMPT
-        
-        prompt = RESUME_ANALYSIS_PROMPT.format(
-            resume=resume,
-            job_description=job_description
+        prompt = self.analysis_prompt(resume, job_description)
+        return await self.agenerate_content(prompt, task="analysis")
+
+    def analyze_resume(self, resume: str, job_description: str,
+                       cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Blocking wrapper around aanalyze_resume."""
+        return self.generate_content(
+            self.analysis_prompt(resume, job_description), task="analysis", cancel_token=cancel_token
         )
-        
-        return self.generate_content(prompt)
-    
-    def check_api_connection(self) -> bool:
+
+    def stream_resume_analysis(self, resume: str, job_description: str,
+                               cancel_token: Optional[CancellationToken] = None) -> ContentStream:
+        """Stream a resume analysis chunk by chunk."""
+        return self.stream_content(
+            self.analysis_prompt(resume, job_description), task="analysis", cancel_token=cancel_token
+        )
+
+    def check_api_connection(self, force: bool = False) -> bool:
         """
         Check if the API connection is working.
         
+        Uses the cached metadata probe from the health monitor, so it never
+        issues a billed generation request.
+
+        Args:
+            force (bool): Probe now instead of using a recent result
+            
         Returns:
             bool: True if connection is working, False otherwise
         """
         try:
-            test_response = self.generate_content("Test connection")
-            return test_response is not None
+            return self.health.check(force=force).healthy
         except Exception:
             return False
 
 # Global client instance
 _client = None
 def get_gemini_client() -> GeminiClient:
+    """Get or create the client for the backend selected by LLM_BACKEND, one model per tier."""
     global _client
     if _client is None:
-        _client = GeminiClient()
-    return _client
\ No newline at end of file
+        _client = GeminiClient(backends={
+            tier: create_backend(model, LLM_BACKEND) for tier, model in MODEL_TIERS.items()
+        })
+    return _client
+
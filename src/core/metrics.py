@@ -0,0 +1,289 @@
+"""
+In-process metrics registry with Prometheus-text and JSON exporters.
+
+Counters and histograms are labelled (e.g. by task type). Components that
+already keep their own counters (cache, resilience layer) register collectors
+that are read at scrape time instead of being duplicated here.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from ..config.settings import METRICS_CONFIG
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+SIZE_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    items = list(key) + list((extra or {}).items())
+    if not items:
+        return ""
+    escaped = (
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in items
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """Monotonically increasing labelled counter."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in self.values.items()]
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {_format_labels(key) or "total": value for key, value in self.values.items()}
+
+
+class Histogram:
+    """Labelled histogram with cumulative buckets, sum and count."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.values.get(key)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self.values[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, series in self.values.items():
+                for bound, count in zip(self.buckets, series["counts"]):
+                    samples.append((f"{self.name}_bucket", key, {"le": str(bound)}, count))
+                samples.append((f"{self.name}_bucket", key, {"le": "+Inf"}, series["count"]))
+                samples.append((f"{self.name}_sum", key, None, series["sum"]))
+                samples.append((f"{self.name}_count", key, None, series["count"]))
+        return samples
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                _format_labels(key) or "total": {
+                    "count": series["count"],
+                    "sum": series["sum"],
+                    "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+                    "buckets": dict(zip(map(str, self.buckets), series["counts"])),
+                }
+                for key, series in self.values.items()
+            }
+
+
+class MetricsRegistry:
+    """Registry of named metrics and scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._health_check: Optional[Callable[[], Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help)
+            return self._metrics[name]
+
+    def histogram(self, name: str, help: str = "", buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help, buckets)
+            return self._metrics[name]
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Register a callable whose stats are exported as gauges at scrape time.
+
+        Numeric values become ``<prefix>_<key>`` gauges; string values become
+        ``<prefix>_<key>{value="..."} 1``.
+
+        Args:
+            prefix (str): Metric name prefix, e.g. "llm_cache"
+            collect (Callable[[], Dict[str, Any]]): Returns current stats
+        """
+        with self._lock:
+            self._collectors[prefix] = collect
+
+    def set_health_check(self, check: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Set the callable served at /health.
+
+        Args:
+            check (Callable[[], Dict[str, Any]]): Returns a JSON-serializable
+                status with a boolean "healthy" key
+        """
+        self._health_check = check
+
+    def health(self) -> Optional[Dict[str, Any]]:
+        """Run the health check, if one is set."""
+        return self._health_check() if self._health_check else None
+
+    def _collected(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        collected = {}
+        for prefix, collect in collectors.items():
+            try:
+                collected[prefix] = collect()
+            except Exception:
+                continue
+        return collected
+
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Prometheus text
+        """
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key, extra)} {value}")
+
+        for prefix, stats in self._collected().items():
+            for key, value in stats.items():
+                name = f"{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                if isinstance(value, str):
+                    lines.append(f'{name}{{value="{value}"}} 1')
+                elif isinstance(value, (int, float)):
+                    lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable snapshot of all metrics.
+
+        Returns:
+            Dict[str, Any]: Metric name -> labelled values
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        snapshot = {metric.name: metric.snapshot() for metric in metrics}
+        snapshot.update(self._collected())
+        return snapshot
+
+    def dump_json(self, path: str) -> None:
+        """Write the JSON snapshot to a file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=2, default=str)
+
+
+def _make_handler(registry: MetricsRegistry):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            status = 200
+            if self.path == "/metrics":
+                body = registry.to_prometheus().encode("utf-8")
+                content_type = "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body = json.dumps(registry.to_json(), default=str).encode("utf-8")
+                content_type = "application/json"
+            elif self.path == "/health":
+                health = registry.health()
+                if health is None:
+                    self.send_error(404)
+                    return
+                status = 200 if health.get("healthy") else 503
+                body = json.dumps(health, default=str).encode("utf-8")
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+# Global registry and exporter
+_registry = None
+_exporter = None
+_exporter_lock = threading.Lock()
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get or create the shared metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def start_metrics_server(port: Optional[int] = None, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """
+    Start the /metrics, /metrics.json and /health exporter once per process.
+
+    Args:
+        port (Optional[int]): Port to bind, defaults to METRICS_CONFIG; 0 disables it
+        host (str): Interface to bind
+
+    Returns:
+        Optional[ThreadingHTTPServer]: The running server, or None if disabled
+    """
+    global _exporter
+    port = METRICS_CONFIG["exporter_port"] if port is None else port
+    if not port:
+        return None
+    with _exporter_lock:
+        if _exporter is None:
+            try:
+                _exporter = ThreadingHTTPServer((host, port), _make_handler(get_metrics_registry()))
+            except OSError:
+                return None
+            threading.Thread(target=_exporter.serve_forever, name="metrics-exporter", daemon=True).start()
+        return _exporter
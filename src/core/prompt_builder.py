@@ -0,0 +1,277 @@
+"""
+Token-budget-aware prompt assembly.
+
+Each task has a per-field input budget in tokens. Inputs that exceed it are
+trimmed in stages, cheapest and least lossy first, instead of being rejected:
+
+1. whitespace  - collapse repeated spaces and blank lines
+2. boilerplate - drop duplicate lines and legal/marketing boilerplate
+3. older_experience - drop the oldest experience entries (or dated blocks)
+4. truncate    - cut at a line boundary as a last resort
+
+Prompts over the resume and job description are built with
+build_context_prompt: the inputs form a canonical prefix, fitted to the
+"shared_context" budget so it is byte-identical for every task, followed by
+the task instructions. Providers can then cache the prefix once per inputs.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from ..config.settings import PROMPT_TOKEN_BUDGETS
+from .prompts import RESUME_CONTEXT_PROMPT, SHARED_CONTEXT_PROMPT
+from .resume_document import get_resume_document
+
+_SPACES = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n(\s*\n)+")
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+_BOILERPLATE = re.compile(
+    r"equal opportunity|affirmative action|reasonable accommodation|without regard to|"
+    r"protected veteran|e-verify|privacy (policy|notice)|cookie|all rights reserved|"
+    r"follow us on|apply now|click (here|apply)|share this job|recruitment agencies|"
+    r"unsolicited resumes|references available upon request",
+    re.IGNORECASE
+)
+TRUNCATION_MARKER = "\n[...truncated to fit the input budget]"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in text without calling the API.
+
+    Uses the common ~4 characters per token approximation for English text.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return math.ceil(len(text) / 4) if text else 0
+
+
+@dataclass
+class FieldReport:
+    """Budget outcome for one prompt input field."""
+    budget: int
+    tokens_before: int
+    tokens_after: int
+    stages: List[str] = field(default_factory=list)
+
+    @property
+    def trimmed(self) -> bool:
+        return self.tokens_after < self.tokens_before
+
+
+@dataclass
+class BuiltPrompt:
+    """A prompt assembled within its task budget, plus the budget report."""
+    task: str
+    text: str
+    fields: Dict[str, FieldReport] = field(default_factory=dict)
+    prefix: str = ""  # shared context at the start of text, "" if none
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    @property
+    def suffix(self) -> str:
+        """The task-specific part of the prompt after the shared prefix."""
+        return self.text[len(self.prefix):]
+
+    def report(self) -> Dict:
+        """Summarize the budget outcome for logging and metrics."""
+        return {
+            "task": self.task,
+            "prompt_tokens": self.tokens,
+            "prefix_tokens": estimate_tokens(self.prefix),
+            "fields": {
+                name: {
+                    "budget": r.budget,
+                    "tokens_before": r.tokens_before,
+                    "tokens_after": r.tokens_after,
+                    "stages": r.stages,
+                }
+                for name, r in self.fields.items()
+            },
+        }
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _collapse_whitespace(text: str) -> str:
+    lines = [_SPACES.sub(" ", line).strip() for line in text.splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _drop_boilerplate(text: str) -> str:
+    seen = set()
+    kept = []
+    for line in text.split("\n"):
+        key = line.strip().lower()
+        if key and (key in seen or _BOILERPLATE.search(key)):
+            continue
+        if key:
+            seen.add(key)
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def _drop_older_experience(text: str, budget: int) -> str:
+    """
+    Remove experience entries, oldest first, until the text fits the budget.
+
+    Uses the parsed experience section when the resume has one, so education
+    and other dated sections are kept; otherwise falls back to dated blocks.
+    """
+    entries = [e for e in get_resume_document(text).experience if e.latest_year is not None]
+    if len(entries) > 1:
+        # Never drop the most recent entry
+        entries.sort(key=lambda e: e.latest_year)
+        removed = []
+        tokens = estimate_tokens(text)
+        for entry in entries[:-1]:
+            if tokens <= budget:
+                break
+            removed.append(entry)
+            tokens -= estimate_tokens(text[entry.start:entry.end])
+        removed.sort(key=lambda e: e.start)
+        kept = []
+        position = 0
+        for entry in removed:
+            kept.append(text[position:entry.start])
+            # Keep the blank lines that separate the entry from what follows
+            position = entry.start + len(text[entry.start:entry.end].rstrip()) + 1
+        kept.append(text[position:])
+        return "".join(kept)
+
+    blocks = text.split("\n\n")
+    dated = []
+    for i, block in enumerate(blocks):
+        years = [int(y) for y in _YEAR.findall(block)]
+        if years:
+            dated.append((max(years), i))
+    # Never drop the most recent dated block
+    dated.sort()
+    removed = set()
+    tokens = estimate_tokens(text)
+    for _, i in dated[:-1]:
+        if tokens <= budget:
+            break
+        removed.add(i)
+        tokens -= estimate_tokens(blocks[i]) + 1
+    return "\n\n".join(b for i, b in enumerate(blocks) if i not in removed)
+
+
+def _truncate(text: str, budget: int) -> str:
+    max_chars = max(0, budget * 4 - len(TRUNCATION_MARKER))
+    cut = text[:max_chars]
+    newline = cut.rfind("\n")
+    if newline > max_chars // 2:
+        cut = cut[:newline]
+    return cut.rstrip() + TRUNCATION_MARKER
+
+
+def fit_to_budget(text: str, budget: int, allow_drop_experience: bool = False) -> Tuple[str, FieldReport]:
+    """
+    Trim text until it fits the token budget.
+
+    Args:
+        text (str): Input text
+        budget (int): Maximum tokens for this field
+        allow_drop_experience (bool): Whether dated blocks may be removed
+            (only sensible for resumes)
+
+    Returns:
+        Tuple[str, FieldReport]: Trimmed text and what was done to it
+    """
+    text = text or ""
+    report = FieldReport(budget=budget, tokens_before=estimate_tokens(text), tokens_after=0)
+    if report.tokens_before > budget:
+        stages = [
+            ("whitespace", _collapse_whitespace),
+            ("boilerplate", _drop_boilerplate),
+        ]
+        if allow_drop_experience:
+            stages.append(("older_experience", lambda t: _drop_older_experience(t, budget)))
+        stages.append(("truncate", lambda t: _truncate(t, budget)))
+
+        for name, stage in stages:
+            if estimate_tokens(text) <= budget:
+                break
+            trimmed = stage(text)
+            if trimmed != text:
+                report.stages.append(name)
+                text = trimmed
+
+    report.tokens_after = estimate_tokens(text)
+    return text, report
+
+
+def get_task_budget(task: str) -> Dict[str, int]:
+    """Get the per-field token budgets for a task."""
+    return PROMPT_TOKEN_BUDGETS.get(task, PROMPT_TOKEN_BUDGETS["default"])
+
+
+def build_prompt(task: str, template: str, **fields) -> BuiltPrompt:
+    """
+    Fill a prompt template, fitting each budgeted field to the task budget.
+
+    Fields without a budget (e.g. additional_info) are inserted unchanged.
+
+    Args:
+        task (str): Task name, used to look up budgets and label metrics
+        template (str): str.format template
+        **fields: Template fields
+
+    Returns:
+        BuiltPrompt: The assembled prompt and its budget report
+    """
+    budgets = get_task_budget(task)
+    reports = {}
+    values = {}
+    for name, value in fields.items():
+        if name in budgets and isinstance(value, str):
+            value, reports[name] = fit_to_budget(value, budgets[name], allow_drop_experience=(name == "resume"))
+        values[name] = value
+    return BuiltPrompt(task=task, text=template.format(**values), fields=reports)
+
+
+def build_context_prompt(task: str, instructions: str, resume: str,
+                         job_description: Optional[str] = None, **fields) -> BuiltPrompt:
+    """
+    Build a prompt as a shared resume/job description prefix plus task instructions.
+
+    The prefix depends only on the inputs, never on the task, so follow-up
+    tasks on the same resume and job description can reuse a cached context.
+    Resume-only prompts use RESUME_CONTEXT_PROMPT, which is itself a prefix
+    of the full context.
+
+    Args:
+        task (str): Task name, used to look up budgets for the other fields
+        instructions (str): str.format template for the task suffix
+        resume (str): The user's resume content
+        job_description (Optional[str]): The job description, None for resume-only tasks
+        **fields: Other fields referenced by the instructions
+
+    Returns:
+        BuiltPrompt: The assembled prompt, with prefix set to the shared context
+    """
+    budgets = PROMPT_TOKEN_BUDGETS["shared_context"]
+    reports = {}
+    resume, reports["resume"] = fit_to_budget(resume, budgets["resume"], allow_drop_experience=True)
+    if job_description is None:
+        prefix = RESUME_CONTEXT_PROMPT.format(resume=resume)
+    else:
+        job_description, reports["job_description"] = fit_to_budget(
+            job_description, budgets["job_description"]
+        )
+        prefix = SHARED_CONTEXT_PROMPT.format(resume=resume, job_description=job_description)
+
+    suffix = build_prompt(task, instructions, **fields)
+    reports.update(suffix.fields)
+    return BuiltPrompt(task=task, text=prefix + suffix.text.lstrip("\n"), fields=reports, prefix=prefix)
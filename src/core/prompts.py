@@ -1,12 +1,21 @@
-COVER_LETTER_PROMPT = """
-You are an expert career counselor and professional writer. Create a compelling, personalized cover letter based on the following information:
-
-RESUME:
+# Prompts that read the resume (and job description) are assembled as
+# SHARED_CONTEXT_PROMPT (or RESUME_CONTEXT_PROMPT) followed by task instructions,
+# so every task on the same inputs shares an identical, cacheable prefix.
+# RESUME_CONTEXT_PROMPT is itself a prefix of SHARED_CONTEXT_PROMPT.
+RESUME_CONTEXT_PROMPT = """RESUME:
 {resume}
 
-JOB DESCRIPTION:
+"""
+
+SHARED_CONTEXT_PROMPT = RESUME_CONTEXT_PROMPT + """JOB DESCRIPTION:
 {job_description}
 
+"""
+
+COVER_LETTER_PROMPT = """
+TASK:
+You are an expert career counselor and professional writer. Create a compelling, personalized cover letter based on the resume and job description above and the following information:
+
 ADDITIONAL INFORMATION:
 {additional_info}
 
@@ -33,13 +42,8 @@ Make the cover letter sound natural and authentic, not generic or template-like.
 """
 
 RESUME_ANALYSIS_PROMPT = """
-You are an expert resume reviewer and career coach. Analyze the following resume against the job description and provide detailed, actionable feedback.
-
-RESUME:
-{resume}
-
-JOB DESCRIPTION:
-{job_description}
+TASK:
+You are an expert resume reviewer and career coach. Analyze the resume above against the job description and provide detailed, actionable feedback.
 
 ANALYSIS REQUIREMENTS:
 Provide a comprehensive analysis with the following sections:
@@ -86,19 +90,16 @@ Be specific, actionable, and constructive. Focus on helping the candidate improv
 """
 
 QUICK_TIPS_PROMPT = """
-Based on this resume and job description, provide 5 quick, actionable tips to improve the application:
-
-RESUME: {resume}
-JOB DESCRIPTION: {job_description}
+TASK:
+Based on the resume and job description above, provide quick, actionable tips to improve the application.
 
 Provide exactly 7 bullet points with specific, actionable advice. Keep each tip under 50 words and focus on practical suggestions.
 And a new ATS friendly format for the resume and summary for the Job Description.
 """
 
 SKILLS_EXTRACTION_PROMPT = """
-Extract and categorize the key skills from this resume:
-
-RESUME: {resume}
+TASK:
+Extract and categorize the key skills from the resume above.
 
 Categorize skills into:
 - Technical Skills
@@ -107,4 +108,66 @@ Categorize skills into:
 - Certifications/Qualifications
 
 Return as a structured list with each category clearly labeled.
-"""
\ No newline at end of file
+"""
+
+FUSED_ANALYSIS_PROMPT = """
+TASK:
+You are an expert resume reviewer and career coach. Review the resume above against the job description and complete ALL of the tasks below in a single JSON response.
+
+TASKS (one JSON field each; text values formatted as Markdown):
+- analysis: Comprehensive analysis with OVERALL MATCH SCORE (1-10), STRENGTHS, GAPS & WEAKNESSES, SPECIFIC IMPROVEMENTS, KEYWORD OPTIMIZATION, FORMATTING & STRUCTURE SUGGESTIONS, ACTION ITEMS and an ATS FRIENDLY RESUME
+- quick_tips: Exactly 7 bullet points of specific, actionable advice, each under 50 words
+- keyword_suggestions: Important job description keywords missing from the resume, how to incorporate them naturally, and ATS tips, ranked by importance
+- formatting_suggestions: Structure, section ordering, presentation, length and formatting best practices
+- match_score: Object with overall_score (integer 1-10), skills_match, experience_match and education_match (percentages 0-100), strengths (key strengths that align) and gaps (major gaps)
+- improvement_priority: HIGH / MEDIUM / LOW priority action plan, explaining why each item matters and how to implement it
+
+Be specific, actionable, and constructive. Return only the JSON object.
+"""
+
+MATCH_SCORE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "overall_score": {"type": "INTEGER", "description": "Overall match from 1 to 10"},
+        "skills_match": {"type": "NUMBER", "description": "Skills match percentage, 0-100"},
+        "experience_match": {"type": "NUMBER", "description": "Experience match percentage, 0-100"},
+        "education_match": {"type": "NUMBER", "description": "Education/qualifications match percentage, 0-100"},
+        "strengths": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "gaps": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["overall_score", "skills_match", "experience_match", "education_match", "strengths", "gaps"],
+}
+
+MATCH_SCORE_REPAIR_PROMPT = """
+The JSON below was supposed to describe a resume-to-job match score but failed validation.
+
+VALIDATION ERROR:
+{error}
+
+JSON:
+{raw}
+
+Return ONLY the corrected JSON object with exactly these fields:
+- overall_score: integer from 1 to 10
+- skills_match, experience_match, education_match: numbers from 0 to 100
+- strengths, gaps: lists of short strings
+Keep the original assessment; only fix the structure and value ranges.
+"""
+
+FUSED_ANALYSIS_SECTIONS = [
+    "analysis",
+    "quick_tips",
+    "keyword_suggestions",
+    "formatting_suggestions",
+    "match_score",
+    "improvement_priority",
+]
+
+FUSED_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        section: MATCH_SCORE_SCHEMA if section == "match_score" else {"type": "STRING"}
+        for section in FUSED_ANALYSIS_SECTIONS
+    },
+    "required": FUSED_ANALYSIS_SECTIONS,
+}
@@ -0,0 +1,328 @@
+"""
+Resilience layer for upstream LLM calls.
+
+Combines exponential backoff with jitter (honoring Retry-After), a token
+bucket rate limiter sized to the API quota, and a circuit breaker that fails
+fast while the upstream is unhealthy. Errors are classified by HTTP status
+code, so the layer works the same against Gemini and any HTTP stand-in.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..config.settings import RESILIENCE_CONFIG
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+    def __init__(self, retry_in: float):
+        super().__init__(f"AI service is temporarily unavailable, retry in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+def status_code_of(exc: BaseException) -> Optional[int]:
+    """
+    Get the HTTP status code carried by an exception, if any.
+
+    Args:
+        exc (BaseException): Exception raised by the upstream call
+
+    Returns:
+        Optional[int]: HTTP status code or None
+    """
+    for attr in ("code", "status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return value if isinstance(value, int) else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """
+    Get the server-requested retry delay from an exception, if any.
+
+    Looks at an explicit ``retry_after`` attribute, a ``Retry-After`` response
+    header (seconds or HTTP date) and Google RPC ``RetryInfo`` details.
+
+    Args:
+        exc (BaseException): Exception raised by the upstream call
+
+    Returns:
+        Optional[float]: Delay in seconds or None
+    """
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or getattr(exc, "headers", None)
+        if headers is not None:
+            value = headers.get("Retry-After")
+
+    if value is not None:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+
+    for detail in getattr(exc, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            return getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether an exception represents a transient upstream failure."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return status_code_of(exc) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Token bucket rate limiter for coroutines running on one event loop."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = None
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until the requested number of tokens is available."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                self.waits += 1
+                self.wait_seconds += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= tokens
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open circuit breaker.
+
+    After ``failure_threshold`` consecutive upstream failures the circuit
+    opens and calls fail fast for ``recovery_timeout`` seconds. A single trial
+    call is then let through; success closes the circuit, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejections = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not reach the upstream."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            elapsed = time.monotonic() - self.opened_at
+            if self.state == self.OPEN and elapsed >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            self.rejections += 1
+            raise CircuitOpenError(max(0.0, self.recovery_timeout - elapsed))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Free the half-open trial slot after a non-upstream error."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being rejected (before the half-open trial)."""
+        with self._lock:
+            return self.state == self.OPEN
+
+
+class ResiliencePolicy:
+    """Retry, rate limiting and circuit breaking around an async upstream call."""
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or RESILIENCE_CONFIG
+        self.max_attempts = config.get("max_attempts", 4)
+        self.base_delay = config.get("base_delay", 1.0)
+        self.max_delay = config.get("max_delay", 30.0)
+        self.max_retry_after = config.get("max_retry_after", 60.0)
+        self.rate_limiter = TokenBucket(
+            config.get("requests_per_minute", 60) / 60.0,
+            config.get("burst", 5)
+        )
+        self.breaker = CircuitBreaker(
+            config.get("failure_threshold", 5),
+            config.get("recovery_timeout", 30.0)
+        )
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "retry_wait_seconds": 0.0}
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before the next attempt.
+
+        Uses exponential backoff with full jitter, but never waits less than
+        the server asked for via Retry-After.
+
+        Args:
+            attempt (int): Zero-based index of the attempt that just failed
+            retry_after (Optional[float]): Server-requested delay in seconds
+
+        Returns:
+            float: Delay in seconds
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        Call an upstream coroutine function with retries.
+
+        timeout bounds the whole call, retries and backoff included: each
+        attempt gets only the time left, and no retry is made whose backoff
+        would end past the deadline. Retrying also stops as soon as the
+        circuit breaker opens.
+
+        Args:
+            fn (Callable[[], Awaitable[Any]]): Zero-argument coroutine function
+            timeout (Optional[float]): Overall deadline in seconds, or None for no limit
+
+        Returns:
+            Any: Result of the first successful attempt
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            asyncio.TimeoutError: If the deadline passes
+            Exception: The last upstream error once retries are exhausted
+        """
+        self._count("calls")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                # Inside the try: a call cancelled while waiting for a token must free the trial slot
+                await self.rate_limiter.acquire()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                # Spent waiting for a token; the upstream was not called
+                self.breaker.release()
+                self._count("failures")
+                raise asyncio.TimeoutError()
+
+            try:
+                self._count("attempts")
+                result = await (fn() if remaining is None else asyncio.wait_for(fn(), remaining))
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    self.breaker.release()
+                    self._count("failures")
+                    raise
+                self.breaker.record_failure()
+
+                retry_after = retry_after_seconds(e)
+                delay = self.backoff_delay(attempt, retry_after)
+                if (attempt + 1 >= self.max_attempts
+                        or (retry_after is not None and retry_after > self.max_retry_after)
+                        or (deadline is not None and time.monotonic() + delay >= deadline)
+                        # A retry would only be rejected with CircuitOpenError
+                        or self.breaker.is_open):
+                    self._count("failures")
+                    raise
+
+                self._count("retries")
+                self._count("retry_wait_seconds", delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get retry, rate limiter and circuit breaker state.
+
+        Returns:
+            Dict[str, Any]: Resilience statistics
+        """
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update({
+            "breaker_state": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "breaker_rejections": self.breaker.rejections,
+            "consecutive_failures": self.breaker.failures,
+            "rate_limit_waits": self.rate_limiter.waits,
+            "rate_limit_wait_seconds": self.rate_limiter.wait_seconds,
+        })
+        return stats
+
+
+# Global resilience policies, one per model tier (rate limits and outages are per model)
+_policies: Dict[str, ResiliencePolicy] = {}
+
+def get_resilience_policy(name: str = "heavy") -> ResiliencePolicy:
+    """Get or create the shared resilience policy for a model tier."""
+    if name not in _policies:
+        _policies[name] = ResiliencePolicy()
+    return _policies[name]
@@ -0,0 +1,318 @@
+"""
+Structured view of a resume, parsed once per text.
+
+Extracted resume text is a flat string, and each consumer (contact lookup,
+skill matching, prompt trimming) used to rescan all of it. parse_resume makes
+one pass over the lines, finds section headings with a heading/layout
+heuristic and records character offsets into the original text, so consumers
+can slice out just the section they need. get_resume_document caches the
+result by a hash of the text.
+
+Heading heuristic: a short line that names a known section ("Experience",
+"Work History", "Skills"...), optionally followed by a colon, or a short
+all-caps line. Experience entries start at lines with a date range, taking
+the title line just above them; education entries start at degree or
+institution lines.
+"""
+
+import bisect
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .cache import LRUCache, make_cache_key
+
+# Bump when parsing changes so cached documents are rebuilt
+PARSER_VERSION = 1
+
+# Slots keep the many small entries compact; dataclass(slots=True) needs Python 3.10
+_dataclass = dataclass(slots=True) if sys.version_info >= (3, 10) else dataclass
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"),
+    "experience": ("experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "relevant experience"),
+    "education": ("education", "academic background", "education and training", "qualifications",
+                  "academic qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "competencies", "key skills",
+               "skills and abilities", "technologies", "tools", "areas of expertise", "expertise"),
+    "projects": ("projects", "personal projects", "selected projects", "key projects"),
+    "certifications": ("certifications", "certificates", "licenses", "licenses and certifications"),
+    "publications": ("publications", "research", "papers"),
+    "awards": ("awards", "honors", "honors and awards", "achievements"),
+    "languages": ("languages",),
+    "volunteering": ("volunteering", "volunteer experience", "community involvement"),
+}
+_HEADING_KINDS = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+_MAX_HEADING_LENGTH = 40
+
+_EMAIL = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+_PHONE = re.compile(r"(?<![\w+])(?:\+\d{1,2}\s?)?(?:\(\d{3}\)|\d{3})[\s.-]?\d{3}[\s.-]?\d{4}\b")
+_LINKEDIN = re.compile(r"linkedin\.com/in/[\w-]+")
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+)?(?:\d{{1,2}}/)?(?:19|20)\d\d"
+_DATE_RANGE = re.compile(
+    rf"\b{_DATE}\s*(?:-|–|—|to)\s*(?:{_DATE}|present|current|now|today)\b", re.IGNORECASE
+)
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+_DEGREE = re.compile(
+    r"\b(?:bachelor|master|doctor|ph\.?d|mba|b\.?sc?|m\.?sc?|b\.?a|m\.?a|b\.?eng|m\.?eng|"
+    r"associate|diploma|university|college|institute|school)\b",
+    re.IGNORECASE
+)
+_BULLET = re.compile(r"^\s*(?:[-*•●▪◦‣·]|\d+[.)])\s+")
+_SKILL_SEPARATORS = re.compile(r"[,;|•●▪·\n]+")
+_NAME = re.compile(r"^[A-Za-z][A-Za-z.'-]*(?:\s+[A-Za-z][A-Za-z.'-]*){1,3}$")
+
+
+@_dataclass
+class Section:
+    """A headed section; start and end are offsets into ResumeDocument.text."""
+    kind: str  # a SECTION_HEADINGS key, "header" for text before the first heading, or "other"
+    heading: str
+    start: int
+    end: int
+
+
+@_dataclass
+class ContactInfo:
+    """Contact details found in the resume header."""
+    name: str = ""
+    email: str = ""
+    phone: str = ""
+    linkedin: str = ""
+
+
+@_dataclass
+class ExperienceEntry:
+    """One position in the experience section."""
+    title: str
+    dates: str
+    start: int
+    end: int
+
+    @property
+    def latest_year(self) -> Optional[int]:
+        years = [int(y) for y in _YEAR.findall(self.dates)]
+        if re.search(r"present|current|now|today", self.dates, re.IGNORECASE):
+            return 9999
+        return max(years) if years else None
+
+
+@_dataclass
+class EducationEntry:
+    """One degree or institution in the education section."""
+    title: str
+    start: int
+    end: int
+
+
+@_dataclass
+class ResumeDocument:
+    """Resume text with its sections and entries located by character offsets."""
+    text: str
+    sections: List[Section] = field(default_factory=list)
+    contact: ContactInfo = field(default_factory=ContactInfo)
+    experience: List[ExperienceEntry] = field(default_factory=list)
+    education: List[EducationEntry] = field(default_factory=list)
+    skills: List[str] = field(default_factory=list)
+
+    def section(self, kind: str) -> Optional[Section]:
+        """Get the first section of a kind, if the resume has one."""
+        for section in self.sections:
+            if section.kind == kind:
+                return section
+        return None
+
+    def section_text(self, kind: str) -> str:
+        """Get the body text of every section of a kind ("" if there is none)."""
+        return "\n".join(
+            self.text[s.start:s.end].strip() for s in self.sections if s.kind == kind
+        ).strip()
+
+    @property
+    def summary(self) -> str:
+        return self.section_text("summary")
+
+    def to_dict(self) -> Dict:
+        """Get a JSON-serializable view, with section bodies instead of offsets."""
+        return {
+            "contact": {name: getattr(self.contact, name) for name in ("name", "email", "phone", "linkedin")},
+            "sections": [
+                {"kind": s.kind, "heading": s.heading, "start": s.start, "end": s.end} for s in self.sections
+            ],
+            "summary": self.summary,
+            "experience": [
+                {"title": e.title, "dates": e.dates, "text": self.text[e.start:e.end].strip()}
+                for e in self.experience
+            ],
+            "education": [{"title": e.title, "text": self.text[e.start:e.end].strip()} for e in self.education],
+            "skills": list(self.skills),
+        }
+
+
+def _lines(text: str) -> List[Tuple[int, int, str]]:
+    """Split text into (start offset, end offset, stripped line) tuples."""
+    lines = []
+    start = 0
+    for line in text.split("\n"):
+        end = start + len(line)
+        lines.append((start, end, line.strip()))
+        start = end + 1
+    return lines
+
+
+def _heading_kind(line: str) -> Optional[str]:
+    """Classify a line as a section heading, or None."""
+    if not line or len(line) > _MAX_HEADING_LENGTH or _BULLET.match(line):
+        return None
+    key = re.sub(r"[^a-z& ]+", "", line.lower().replace("&", "and")).strip()
+    key = re.sub(r"\s+", " ", key)
+    if key in _HEADING_KINDS:
+        return _HEADING_KINDS[key]
+    # Unknown all-caps headings ("VOLUNTEER WORK") still end the previous section
+    letters = [c for c in line if c.isalpha()]
+    if len(letters) >= 4 and all(c.isupper() for c in letters) and not any(c.isdigit() for c in line):
+        return "other"
+    return None
+
+
+def _segment(text: str, lines: List[Tuple[int, int, str]]) -> List[Section]:
+    sections = []
+    current = Section("header", "", 0, len(text))
+    for start, end, line in lines:
+        kind = _heading_kind(line)
+        if kind is None:
+            continue
+        current.end = start
+        sections.append(current)
+        current = Section(kind, line.rstrip(":"), min(end + 1, len(text)), len(text))
+    sections.append(current)
+    return [s for s in sections if s.kind != "header" or text[s.start:s.end].strip()]
+
+
+def _section_lines(lines: List[Tuple[int, int, str]], section: Section) -> List[Tuple[int, int, str]]:
+    # Lines are sorted by offset, so a section's lines are one contiguous slice
+    first = bisect.bisect_left(lines, (section.start,))
+    last = bisect.bisect_left(lines, (section.end,))
+    return lines[first:last]
+
+
+def _parse_contact(text: str, header: Optional[Section]) -> ContactInfo:
+    # Contact details live in the header; fall back to the whole text if it has none
+    region = text[header.start:header.end] if header is not None else text[:500]
+    contact = ContactInfo()
+    for name, pattern in (("email", _EMAIL), ("phone", _PHONE), ("linkedin", _LINKEDIN)):
+        match = pattern.search(region) or pattern.search(text)
+        if match:
+            setattr(contact, name, match.group(0))
+    for line in region.split("\n"):
+        line = line.strip()
+        if line:
+            if _NAME.match(line) and _heading_kind(line) is None:
+                contact.name = line
+            break
+    return contact
+
+
+def _parse_experience(lines: List[Tuple[int, int, str]], section: Section) -> List[ExperienceEntry]:
+    entries = []
+    previous = None
+    for start, end, line in _section_lines(lines, section):
+        match = _DATE_RANGE.search(line) if line else None
+        if match:
+            # The title usually sits on the line above the dates, unless that line is a bullet
+            entry_start, title = start, line
+            if previous is not None and previous[2] and not _BULLET.match(previous[2]) and \
+                    not _DATE_RANGE.search(previous[2]) and (not entries or previous[0] > entries[-1].start):
+                entry_start, title = previous[0], previous[2]
+            if entries:
+                entries[-1].end = entry_start
+            entries.append(ExperienceEntry(title, match.group(0), entry_start, section.end))
+        previous = (start, end, line)
+    return entries
+
+
+def _parse_education(lines: List[Tuple[int, int, str]], section: Section) -> List[EducationEntry]:
+    entries = []
+    after_blank = True
+    for start, end, line in _section_lines(lines, section):
+        if not line:
+            after_blank = True
+            continue
+        starts_entry = not _BULLET.match(line) and (after_blank or _DEGREE.search(line))
+        # A degree line directly under its institution belongs to the same entry
+        if starts_entry and entries and not after_blank and _DEGREE.search(entries[-1].title):
+            starts_entry = False
+        if starts_entry:
+            if entries:
+                entries[-1].end = start
+            entries.append(EducationEntry(line, start, section.end))
+        after_blank = False
+    return entries
+
+
+def _parse_skills(text: str, sections: List[Section]) -> List[str]:
+    skills = []
+    seen = set()
+    for section in sections:
+        if section.kind != "skills":
+            continue
+        for line in text[section.start:section.end].split("\n"):
+            line = _BULLET.sub("", line.strip())
+            # "Languages: Python, Go" -> "Python, Go"
+            if ":" in line:
+                line = line.split(":", 1)[1]
+            for item in _SKILL_SEPARATORS.split(line):
+                item = item.strip(" .\t")
+                if item and len(item) <= _MAX_HEADING_LENGTH and item.lower() not in seen:
+                    seen.add(item.lower())
+                    skills.append(item)
+    return skills
+
+
+def parse_resume(text: str) -> ResumeDocument:
+    """
+    Parse resume text into sections, contact details and entries.
+
+    Args:
+        text (str): Extracted resume text
+
+    Returns:
+        ResumeDocument: Parsed view; offsets index into text
+    """
+    text = text or ""
+    lines = _lines(text)
+    sections = _segment(text, lines)
+    header = sections[0] if sections and sections[0].kind == "header" else None
+    document = ResumeDocument(text=text, sections=sections, contact=_parse_contact(text, header))
+    for section in sections:
+        if section.kind == "experience":
+            document.experience.extend(_parse_experience(lines, section))
+        elif section.kind == "education":
+            document.education.extend(_parse_education(lines, section))
+    document.skills = _parse_skills(text, sections)
+    return document
+
+
+# Parsed documents shared by every session, keyed by a hash of the text
+_documents = LRUCache(128)
+
+def get_resume_document(text: str) -> ResumeDocument:
+    """
+    Get the parsed document for resume text, parsing it only once.
+
+    Args:
+        text (str): Extracted resume text
+
+    Returns:
+        ResumeDocument: Parsed view (shared; do not modify)
+    """
+    key = make_cache_key("resume_document", PARSER_VERSION, text)
+    document = _documents.get(key)
+    if document is None:
+        document = parse_resume(text)
+        _documents.put(key, document)
+    return document
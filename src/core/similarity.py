@@ -0,0 +1,326 @@
+"""
+Near-duplicate detection for job descriptions with MinHash and LSH.
+
+Reposted jobs differ only in dates, tracking text or the order of benefit
+bullets, so exact-hash caches miss them. Each job description is reduced to a
+MinHash signature over word and number shingles (dates, URLs and punctuation
+removed); an LSH band index finds candidates in a few dictionary lookups and a
+vectorized NumPy comparison estimates their Jaccard similarity. Lookups stay
+in the low milliseconds with tens of thousands of entries.
+
+One changed number barely moves the similarity of a long posting, so a match
+also needs the same key terms: salaries, years of experience and levels.
+
+Entries are scoped per resume: a match means "this resume was already
+processed against a near-identical posting".
+"""
+
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import SIMILARITY_CONFIG
+from .cache import make_cache_key
+from .metrics import get_metrics_registry
+
+_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint32(0xFFFFFFFF)
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_NOISE = re.compile(
+    r"https?://\S+|www\.\S+|\S+@\S+"
+    r"|\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}/\d{2,4}"
+    rf"|{_MONTH}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}|\d{{1,2}}\s+{_MONTH}\s+\d{{4}}"
+)
+_WORD = re.compile(r"[a-z]+|\d+(?:[.,]\d+)*")
+# Salaries, years of experience and levels: postings that differ here are different jobs
+_KEY_TERM = re.compile(
+    r"[$€£]\s?\d[\d,.]*(?:\s?k\b)?"
+    r"|\d+(?:[.,]\d+)?\s?\+?\s?(?:years?|yrs?)\b"
+    r"|\b(?:level|grade|band|l|e|ic)\s?-?\d+\b"
+)
+
+
+def key_terms(text: str) -> FrozenSet[str]:
+    """Salary, experience and level terms of a job description, whitespace removed."""
+    return frozenset(
+        re.sub(r"\s+", "", term).rstrip(".,") for term in _KEY_TERM.findall(_NOISE.sub(" ", text.lower()))
+    )
+
+
+class MinHasher:
+    """Deterministic MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Hash the normalized word shingles of text to 32-bit values."""
+        words = _WORD.findall(_NOISE.sub(" ", text.lower()))
+        k = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+        return np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles if s),
+            dtype=np.uint64, count=-1
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of text.
+
+        Args:
+            text (str): Job description
+
+        Returns:
+            np.ndarray: uint32 array of length num_perm
+        """
+        hashes = self.shingles(text)
+        if not len(hashes):
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return (permuted.min(axis=0) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures with vectorized similarity scoring."""
+
+    def __init__(self, num_perm: int, bands: int, max_entries: Optional[int] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._signatures = np.empty((64, num_perm), dtype=np.uint32)
+        self.keys: List[str] = []
+        self.texts: List[str] = []
+        self.chars = 0
+        self.evictions = 0
+        # Key to position, least recently used first
+        self._positions: "OrderedDict[str, int]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _band(self, signature: np.ndarray, band: int) -> bytes:
+        return signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key: str, signature: np.ndarray, text: str) -> None:
+        """
+        Index a signature and its text under key.
+
+        Re-adding a key only marks it as recently used. Past max_entries the
+        least recently used entry is dropped.
+        """
+        if key in self._positions:
+            self.touch(key)
+            return
+        position = len(self.keys)
+        if position == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        self._signatures[position] = signature
+        self.keys.append(key)
+        self.texts.append(text)
+        self.chars += len(text)
+        self._positions[key] = position
+        for band in range(self.bands):
+            self._buckets[band].setdefault(self._band(signature, band), []).append(position)
+        if self.max_entries is not None and len(self.keys) > self.max_entries:
+            self.remove(next(iter(self._positions)))
+            self.evictions += 1
+
+    def touch(self, key: str) -> None:
+        """Mark key as recently used."""
+        if key in self._positions:
+            self._positions.move_to_end(key)
+
+    def remove(self, key: str) -> None:
+        """Drop key from the index; the last entry moves into its position."""
+        position = self._positions.pop(key)
+        for band in range(self.bands):
+            band_key = self._band(self._signatures[position], band)
+            bucket = self._buckets[band][band_key]
+            bucket.remove(position)
+            if not bucket:
+                del self._buckets[band][band_key]
+        self.chars -= len(self.texts[position])
+
+        last = len(self.keys) - 1
+        if position != last:
+            for band in range(self.bands):
+                bucket = self._buckets[band][self._band(self._signatures[last], band)]
+                bucket[bucket.index(last)] = position
+            self._signatures[position] = self._signatures[last]
+            self.keys[position] = self.keys[last]
+            self.texts[position] = self.texts[last]
+            self._positions[self.keys[position]] = position
+        self.keys.pop()
+        self.texts.pop()
+
+    def query(self, signature: np.ndarray, threshold: float = 0.0) -> List[Tuple[str, str, float]]:
+        """
+        Find the indexed signatures most similar to signature among LSH candidates.
+
+        Args:
+            signature (np.ndarray): Query signature
+            threshold (float): Minimum estimated Jaccard similarity
+
+        Returns:
+            List[Tuple[str, str, float]]: Keys, their texts and estimated
+                Jaccard similarities, most similar first
+        """
+        candidates = set()
+        for band in range(self.bands):
+            candidates.update(self._buckets[band].get(self._band(signature, band), ()))
+        if not candidates:
+            return []
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[positions] == signature).mean(axis=1)
+        order = np.argsort(-similarity, kind="stable")
+        return [
+            (self.keys[positions[i]], self.texts[positions[i]], float(similarity[i]))
+            for i in order if similarity[i] >= threshold
+        ]
+
+
+class NearDuplicateIndex:
+    """
+    Per-resume index of processed job descriptions.
+
+    Job description text is kept next to its signature. Each resume keeps at
+    most max_entries_per_resume postings, least recently used dropped first.
+    Whole resumes are dropped, least recently used first, once the index
+    passes max_entries postings or max_chars characters of text.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        config = config or SIMILARITY_CONFIG
+        self.enabled = config.get("enabled", True)
+        self.threshold = config.get("threshold", 0.85)
+        self.max_entries = config.get("max_entries", 50000)
+        self.max_chars = config.get("max_chars", 20_000_000)
+        self.max_entries_per_resume = config.get("max_entries_per_resume", 1000)
+        self.hasher = MinHasher(config.get("num_perm", 128), config.get("shingle_size", 3))
+        self.bands = config.get("bands", 16)
+        # Resume key to its index, least recently used first
+        self._indexes: "OrderedDict[str, LSHIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"lookups": 0, "hits": 0, "adds": 0, "lookup_seconds": 0.0}
+
+    @staticmethod
+    def _resume_key(resume: str) -> str:
+        return make_cache_key("similarity_resume", resume)
+
+    @staticmethod
+    def _text_key(job_description: str) -> str:
+        return make_cache_key("similarity_job_description", job_description)
+
+    @property
+    def entries(self) -> int:
+        return sum(len(index) for index in self._indexes.values())
+
+    @property
+    def chars(self) -> int:
+        return sum(index.chars for index in self._indexes.values())
+
+    def add(self, resume: str, job_description: str) -> None:
+        """
+        Record that job_description was processed against resume.
+
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The job description
+        """
+        if not self.enabled:
+            return
+        text_key = self._text_key(job_description)
+        signature = self.hasher.signature(job_description)
+        with self._lock:
+            resume_key = self._resume_key(resume)
+            if resume_key not in self._indexes:
+                # Drop whole resumes, oldest first, to stay within the limits
+                while self._indexes and (self.entries >= self.max_entries
+                                         or self.chars + len(job_description) > self.max_chars):
+                    del self._indexes[next(iter(self._indexes))]
+                self._indexes[resume_key] = LSHIndex(self.hasher.num_perm, self.bands, self.max_entries_per_resume)
+            self._indexes.move_to_end(resume_key)
+            self._indexes[resume_key].add(text_key, signature, job_description)
+            self._counters["adds"] += 1
+
+    def find(self, resume: str, job_description: str) -> Optional[Tuple[str, float]]:
+        """
+        Find an earlier, near-identical job description for the same resume.
+
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The new job description
+
+        Returns:
+            Optional[Tuple[str, float]]: The earlier job description text and
+                its estimated similarity, or None (exact repeats return None;
+                the exact-match caches already cover them)
+        """
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        with self._lock:
+            index = self._indexes.get(self._resume_key(resume))
+            matches = index.query(self.hasher.signature(job_description), self.threshold) if index else []
+            self._counters["lookups"] += 1
+            self._counters["lookup_seconds"] += time.perf_counter() - started
+
+        own_key = self._text_key(job_description)
+        terms = None
+        # The most similar posting may differ in salary or level while a slightly less similar one does not
+        for text_key, original, similarity in matches:
+            if text_key == own_key:
+                continue
+            if terms is None:
+                terms = key_terms(job_description)
+            if key_terms(original) != terms:
+                continue
+            with self._lock:
+                index.touch(text_key)
+                self._counters["hits"] += 1
+            return original, similarity
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index counters.
+
+        Returns:
+            Dict[str, Any]: Entries, lookups, hits and mean lookup time
+        """
+        with self._lock:
+            lookups = self._counters["lookups"]
+            return {
+                "entries": self.entries,
+                "chars": self.chars,
+                "resumes": len(self._indexes),
+                "evictions": sum(index.evictions for index in self._indexes.values()),
+                "lookups": lookups,
+                "hits": self._counters["hits"],
+                "adds": self._counters["adds"],
+                "mean_lookup_ms": 1000 * self._counters["lookup_seconds"] / lookups if lookups else 0.0,
+            }
+
+
+# Global near-duplicate index
+_index = None
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Get or create the shared near-duplicate job description index."""
+    global _index
+    if _index is None:
+        _index = NearDuplicateIndex()
+        get_metrics_registry().register_collector("llm_similar_jd", _index.stats)
+    return _index
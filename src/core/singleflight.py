@@ -0,0 +1,75 @@
+"""
+Single-flight coalescing of identical in-flight requests.
+
+The first caller for a key starts the work; concurrent callers with the same
+key await that same task instead of issuing a duplicate upstream call.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key.
+
+    Must be used from a single event loop. The shared task is cancelled only
+    when every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key.
+
+        Args:
+            key (str): Request identity, e.g. the response cache key
+            fn (Callable[[], Awaitable[Any]]): Zero-argument coroutine function
+
+        Returns:
+            Any: Result of the shared call
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._tasks.get(key) is task and self._waiters[key] == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+
+    @property
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._tasks)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get coalescing counters.
+
+        Returns:
+            Dict[str, int]: Leader calls, coalesced duplicates and in-flight count
+        """
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": self.in_flight}
@@ -0,0 +1,127 @@
+"""
+Local HTTP stand-in for the LLM API.
+
+Serves deterministic responses from StubModel with simulated latency,
+token-rate streaming and optional fault injection (503 + Retry-After), so
+the client, resilience layer and UI can be exercised without a network.
+
+Usage:
+    python -m src.core.stub_server --port 8765 --latency-ms 800 --tokens-per-second 40
+"""
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from ..config.settings import STUB_BACKEND_CONFIG
+from .backends import StubModel
+
+
+def make_handler(stub: StubModel):
+    """Build a request handler class bound to a StubModel."""
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._send_json(200, {"status": "ok"})
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path not in ("/generate", "/stream"):
+                self._send_json(404, {"error": "not found"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            response = stub.generate_text(request.get("prompt", ""), request.get("generation_config", {}))
+
+            time.sleep(stub.sample_latency())
+            if stub.should_fail():
+                self._send_json(503, {"error": "injected failure"}, {"Retry-After": "1"})
+                return
+
+            if path == "/generate":
+                time.sleep(response.usage["output_tokens"] / stub.config["tokens_per_second"])
+                self._send_json(200, {"text": response.text, "usage": response.usage})
+                return
+
+            # Close-delimited NDJSON stream, one chunk per line
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+            for i, chunk in enumerate(stub.chunks(response.text)):
+                if i:
+                    time.sleep(stub.chunk_interval)
+                self.wfile.write(json.dumps({"text": chunk}).encode("utf-8") + b"\n")
+                self.wfile.flush()
+
+    return StubHandler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, config: Optional[Dict] = None) -> ThreadingHTTPServer:
+    """
+    Create the stub server (call serve_forever() on the result to run it).
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind, 0 for any free port
+        config (Optional[Dict]): Overrides for STUB_BACKEND_CONFIG
+
+    Returns:
+        ThreadingHTTPServer: The bound server
+    """
+    return ThreadingHTTPServer((host, port), make_handler(StubModel(config)))
+
+
+def main():
+    defaults = STUB_BACKEND_CONFIG
+    parser = argparse.ArgumentParser(description="Deterministic LLM stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=urlparse(defaults["url"]).port or 8765)
+    parser.add_argument("--latency-ms", type=float, default=defaults["latency_median_ms"],
+                        help="Median time to first byte")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"],
+                        default=defaults["latency_distribution"])
+    parser.add_argument("--tokens-per-second", type=float, default=defaults["tokens_per_second"])
+    parser.add_argument("--error-rate", type=float, default=defaults["error_rate"])
+    parser.add_argument("--seed", type=int, default=defaults["seed"])
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, {
+        "latency_median_ms": args.latency_ms,
+        "latency_distribution": args.distribution,
+        "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate,
+        "seed": args.seed,
+    })
+    print(f"Stub LLM server listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
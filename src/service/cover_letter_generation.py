@@ -1,6 +1,9 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 import streamlit as st
-from ..core.llm_client import get_gemini_client
+from ..core.cancellation import CancellationToken
+from ..core.llm_client import ContentStream, get_gemini_client
+from ..core.prompt_builder import build_context_prompt, build_prompt
+from .resume_analyzer import get_cached_section
 from ..utils.validators import validate_inputs
 
 class CoverLetterGenerator:
@@ -11,7 +14,23 @@ class CoverLetterGenerator:
         self.client = get_gemini_client()
     
     def generate(self, resume: str, job_description: str, 
-                additional_info: Dict = None) -> Optional[str]:
+                additional_info: Dict = None,
+                stream: bool = False,
+                cancel_token: Optional[CancellationToken] = None) -> Optional[Union[str, ContentStream]]:
+        """
+        Generate a tailored cover letter.
+        
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The job description
+            additional_info (Dict): Additional user information
+            stream (bool): Return a ContentStream of text chunks instead of
+                waiting for the full cover letter
+            cancel_token (Optional[CancellationToken]): Abort when a rerun supersedes the request
+            
+        Returns:
+            Optional[Union[str, ContentStream]]: Cover letter, stream, or None if error
+        """
         # Validate inputs
         is_valid, error_message = validate_inputs(resume, job_description)
         if not is_valid:
@@ -22,14 +41,25 @@ class CoverLetterGenerator:
         if additional_info is None:
             additional_info = {}
         
+        if stream:
+            return self.client.stream_cover_letter(
+                resume=resume,
+                job_description=job_description,
+                additional_info=additional_info,
+                cancel_token=cancel_token
+            )
+        
         # Generate cover letter
         with st.spinner("🔥 Generating your tailored cover letter..."):
             cover_letter = self.client.generate_cover_letter(
                 resume=resume,
                 job_description=job_description,
-                additional_info=additional_info
+                additional_info=additional_info,
+                cancel_token=cancel_token
             )
         
+        if cancel_token is not None and cancel_token.cancelled:
+            return None
         if cover_letter:
             st.success("✅ Cover letter generated successfully!")
             return cover_letter
@@ -37,28 +67,31 @@ class CoverLetterGenerator:
             st.error("❌ Failed to generate cover letter. Please try again.")
             return None
     
-    def get_quick_improvements(self, resume: str, job_description: str) -> Optional[str]:
+    def get_quick_improvements(self, resume: str, job_description: str,
+                               cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
         from ..core.prompts import QUICK_TIPS_PROMPT
         
-        prompt = QUICK_TIPS_PROMPT.format(
-            resume=resume,
-            job_description=job_description
-        )
+        # Reuse tips from an earlier fused analysis of the same inputs
+        cached = get_cached_section("quick_tips", resume, job_description)
+        if cached is not None:
+            return cached
+        
+        prompt = build_context_prompt("quick_tips", QUICK_TIPS_PROMPT, resume, job_description)
         
         with st.spinner("💡 Getting quick tips..."):
-            tips = self.client.generate_content(prompt)
+            tips = self.client.generate_content(prompt, cancel_token=cancel_token)
         
         return tips
     
     def extract_skills(self, resume: str) -> Optional[str]:
         from ..core.prompts import SKILLS_EXTRACTION_PROMPT
-        prompt = SKILLS_EXTRACTION_PROMPT.format(resume=resume)
+        prompt = build_context_prompt("extract_skills", SKILLS_EXTRACTION_PROMPT, resume)
         with st.spinner("🔍 Analyzing your skills..."):
             skills = self.client.generate_content(prompt)
         return skills
     def customize_for_company(self, base_cover_letter: str, 
                             company_info: str) -> Optional[str]:
-        prompt = f"""
+        prompt = build_prompt("customize_for_company", """
         Customize this cover letter for the specific company based on the company information provided:
         
         BASE COVER LETTER:
@@ -75,7 +108,7 @@ class CoverLetterGenerator:
         5. Keep the same length
         
         Return the customized cover letter.
-        """
+        """, base_cover_letter=base_cover_letter, company_info=company_info)
         with st.spinner("🏢 Customizing for company..."):
             customized = self.client.generate_content(prompt)
         return customized
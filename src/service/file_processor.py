@@ -1,19 +1,59 @@
-from typing import Optional, Union
+from typing import BinaryIO, Optional, Union
 from streamlit.runtime.uploaded_file_manager import UploadedFile
-import PyPDF2
 import docx2txt
+import hashlib
 import io
+import time
 import streamlit as st
+from ..config.settings import (
+    EXTRACTION_CACHE_CONFIG, EXTRACTION_SANDBOX_CONFIG, MAX_FILE_SIZE, NORMALIZATION_CONFIG,
+    PDF_EXTRACTION_CONFIG, VALIDATION_RULES
+)
+from ..core.cache import ResponseCache, make_cache_key
+from ..core.metrics import get_metrics_registry
+from ..core.resume_document import ResumeDocument, get_resume_document
+from ..utils.normalization import normalize_text
+from .pdf_extraction import extract_pdf_text
+from .sandbox import run_sandboxed
+
+# Bump when extraction output changes so cached text from older code is not reused
+EXTRACTOR_VERSION = 5
 
 class FileProcessor:
     """Handles file processing and text extraction for various file formats."""
     
-    def extract_text(self, file: UploadedFile) -> str:
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        """
+        Initialize the processor.
+        
+        Args:
+            cache (Optional[ResponseCache]): Cache of extracted text, defaults to the shared one
+        """
+        self.cache = cache or get_extraction_cache()
+        self.max_file_size = MAX_FILE_SIZE
+        # Text past this length is rejected by validate_inputs, so pages beyond it are not read
+        self.max_chars = VALIDATION_RULES["max_input_length"]
+        self.sandboxed = EXTRACTION_SANDBOX_CONFIG["enabled"]
+        registry = get_metrics_registry()
+        self._parse_seconds = registry.histogram(
+            "file_extraction_seconds", "Time to parse an uploaded file, by format")
+        self._seconds_saved = registry.counter(
+            "file_extraction_seconds_saved_total", "Parse time avoided by the extraction cache, by format")
+    
+    def extract_text(self, file: Union[UploadedFile, BinaryIO]) -> str:
         """
         Extract text from uploaded file based on file type.
         
+        The text is normalized with its line structure kept (see
+        NORMALIZATION_CONFIG). The result is cached by a hash of the file's
+        bytes, so reruns and other sessions uploading the same file do not
+        parse it again. Files over MAX_FILE_SIZE are rejected unparsed, and
+        parsing runs in a resource-limited subprocess (see
+        EXTRACTION_SANDBOX_CONFIG).
+        
         Args:
-            file (UploadedFile): The uploaded file object
+            file (Union[UploadedFile, BinaryIO]): The uploaded file object, or
+                any binary file object with a name
             
         Returns:
             str: Extracted text from the file
@@ -23,46 +63,100 @@ class FileProcessor:
         """
         try:
             file_extension = file.name.lower().split('.')[-1]
+            if file_extension not in ('pdf', 'docx'):
+                raise ValueError(f"Unsupported file type: {file_extension}")
+            
+            data = self._read_bounded(file)
+            key = make_cache_key(
+                "extracted_text", EXTRACTOR_VERSION, file_extension, self.max_chars,
+                NORMALIZATION_CONFIG["stages"], hashlib.sha256(data).hexdigest()
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._seconds_saved.inc(cached["parse_seconds"], format=file_extension)
+                return cached["text"]
             
+            started = time.perf_counter()
             if file_extension == 'pdf':
-                return self._extract_from_pdf(file)
-            elif file_extension == 'docx':
-                return self._extract_from_docx(file)
+                text = self._extract_from_pdf(data)
             else:
-                raise ValueError(f"Unsupported file type: {file_extension}")
-                
+                text = self._extract_from_docx(data)
+            text = normalize_text(text)
+            elapsed = time.perf_counter() - started
+            
+            self._parse_seconds.observe(elapsed, format=file_extension)
+            self.cache.put(key, {"text": text, "parse_seconds": elapsed})
+            return text
+        
         except Exception as e:
             raise Exception(f"Error extracting text: {str(e)}")
 
-    def _extract_from_pdf(self, file: UploadedFile) -> str:
+    def extract_document(self, file: Union[UploadedFile, BinaryIO]) -> ResumeDocument:
+        """
+        Extract a resume and parse it into sections, contact details and entries.
+
+        Both steps are cached, so this is cheap to call on every rerun.
+
+        Args:
+            file (Union[UploadedFile, BinaryIO]): The uploaded file object
+
+        Returns:
+            ResumeDocument: Parsed resume
+        """
+        return get_resume_document(self.extract_text(file))
+
+    def _read_bounded(self, file: Union[UploadedFile, BinaryIO]) -> bytes:
+        """Read the file's bytes, refusing files over max_file_size without reading them in full."""
+        size = getattr(file, 'size', None)
+        if size is None or size <= self.max_file_size:
+            data = file.getvalue() if hasattr(file, 'getvalue') else file.read(self.max_file_size + 1)
+            size = len(data)
+        if size > self.max_file_size:
+            raise ValueError(
+                f"File is too large ({size / 1024 / 1024:.1f} MB, "
+                f"maximum {self.max_file_size / 1024 / 1024:.0f} MB)"
+            )
+        return data
+
+    def _run(self, target, *args):
+        """Run a parser in the sandbox, or inline when the sandbox is disabled."""
+        if self.sandboxed:
+            return run_sandboxed(target, *args)
+        return target(*args)
+
+    def _extract_from_pdf(self, data: bytes) -> str:
         """Extract text from PDF file."""
         try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
+            if self.sandboxed and PDF_EXTRACTION_CONFIG["workers"] > 1:
+                # Parsed on the page pool, whose workers carry the sandbox limits
+                text = extract_pdf_text(data, max_chars=self.max_chars, sandboxed=True)
+            else:
+                # A sandboxed child extracts serially
+                text = self._run(extract_pdf_text, data, None, 0 if self.sandboxed else None, self.max_chars)
             return text.strip()
         except Exception as e:
             raise Exception(f"Error reading PDF: {str(e)}")
 
-    def _extract_from_docx(self, file: UploadedFile) -> str:
+    def _extract_from_docx(self, data: bytes) -> str:
         """Extract text from DOCX file."""
         try:
-            text = docx2txt.process(file)
+            text = self._run(docx2txt.process, io.BytesIO(data))
             return text.strip()
         except Exception as e:
             raise Exception(f"Error reading DOCX: {str(e)}")
 
     @staticmethod
     def clean_text(text: str) -> str:
-        """Clean extracted text by removing extra whitespace and normalizing line endings."""
-        if not text:
-            return ""
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Normalize line endings
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        
-        return text.strip()
\ No newline at end of file
+        """Clean extracted text, keeping line and paragraph breaks (see normalize_text)."""
+        return normalize_text(text)
+
+# Global extraction cache, shared by every session in the process
+_extraction_cache = None
+
+def get_extraction_cache() -> ResponseCache:
+    """Get or create the shared cache of extracted file text."""
+    global _extraction_cache
+    if _extraction_cache is None:
+        _extraction_cache = ResponseCache(EXTRACTION_CACHE_CONFIG)
+        get_metrics_registry().register_collector("file_extraction_cache", _extraction_cache.stats)
+    return _extraction_cache
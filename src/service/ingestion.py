@@ -0,0 +1,282 @@
+"""
+Bulk resume ingestion: extract and parse many PDF/DOCX files on a process pool.
+
+Sources are file paths (read inside the worker) or in-memory byte streams.
+They are consumed lazily and at most ``max_pending`` are in flight, and each
+result is yielded as soon as its worker finishes. Memory stays flat however
+large the corpus is. Each file is processed in a fork of its worker with the
+CPU and memory limits from EXTRACTION_SANDBOX_CONFIG. A file that is too
+large, malformed, or over its limits yields an error record instead of
+aborting the run. If a worker process crashes outright, the files that were
+in flight are rerun one at a time on a fresh pool, so only the file that
+crashed it is reported failed.
+
+Workers import only the extraction and parsing modules, never Streamlit.
+"""
+
+import collections
+import concurrent.futures
+import io
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Deque, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from ..config.settings import EXTRACTION_SANDBOX_CONFIG, INGEST_CONFIG, MAX_FILE_SIZE, VALIDATION_RULES
+from ..core.resume_document import parse_resume
+from ..utils.normalization import normalize_text
+from .pdf_extraction import extract_pdf_text, preload_engines
+from .sandbox import SandboxError, run_forked
+
+SUPPORTED_SUFFIXES = (".pdf", ".docx")
+
+Source = Union[str, Path, Tuple[str, bytes], Tuple[str, BinaryIO]]
+
+
+@dataclass
+class _Item:
+    """One queued file: a path to read in the worker, or its bytes."""
+    index: int
+    name: str
+    path: Optional[str] = None
+    data: Optional[bytes] = None
+    attempts: int = 0
+
+
+def _init_worker() -> None:
+    """Process pool initializer: import the parsers once, so the per-file forks start warm."""
+    preload_engines()
+    try:
+        import docx2txt  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _extract(name: str, data: bytes, max_chars: int) -> str:
+    suffix = Path(name).suffix.lower()
+    if suffix == ".pdf":
+        return extract_pdf_text(data, workers=0, max_chars=max_chars)
+    if suffix == ".docx":
+        import docx2txt
+        return docx2txt.process(io.BytesIO(data))
+    raise ValueError(f"Unsupported file type: {suffix or name}")
+
+
+def ingest_file(name: str, path: Optional[str] = None, data: Optional[bytes] = None,
+                max_chars: Optional[int] = None, cpu_seconds: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract, normalize and parse one file. Never raises; failures become error records.
+
+    Args:
+        name (str): File name (its suffix selects the parser)
+        path (Optional[str]): Path to read, if data is not given
+        data (Optional[bytes]): File content
+        max_chars (Optional[int]): Stop reading PDF pages past this many characters
+        cpu_seconds (Optional[int]): Process the file in a fork of this
+            process with this CPU-time limit and the sandbox's memory limit
+            (see run_forked); None processes it in-process
+
+    Returns:
+        Dict[str, Any]: JSON-serializable record with status, timings and the document
+    """
+    started = time.perf_counter()
+    record: Dict[str, Any] = {"name": name, "source": path or name, "status": "ok", "error": None}
+    if cpu_seconds:
+        try:
+            return run_forked(ingest_file, name, path, data, max_chars, cpu_seconds=cpu_seconds)
+        except SandboxError as e:
+            # Killed at the hard limit, or out of memory before it could report
+            record.update(status="error", error=str(e), seconds=round(time.perf_counter() - started, 4))
+            return record
+    try:
+        if data is None:
+            if os.path.getsize(path) > MAX_FILE_SIZE:
+                raise ValueError(f"file is larger than {MAX_FILE_SIZE // (1024 * 1024)} MB")
+            with open(path, "rb") as f:
+                data = f.read()
+        elif len(data) > MAX_FILE_SIZE:
+            raise ValueError(f"file is larger than {MAX_FILE_SIZE // (1024 * 1024)} MB")
+        record["bytes"] = len(data)
+
+        read_done = time.perf_counter()
+        text = _extract(name, data, max_chars or VALIDATION_RULES["max_input_length"])
+        extract_done = time.perf_counter()
+        text = normalize_text(text)
+        normalize_done = time.perf_counter()
+        document = parse_resume(text)
+        parse_done = time.perf_counter()
+
+        record.update(
+            chars=len(text),
+            timings={
+                "read": round(read_done - started, 4),
+                "extract": round(extract_done - read_done, 4),
+                "normalize": round(normalize_done - extract_done, 4),
+                "parse": round(parse_done - normalize_done, 4),
+            },
+            text=text,
+            document=document.to_dict(),
+        )
+    except MemoryError:
+        record.update(status="error", error="file needs more memory than allowed")
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["seconds"] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def _iter_items(sources: Iterable[Source]) -> Iterator[_Item]:
+    for index, source in enumerate(sources):
+        if isinstance(source, tuple):
+            name, content = source
+            if not isinstance(content, (bytes, bytearray)):
+                # Read at most one byte past the limit; the worker rejects the rest
+                content = content.read(MAX_FILE_SIZE + 1)
+            yield _Item(index, name, data=bytes(content))
+        else:
+            yield _Item(index, Path(source).name, path=str(source))
+
+
+def iter_paths(inputs: Iterable[Union[str, Path]], recursive: bool = True) -> Iterator[Path]:
+    """
+    Expand files and directories into supported resume files, lazily.
+
+    Args:
+        inputs (Iterable[Union[str, Path]]): Files and directories
+        recursive (bool): Descend into subdirectories
+
+    Yields:
+        Path: PDF and DOCX files, in directory order
+    """
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            walker = path.rglob("*") if recursive else path.iterdir()
+            for child in walker:
+                if child.suffix.lower() in SUPPORTED_SUFFIXES and child.is_file():
+                    yield child
+        else:
+            yield path
+
+
+class BulkIngestor:
+    """Fan file extraction out over a resource-limited process pool."""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 max_chars: Optional[int] = None):
+        """
+        Initialize the ingestor.
+
+        Args:
+            workers (Optional[int]): Worker processes, defaults to INGEST_CONFIG
+            max_pending (Optional[int]): Files in flight at once, defaults to 4 per worker
+            max_chars (Optional[int]): Per-document character budget, defaults to
+                VALIDATION_RULES["max_input_length"]
+        """
+        self.workers = workers or INGEST_CONFIG["workers"] or os.cpu_count() or 1
+        self.max_pending = max_pending or INGEST_CONFIG["pending_per_worker"] * self.workers
+        self.max_chars = max_chars or VALIDATION_RULES["max_input_length"]
+        self.counts = {"ok": 0, "error": 0, "retried": 0}
+        self._pool = None
+
+    def _new_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self._pool
+
+    def _submit(self, item: _Item) -> concurrent.futures.Future:
+        item.attempts += 1
+        return self._pool.submit(
+            ingest_file, item.name, item.path, item.data, self.max_chars, EXTRACTION_SANDBOX_CONFIG["cpu_seconds"]
+        )
+
+    def ingest(self, sources: Iterable[Source]) -> Iterator[Dict[str, Any]]:
+        """
+        Process sources, yielding one record per file as soon as it finishes.
+
+        Records arrive in completion order; "index" gives each one's position
+        in sources.
+
+        Args:
+            sources (Iterable[Source]): Paths, or (name, bytes or binary file) pairs
+
+        Yields:
+            Dict[str, Any]: Record from ingest_file plus "index"
+        """
+        items = _iter_items(sources)
+        pending: Dict[concurrent.futures.Future, _Item] = {}
+        # Files in flight when a worker crashed, rerun one at a time to find the culprit
+        suspects: Deque[_Item] = collections.deque()
+        exhausted = False
+        self._new_pool()
+        try:
+            while True:
+                if suspects:
+                    if not pending:
+                        item = suspects.popleft()
+                        pending[self._submit(item)] = item
+                else:
+                    while not exhausted and len(pending) < self.max_pending:
+                        item = next(items, None)
+                        if item is None:
+                            exhausted = True
+                        else:
+                            pending[self._submit(item)] = item
+                if not pending:
+                    return
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                crashed = []
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        record = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(item)
+                        continue
+                    except Exception as e:
+                        record = {"name": item.name, "source": item.path or item.name, "status": "error",
+                                  "error": f"{type(e).__name__}: {e}"}
+                    yield self._finish(item, record)
+
+                if crashed:
+                    # Every in-flight future fails with the pool, not just the culprit's
+                    crashed.extend(pending.values())
+                    pending.clear()
+                    self._new_pool()
+                    for item in sorted(crashed, key=lambda item: item.index):
+                        if item.attempts > 1:
+                            # It crashed while running alone
+                            yield self._finish(item, {"name": item.name, "source": item.path or item.name,
+                                                      "status": "error", "error": "worker process crashed"})
+                        else:
+                            self.counts["retried"] += 1
+                            suspects.append(item)
+        finally:
+            # Reached early when the caller stops iterating; drop the queued files
+            for future in pending:
+                future.cancel()
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _finish(self, item: _Item, record: Dict[str, Any]) -> Dict[str, Any]:
+        record["index"] = item.index
+        self.counts["ok" if record.get("status") == "ok" else "error"] += 1
+        return record
+
+
+def ingest(sources: Iterable[Source], workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Extract and parse many resumes in parallel, streaming records as they finish.
+
+    Args:
+        sources (Iterable[Source]): Paths, or (name, bytes or binary file) pairs
+        workers (Optional[int]): Worker processes, defaults to INGEST_CONFIG
+
+    Yields:
+        Dict[str, Any]: One record per source (see ingest_file)
+    """
+    return BulkIngestor(workers).ingest(sources)
@@ -0,0 +1,105 @@
+"""
+Typed match score results and their fast local parser/validator.
+"""
+
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+class MatchScoreError(ValueError):
+    """Raised when model output is not a valid match score."""
+
+
+@dataclass
+class MatchScore:
+    """Structured resume-to-job match score."""
+    overall_score: int
+    skills_match: float
+    experience_match: float
+    education_match: float
+    strengths: List[str] = field(default_factory=list)
+    gaps: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def to_markdown(self) -> str:
+        """Render the score for display."""
+        lines = [
+            f"**Overall match: {self.overall_score}/10**",
+            "",
+            f"- Skills match: {self.skills_match:.0f}%",
+            f"- Experience match: {self.experience_match:.0f}%",
+            f"- Education match: {self.education_match:.0f}%",
+        ]
+        if self.strengths:
+            lines += ["", "**Key strengths**"] + [f"- {s}" for s in self.strengths]
+        if self.gaps:
+            lines += ["", "**Major gaps**"] + [f"- {g}" for g in self.gaps]
+        return "\n".join(lines)
+
+
+def _number(data: Dict[str, Any], name: str, low: float, high: float) -> float:
+    value = data.get(name)
+    if isinstance(value, str):
+        # Accept "85%", "7/10" and similar
+        match = _NUMBER.search(value)
+        value = float(match.group()) if match else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise MatchScoreError(f"'{name}' must be a number")
+    if not low <= value <= high:
+        raise MatchScoreError(f"'{name}' must be between {low:g} and {high:g}, got {value:g}")
+    return float(value)
+
+
+def _strings(data: Dict[str, Any], name: str) -> List[str]:
+    value = data.get(name, [])
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        raise MatchScoreError(f"'{name}' must be a list of strings")
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def parse_match_score(raw: str) -> MatchScore:
+    """
+    Parse and validate model output into a MatchScore.
+
+    Args:
+        raw (str): JSON text returned by the model (code fences and
+            surrounding prose are tolerated)
+
+    Returns:
+        MatchScore: Validated score
+
+    Raises:
+        MatchScoreError: If the output is not valid JSON or fails validation
+    """
+    if not raw:
+        raise MatchScoreError("empty response")
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        match = _JSON_OBJECT.search(raw)
+        if not match:
+            raise MatchScoreError("no JSON object found")
+        try:
+            data = json.loads(match.group())
+        except ValueError as e:
+            raise MatchScoreError(f"invalid JSON: {e}")
+    if not isinstance(data, dict):
+        raise MatchScoreError("expected a JSON object")
+
+    return MatchScore(
+        overall_score=int(round(_number(data, "overall_score", 1, 10))),
+        skills_match=_number(data, "skills_match", 0, 100),
+        experience_match=_number(data, "experience_match", 0, 100),
+        education_match=_number(data, "education_match", 0, 100),
+        strengths=_strings(data, "strengths"),
+        gaps=_strings(data, "gaps"),
+    )
@@ -0,0 +1,296 @@
+"""
+Page-level PDF text extraction.
+
+Pages are yielded lazily and joined once, instead of growing a string page by
+page. Two engines are supported: "pypdf2" (the original engine) and "pypdf"
+(its maintained successor, which handles more layouts but is slower on plain
+text). Large documents can be split into page ranges that are extracted in
+parallel on a process pool. With ``sandboxed=True`` every parse, including the
+page count, runs on the pool in a fork of the worker limited as in
+EXTRACTION_SANDBOX_CONFIG (see run_forked), so the pool can be used with the
+sandbox on.
+
+Run ``python -m src.service.pdf_extraction resume.pdf`` to compare engine
+throughput on a document.
+"""
+
+import argparse
+import concurrent.futures
+import importlib
+import io
+import multiprocessing
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config.settings import EXTRACTION_SANDBOX_CONFIG, PDF_EXTRACTION_CONFIG
+from ..core.metrics import get_metrics_registry
+from .sandbox import SandboxError, run_forked
+
+PDF_ENGINES = ("pypdf2", "pypdf")
+
+
+def _reader(data: bytes, engine: str):
+    """Open a PDF with the requested engine, falling back to PyPDF2 if pypdf is missing."""
+    if engine == "pypdf":
+        try:
+            import pypdf
+            return pypdf.PdfReader(io.BytesIO(data))
+        except ImportError:
+            pass
+    import PyPDF2
+    return PyPDF2.PdfReader(io.BytesIO(data))
+
+
+def preload_engines() -> None:
+    """Import the installed PDF engines now, e.g. in a pool worker that forks a child per task."""
+    for module in ("PyPDF2", "pypdf"):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """
+    Get the engine that will actually be used.
+
+    Args:
+        engine (Optional[str]): Requested engine, defaults to PDF_EXTRACTION_CONFIG
+
+    Returns:
+        str: The requested engine, or "pypdf2" if pypdf is not installed
+    """
+    engine = (engine or PDF_EXTRACTION_CONFIG["engine"]).lower()
+    if engine not in PDF_ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine} (expected one of {', '.join(PDF_ENGINES)})")
+    if engine == "pypdf":
+        try:
+            import pypdf  # noqa: F401
+        except ImportError:
+            return "pypdf2"
+    return engine
+
+
+def count_pages(data: bytes, engine: Optional[str] = None) -> int:
+    """Get the number of pages in a PDF."""
+    return len(_reader(data, resolve_engine(engine)).pages)
+
+
+def iter_pdf_pages(data: bytes, engine: Optional[str] = None,
+                   start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of each page, parsing pages only as they are consumed.
+
+    Args:
+        data (bytes): PDF file content
+        engine (Optional[str]): "pypdf" or "pypdf2", defaults to PDF_EXTRACTION_CONFIG
+        start (int): First page index
+        stop (Optional[int]): Page index to stop before, defaults to the last page
+
+    Yields:
+        str: Text of one page ("" for pages without a text layer)
+    """
+    pages = _reader(data, resolve_engine(engine)).pages
+    for index in range(start, len(pages) if stop is None else min(stop, len(pages))):
+        yield pages[index].extract_text() or ""
+
+
+def _extract_range(args: Tuple[bytes, str, int, int]) -> List[str]:
+    """Process pool entry point: extract one page range."""
+    data, engine, start, stop = args
+    return list(iter_pdf_pages(data, engine, start, stop))
+
+
+# Process pools shared by every extraction in the process, one per worker count, created on first use
+_pools: Dict[int, concurrent.futures.ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+def _get_pool(workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # Forking a threaded process (Streamlit, the LLM client loop) can deadlock
+            # the child; forkserver children start from a clean single-threaded server
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else None
+            # Sandboxed tasks run in forks of the worker; import the engines once, before forking
+            pool = _pools[workers] = concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context(method), initializer=preload_engines
+            )
+        return pool
+
+
+def _discard_pool(workers: int) -> None:
+    """Drop a broken pool so the next extraction starts a fresh one."""
+    with _pool_lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _take_pages(pages: Iterable[str], max_chars: Optional[int]) -> List[str]:
+    """Collect pages until their combined length passes max_chars."""
+    taken = []
+    total = 0
+    for page in pages:
+        taken.append(page)
+        total += len(page) + 1
+        if max_chars is not None and total > max_chars:
+            break
+    return taken
+
+
+def _extract_sandboxed(data: bytes, engine: str, workers: int,
+                       max_chars: Optional[int]) -> Tuple[List[str], str]:
+    """Extract on the pool, each task in a limited fork of its worker; returns the pages and the mode."""
+    pool = _get_pool(workers)
+    timeout = EXTRACTION_SANDBOX_CONFIG["timeout"]
+    deadline = time.monotonic() + timeout
+
+    def result(future: concurrent.futures.Future) -> Any:
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except concurrent.futures.TimeoutError:
+            # The fork keeps going until its CPU limit stops it
+            raise SandboxError(f"document took longer than {timeout:.0f}s to process")
+
+    futures = []
+    try:
+        page_count = result(pool.submit(run_forked, count_pages, data, engine))
+        if page_count >= PDF_EXTRACTION_CONFIG["parallel_min_pages"]:
+            step = PDF_EXTRACTION_CONFIG["pages_per_task"]
+            ranges = [(start, start + step) for start in range(0, page_count, step)]
+            mode = "parallel"
+        else:
+            ranges = [(0, None)]
+            mode = "serial"
+        futures = [
+            pool.submit(run_forked, _extract_range, (data, engine, start, stop))
+            for start, stop in ranges
+        ]
+        pages = _take_pages((page for future in futures for page in result(future)), max_chars)
+    except BrokenProcessPool:
+        _discard_pool(workers)
+        raise SandboxError("document processing was stopped (worker process crashed)")
+    finally:
+        for future in futures:
+            future.cancel()
+    return pages, mode
+
+
+def extract_pdf_text(data: bytes, engine: Optional[str] = None, workers: Optional[int] = None,
+                     max_chars: Optional[int] = None, sandboxed: bool = False) -> str:
+    """
+    Extract the text of a PDF, one page per line block.
+
+    Documents with at least ``parallel_min_pages`` pages are split into ranges
+    of ``pages_per_task`` pages and extracted on a process pool when more
+    than one worker is configured.
+
+    Args:
+        data (bytes): PDF file content
+        engine (Optional[str]): "pypdf" or "pypdf2", defaults to PDF_EXTRACTION_CONFIG
+        workers (Optional[int]): Process pool size, defaults to PDF_EXTRACTION_CONFIG;
+            0 or 1 extracts serially
+        max_chars (Optional[int]): Stop reading pages once the text is longer
+            than this; the result then exceeds max_chars, so length validation
+            still rejects it
+        sandboxed (bool): Parse only in limited forks of the pool's
+            workers, never in this process (needs more than one worker)
+
+    Returns:
+        str: Page texts joined by newlines
+
+    Raises:
+        SandboxError: If sandboxed parsing exceeded its limits or crashed
+    """
+    engine = resolve_engine(engine)
+    workers = PDF_EXTRACTION_CONFIG["workers"] if workers is None else workers
+    started = time.perf_counter()
+
+    if sandboxed:
+        if workers <= 1:
+            raise ValueError("Sandboxed extraction needs more than one worker")
+        pages, mode = _extract_sandboxed(data, engine, workers, max_chars)
+        _record(engine, mode, len(pages), time.perf_counter() - started)
+        return "\n".join(pages)
+
+    page_count = None
+    if workers > 1:
+        page_count = count_pages(data, engine)
+    if page_count is not None and page_count >= PDF_EXTRACTION_CONFIG["parallel_min_pages"]:
+        step = PDF_EXTRACTION_CONFIG["pages_per_task"]
+        futures = [
+            _get_pool(workers).submit(_extract_range, (data, engine, start, start + step))
+            for start in range(0, page_count, step)
+        ]
+        try:
+            pages = _take_pages((page for future in futures for page in future.result()), max_chars)
+        finally:
+            for future in futures:
+                future.cancel()
+        mode = "parallel"
+    else:
+        pages = _take_pages(iter_pdf_pages(data, engine), max_chars)
+        mode = "serial"
+
+    _record(engine, mode, len(pages), time.perf_counter() - started)
+    return "\n".join(pages)
+
+
+def _record(engine: str, mode: str, pages: int, seconds: float) -> None:
+    registry = get_metrics_registry()
+    registry.counter(
+        "pdf_extracted_pages_total", "PDF pages extracted, by engine and mode (serial, parallel)"
+    ).inc(pages, engine=engine, mode=mode)
+    registry.counter(
+        "pdf_extraction_seconds_total", "Time spent extracting PDF text, by engine and mode"
+    ).inc(seconds, engine=engine, mode=mode)
+
+
+def benchmark(data: bytes, repeat: int = 3, workers: int = 0) -> List[Tuple[str, int, float]]:
+    """
+    Measure extraction throughput of each available engine.
+
+    Args:
+        data (bytes): PDF file content
+        repeat (int): Runs per engine; the fastest is reported
+        workers (int): Process pool size (0 for serial)
+
+    Returns:
+        List[Tuple[str, int, float]]: (engine, pages, best seconds) per engine
+    """
+    results = []
+    for engine in PDF_ENGINES:
+        if resolve_engine(engine) != engine:
+            continue
+        pages = count_pages(data, engine)
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            extract_pdf_text(data, engine, workers)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        results.append((engine, pages, best))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction throughput per engine")
+    parser.add_argument("pdf", help="PDF file to extract")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per engine (best is reported)")
+    parser.add_argument("--workers", type=int, default=0, help="Process pool size (0 for serial)")
+    args = parser.parse_args(argv)
+
+    with open(args.pdf, "rb") as f:
+        data = f.read()
+    for engine, pages, seconds in benchmark(data, args.repeat, args.workers):
+        print(f"{engine:7s} {pages:4d} pages  {seconds * 1000:8.1f} ms  "
+              f"{pages / seconds:7.1f} pages/s  {len(data) / seconds / 1e6:6.2f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
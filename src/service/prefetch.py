@@ -0,0 +1,188 @@
+"""
+Speculative background prefetch of the cover letter and analysis.
+
+Once both the resume and the job description are set, the user will almost
+certainly ask for the cover letter and the analysis. The prefetcher starts
+those requests on the client's event loop with the exact prompts the buttons
+use (including a swapped-in near-duplicate job description), so the results
+land in the response cache and the buttons return at cache-hit latency.
+Changing either input cancels the outstanding requests.
+"""
+
+import asyncio
+import concurrent.futures
+import time
+from typing import Awaitable, Callable, Dict, Optional
+import streamlit as st
+from ..config.settings import PREFETCH_CONFIG
+from ..core.cache import make_cache_key
+from ..core.cancellation import CancellationToken, RequestCancelledError
+from ..core.ledger import current_session_id
+from ..core.llm_client import GeminiClient, get_gemini_client
+from ..core.metrics import get_metrics_registry
+from ..core.prompts import FUSED_ANALYSIS_SCHEMA
+from ..utils.validators import validate_inputs
+from .resume_analyzer import fused_analysis_prompt, get_resume_analyzer
+
+class SpeculativePrefetcher:
+    """Prefetch likely generations for one session's current inputs."""
+
+    def __init__(self, client: Optional[GeminiClient] = None):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            client (Optional[GeminiClient]): Client to generate with, defaults to the shared one
+        """
+        self.client = client or get_gemini_client()
+        # Prefetches run on the client loop, outside the session's script thread
+        self.session = current_session_id()
+        self.debounce_seconds = PREFETCH_CONFIG["debounce_seconds"]
+        self.input_key = None
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._outcomes = get_metrics_registry().counter(
+            "llm_prefetch_total", "Speculative prefetches by kind and outcome "
+            "(started, completed, failed, cancelled)")
+
+    def _jobs(self, resume: str, job_description: str,
+              fused: bool) -> Dict[str, Callable[[], Awaitable[Optional[str]]]]:
+        """
+        Requests issued by the Generate Cover Letter and Analyze Match buttons.
+
+        Prompts are built here, in the script thread, so the shared client
+        loop only awaits the API and never parses a resume.
+        """
+        client = self.client
+        # Analyze Match builds its prompts from an already-analyzed repost when there is one
+        match = get_resume_analyzer().find_analyzed_duplicate(resume, job_description)
+        analyzed = match[0] if match else job_description
+        if fused:
+            analysis_prompt = fused_analysis_prompt(resume, analyzed)
+            analysis_options = {"response_schema": FUSED_ANALYSIS_SCHEMA}
+        else:
+            analysis_prompt = client.analysis_prompt(resume, analyzed)
+            analysis_options = {"task": "analysis"}
+        cover_letter_prompt = client.cover_letter_prompt(resume, job_description, {})
+        return {
+            "cover_letter": lambda: client.agenerate_content(
+                cover_letter_prompt,
+                task="cover_letter",
+                report_errors=False,
+                session=self.session
+            ),
+            "analysis": lambda: client.agenerate_content(
+                analysis_prompt,
+                report_errors=False,
+                session=self.session,
+                **analysis_options
+            ),
+        }
+
+    async def _run(self, make_request: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        # Inputs that change again within the debounce window never reach the API
+        await asyncio.sleep(self.debounce_seconds)
+        return await make_request()
+
+    def _record(self, kind: str, future: concurrent.futures.Future) -> None:
+        if future.cancelled():
+            outcome = "cancelled"
+        elif future.exception() is not None or future.result() is None:
+            outcome = "failed"
+        else:
+            outcome = "completed"
+        self._outcomes.inc(kind=kind, outcome=outcome)
+
+    def update(self, resume: Optional[str], job_description: Optional[str], fused: bool = True) -> None:
+        """
+        Start prefetching for new inputs, cancelling work for the previous ones.
+
+        Calling this again with unchanged inputs does nothing.
+
+        Args:
+            resume (Optional[str]): The user's resume content
+            job_description (Optional[str]): The job description
+            fused (bool): Whether Analyze Match uses the single-request analysis
+        """
+        input_key = make_cache_key(resume, job_description, fused)
+        if input_key == self.input_key:
+            return
+        self.cancel()
+        self.input_key = input_key
+
+        if not resume or not job_description:
+            return
+        is_valid, _ = validate_inputs(resume, job_description)
+        if not is_valid:
+            return
+
+        for kind, make_request in self._jobs(resume, job_description, fused).items():
+            future = self.client.submit(self._run(make_request))
+            future.add_done_callback(lambda f, kind=kind: self._record(kind, f))
+            self._futures[kind] = future
+            self._outcomes.inc(kind=kind, outcome="started")
+
+    def cancel(self) -> None:
+        """Cancel every outstanding prefetch."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self.input_key = None
+
+    def wait(self, kind: str, timeout: Optional[float] = None,
+             cancel_token: Optional[CancellationToken] = None) -> None:
+        """
+        Wait for an in-flight prefetch so a button press reuses it.
+
+        Without this, a button pressed mid-prefetch would issue a second
+        request for the same prompt. The wait shows a spinner and checks
+        cancel_token every cancel_poll_interval, so a rerun or new inputs
+        interrupt it. Failures are ignored; the caller then falls through to
+        a normal request.
+
+        Args:
+            kind (str): "cover_letter" or "analysis"
+            timeout (Optional[float]): Seconds to wait, defaults to PREFETCH_CONFIG
+            cancel_token (Optional[CancellationToken]): Token of the request
+                the button is about to make; stop waiting once it is cancelled
+        """
+        future = self._futures.get(kind)
+        if future is None or future.done():
+            return
+        deadline = time.monotonic() + (timeout if timeout is not None else PREFETCH_CONFIG["wait_timeout"])
+        with st.spinner(f"⏳ Finishing the {kind.replace('_', ' ')} started in the background..."):
+            while not future.done():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                concurrent.futures.wait([future], timeout=min(remaining, self.client.cancel_poll_interval))
+                if cancel_token is not None and not future.done():
+                    try:
+                        cancel_token.checkpoint()
+                    except RequestCancelledError:
+                        # The button's own request sees the cancelled token
+                        return
+
+    def status(self) -> Dict[str, str]:
+        """
+        Get the state of each prefetch for the current inputs.
+
+        Returns:
+            Dict[str, str]: Kind to "running", "ready", "failed" or "cancelled"
+        """
+        status = {}
+        for kind, future in self._futures.items():
+            if not future.done():
+                status[kind] = "running"
+            elif future.cancelled():
+                status[kind] = "cancelled"
+            elif future.exception() is not None or future.result() is None:
+                status[kind] = "failed"
+            else:
+                status[kind] = "ready"
+        return status
+
+def get_session_prefetcher() -> SpeculativePrefetcher:
+    """Get or create the prefetcher for the current Streamlit session."""
+    if 'prefetcher' not in st.session_state:
+        st.session_state.prefetcher = SpeculativePrefetcher()
+    return st.session_state.prefetcher
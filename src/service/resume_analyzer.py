@@ -1,7 +1,102 @@
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Tuple, Union
+import json
 import streamlit as st
-from ..core.llm_client import get_gemini_client
+from ..core.cache import get_response_cache, make_cache_key
+from ..core.cancellation import CancellationToken
+from ..core.llm_client import ContentStream, get_gemini_client
+from ..core.prompt_builder import BuiltPrompt, build_context_prompt
+from ..core.similarity import get_near_duplicate_index
+from ..core.prompts import (
+    FUSED_ANALYSIS_PROMPT, FUSED_ANALYSIS_SCHEMA, FUSED_ANALYSIS_SECTIONS,
+    MATCH_SCORE_REPAIR_PROMPT, MATCH_SCORE_SCHEMA
+)
 from ..utils.validators import validate_inputs
+from .match_score import MatchScore, MatchScoreError, parse_match_score
+
+# Sections that depend only on the resume are also cached under a resume-only key
+RESUME_ONLY_SECTIONS = {"formatting_suggestions"}
+
+def _section_key(section: str, resume: str, job_description: Optional[str]) -> str:
+    return make_cache_key("fused_section", section, resume, job_description)
+
+def get_cached_section(section: str, resume: str, job_description: Optional[str] = None) -> Optional[str]:
+    """
+    Get a section produced by an earlier fused analysis, if cached.
+    
+    Args:
+        section (str): One of FUSED_ANALYSIS_SECTIONS
+        resume (str): The user's resume content
+        job_description (Optional[str]): The job description, None for resume-only sections
+        
+    Returns:
+        Optional[str]: Cached section text or None
+    """
+    return get_response_cache().get(_section_key(section, resume, job_description))
+
+def _salvage_fields(text: str) -> Dict:
+    # Walk the top-level object of a truncated response, keeping every
+    # key/value pair that was written out in full before the cut
+    decoder = json.JSONDecoder()
+    data = {}
+    pos = text.find("{") + 1
+    if pos == 0:
+        return data
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            key, pos = decoder.raw_decode(text, pos)
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            if not isinstance(key, str) or text[pos:pos + 1] != ":":
+                return data
+            pos += 1
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+            value, pos = decoder.raw_decode(text, pos)
+        except ValueError:
+            return data
+        while pos < len(text) and text[pos] in " \t\r\n":
+            pos += 1
+        if text[pos:pos + 1] not in (",", "}"):
+            # A number cut short still decodes; wait for the separator
+            return data
+        data[key] = value
+
+def parse_fused_sections(raw: str) -> Optional[Dict[str, str]]:
+    """
+    Split a fused analysis JSON response into its sections.
+    
+    A response cut off at the output token limit still yields the sections
+    that were completed before the cut.
+    
+    Args:
+        raw (str): JSON text returned by the model
+        
+    Returns:
+        Optional[Dict[str, str]]: Non-empty sections, or None if unparseable
+    """
+    text = raw.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):]
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = _salvage_fields(text)
+    if not isinstance(data, dict):
+        return None
+    
+    sections = {}
+    for section in FUSED_ANALYSIS_SECTIONS:
+        value = data.get(section)
+        if value:
+            sections[section] = value if isinstance(value, str) else json.dumps(value, indent=2)
+    return sections or None
+
+def fused_analysis_prompt(resume: str, job_description: str) -> BuiltPrompt:
+    """Build the single-request analysis prompt (see FUSED_ANALYSIS_SECTIONS)."""
+    return build_context_prompt("fused_analysis", FUSED_ANALYSIS_PROMPT, resume, job_description)
 
 class ResumeAnalyzer:
     """Service for analyzing resumes and providing improvement suggestions."""
@@ -9,17 +104,58 @@ class ResumeAnalyzer:
     def __init__(self):
         """Initialize the resume analyzer."""
         self.client = get_gemini_client()
+        self.similar_jobs = get_near_duplicate_index()
+    
+    def find_analyzed_duplicate(self, resume: str, job_description: str) -> Optional[Tuple[str, float]]:
+        """
+        Find an already-analyzed, near-identical job description.
+        
+        Reposts of the same job differ only in dates, tracking text or
+        ordering; analyzing the earlier text instead lets every cache hit.
+        Only a posting whose analysis is still cached is returned.
+        
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The job description
+            
+        Returns:
+            Optional[Tuple[str, float]]: The earlier job description and its
+                estimated similarity, or None if none matches
+        """
+        match = self.similar_jobs.find(resume, job_description)
+        if match is None or get_cached_section("analysis", resume, match[0]) is None:
+            return None
+        return match
+    
+    def _reuse_near_duplicate(self, resume: str, job_description: str) -> str:
+        # The job description the analysis requests are built from
+        match = self.find_analyzed_duplicate(resume, job_description)
+        if match is None:
+            return job_description
+        original, similarity = match
+        st.info(f"♻️ Reusing the analysis of a near-identical job posting ({similarity:.0%} similar)")
+        return original
     
-    def analyze(self, resume: str, job_description: str) -> Optional[str]:
+    def _remember_analysis(self, resume: str, job_description: str, analysis: str) -> None:
+        # Cache the finished analysis and make the posting available for near-duplicate reuse
+        get_response_cache().put(_section_key("analysis", resume, job_description), analysis)
+        self.similar_jobs.add(resume, job_description)
+    
+    def analyze(self, resume: str, job_description: str,
+                stream: bool = False,
+                cancel_token: Optional[CancellationToken] = None) -> Optional[Union[str, ContentStream]]:
         """
         Analyze resume against job description and provide suggestions.
         
         Args:
             resume (str): The user's resume content
             job_description (str): The job description
+            stream (bool): Return a ContentStream of text chunks instead of
+                waiting for the full report
+            cancel_token (Optional[CancellationToken]): Abort when a rerun supersedes the request
             
         Returns:
-            Optional[str]: Analysis report or None if error
+            Optional[Union[str, ContentStream]]: Analysis report, stream, or None if error
         """
         # Validate inputs
         is_valid, error_message = validate_inputs(resume, job_description)
@@ -27,17 +163,102 @@ class ResumeAnalyzer:
             st.error(error_message)
             return None
         
+        cached = get_cached_section("analysis", resume, self._reuse_near_duplicate(resume, job_description))
+        if cached is not None:
+            return ContentStream(iter([cached])) if stream else cached
+        
+        if stream:
+            analysis_stream = self.client.stream_resume_analysis(resume, job_description, cancel_token)
+            analysis_stream.on_complete = lambda text: self._remember_analysis(resume, job_description, text)
+            return analysis_stream
+        
         # Generate analysis
         with st.spinner("🔍 Analyzing your resume against the job requirements..."):
-            analysis = self.client.analyze_resume(resume, job_description)
+            analysis = self.client.analyze_resume(resume, job_description, cancel_token)
         
+        if cancel_token is not None and cancel_token.cancelled:
+            return None
         if analysis:
+            self._remember_analysis(resume, job_description, analysis)
             st.success("✅ Resume analysis completed!")
             return analysis
         else:
             st.error("❌ Failed to analyze resume. Please try again.")
             return None
     
+    def analyze_all(self, resume: str, job_description: str,
+                    cancel_token: Optional[CancellationToken] = None) -> Optional[Dict[str, str]]:
+        """
+        Run every analysis task in one fused request with structured JSON output.
+        
+        The response is split into sections (see FUSED_ANALYSIS_SECTIONS) and
+        each section is cached, so later calls to analyze,
+        get_keyword_suggestions, get_formatting_suggestions,
+        calculate_match_score, suggest_improvements_priority and
+        get_quick_improvements return without another round trip.
+        
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The job description
+            cancel_token (Optional[CancellationToken]): Abort when a rerun supersedes the request
+            
+        Returns:
+            Optional[Dict[str, str]]: Section name to Markdown text, or None if error.
+                The match score is validated and rendered; the JSON is cached.
+        """
+        is_valid, error_message = validate_inputs(resume, job_description)
+        if not is_valid:
+            st.error(error_message)
+            return None
+        
+        requested = job_description
+        job_description = self._reuse_near_duplicate(resume, job_description)
+        prompt = fused_analysis_prompt(resume, job_description)
+        
+        with st.spinner("⚡ Running the full analysis in a single request..."):
+            raw = self.client.generate_content(
+                prompt, response_schema=FUSED_ANALYSIS_SCHEMA, cancel_token=cancel_token
+            )
+        
+        if cancel_token is not None and cancel_token.cancelled:
+            return None
+        sections = parse_fused_sections(raw) if raw else None
+        if not sections:
+            st.error("❌ Failed to analyze resume. Please try again.")
+            return None
+        
+        if "match_score" in sections:
+            try:
+                parse_match_score(sections["match_score"])
+            except MatchScoreError:
+                # Leave it uncached so calculate_match_score asks again
+                del sections["match_score"]
+        
+        cache = get_response_cache()
+        for section, text in sections.items():
+            cache.put(_section_key(section, resume, job_description), text)
+            if requested != job_description:
+                cache.put(_section_key(section, resume, requested), text)
+            if section in RESUME_ONLY_SECTIONS:
+                cache.put(_section_key(section, resume, None), text)
+        
+        self.similar_jobs.add(resume, job_description)
+        if "match_score" in sections:
+            sections["match_score"] = parse_match_score(sections["match_score"]).to_markdown()
+        
+        if "analysis" not in sections:
+            analysis = self.analyze(resume, requested, cancel_token=cancel_token)
+            if analysis:
+                sections["analysis"] = analysis
+        missing = [section for section in FUSED_ANALYSIS_SECTIONS if section not in sections]
+        if missing:
+            # Usually a response cut off at the output limit; the other
+            # buttons generate the missing sections on their own
+            st.warning("⚠️ Some sections did not fit in the response and will be generated on request: "
+                       + ", ".join(section.replace("_", " ") for section in missing))
+        st.success("✅ Resume analysis completed!")
+        return sections
+    
     def get_keyword_suggestions(self, resume: str, job_description: str) -> Optional[str]:
         """
         Get keyword optimization suggestions.
@@ -49,14 +270,12 @@ class ResumeAnalyzer:
         Returns:
             Optional[str]: Keyword suggestions or None if error
         """
-        prompt = f"""
-        Analyze the job description and resume to suggest keyword optimizations:
-        
-        JOB DESCRIPTION:
-        {job_description}
+        cached = get_cached_section("keyword_suggestions", resume, job_description)
+        if cached is not None:
+            return cached
         
-        RESUME:
-        {resume}
+        prompt = build_context_prompt("keyword_suggestions", """
+        Analyze the job description and resume above to suggest keyword optimizations:
         
         TASK:
         1. Identify important keywords and phrases from the job description
@@ -66,7 +285,7 @@ class ResumeAnalyzer:
         5. Rank suggestions by importance
         
         Format as a clear, actionable list with explanations.
-        """
+        """, resume, job_description)
         
         with st.spinner("🔑 Analyzing keywords..."):
             suggestions = self.client.generate_content(prompt)
@@ -74,11 +293,12 @@ class ResumeAnalyzer:
         return suggestions
     
     def get_formatting_suggestions(self, resume: str) -> Optional[str]:
-        prompt = f"""
-        Analyze this resume and provide formatting and structure suggestions:
+        cached = get_cached_section("formatting_suggestions", resume)
+        if cached is not None:
+            return cached
         
-        RESUME:
-        {resume}
+        prompt = build_context_prompt("formatting_suggestions", """
+        Analyze the resume above and provide formatting and structure suggestions:
         
         PROVIDE SUGGESTIONS FOR:
         1. Overall structure and organization
@@ -89,47 +309,76 @@ class ResumeAnalyzer:
         6. Industry-specific formatting considerations
         
         Focus on actionable improvements that will make the resume more impactful.
-        """
+        """, resume)
         with st.spinner("📝 Analyzing resume format..."):
             suggestions = self.client.generate_content(prompt)
         
         return suggestions
     
-    def calculate_match_score(self, resume: str, job_description: str) -> Optional[Dict]:
-        prompt = f"""
-        Calculate a match score between this resume and job description:
+    def calculate_match_score(self, resume: str, job_description: str) -> Optional[MatchScore]:
+        """
+        Calculate a structured match score between resume and job description.
         
-        RESUME:
-        {resume}
+        The model is asked for schema-constrained JSON, which is validated
+        locally. Output that fails validation gets a single repair request
+        before giving up.
         
-        JOB DESCRIPTION:
-        {job_description}
+        Args:
+            resume (str): The user's resume content
+            job_description (str): The job description
+            
+        Returns:
+            Optional[MatchScore]: Validated match score or None if error
+        """
+        cached = get_cached_section("match_score", resume, job_description)
+        if cached is not None:
+            try:
+                return parse_match_score(cached)
+            except MatchScoreError:
+                pass
         
-        PROVIDE:
-        1. Overall match score (1-10)
-        2. Skills match percentage
-        3. Experience match percentage
-        4. Education/qualifications match percentage
-        5. Key strengths that align
-        6. Major gaps
+        prompt = build_context_prompt("match_score", """
+        Calculate a match score between the resume and job description above.
         
-        Format as JSON-like structure for easy parsing.
-        """
+        Return a JSON object with:
+        - overall_score: overall match score, integer from 1 to 10
+        - skills_match: skills match percentage (0-100)
+        - experience_match: experience match percentage (0-100)
+        - education_match: education/qualifications match percentage (0-100)
+        - strengths: key strengths that align
+        - gaps: major gaps
+        """, resume, job_description)
         
         with st.spinner("📊 Calculating match score..."):
-            score_analysis = self.client.generate_content(prompt)
+            raw = self.client.generate_content(prompt, response_schema=MATCH_SCORE_SCHEMA)
+            if not raw:
+                return None
+            try:
+                return parse_match_score(raw)
+            except MatchScoreError as e:
+                error = e
+            
+            repair_prompt = MATCH_SCORE_REPAIR_PROMPT.format(error=error, raw=raw)
+            repaired = self.client.generate_content(
+                repair_prompt,
+                use_cache=False,
+                task="match_score_repair",
+                response_schema=MATCH_SCORE_SCHEMA
+            )
         
-        return score_analysis
+        try:
+            return parse_match_score(repaired or "")
+        except MatchScoreError as e:
+            st.error(f"❌ Could not parse the match score: {e}")
+            return None
     
     def suggest_improvements_priority(self, resume: str, job_description: str) -> Optional[str]:
-        prompt = f"""
-        Provide a prioritized action plan for improving this resume for the specific job:
+        cached = get_cached_section("improvement_priority", resume, job_description)
+        if cached is not None:
+            return cached
         
-        RESUME:
-        {resume}
-        
-        JOB DESCRIPTION:
-        {job_description}
+        prompt = build_context_prompt("improvement_priority", """
+        Provide a prioritized action plan for improving the resume above for the specific job:
         
         CREATE A PRIORITIZED ACTION PLAN:
         
@@ -150,7 +399,7 @@ class ResumeAnalyzer:
         - Formatting tweaks
         
         For each item, explain why it's important and how to implement it.
-        """
+        """, resume, job_description)
         
         with st.spinner("📋 Creating improvement action plan..."):
             action_plan = self.client.generate_content(prompt)
@@ -0,0 +1,187 @@
+"""
+Run untrusted-input work (parsing uploaded documents) in a resource-limited subprocess.
+
+A malformed or malicious PDF can make a parser loop for minutes or allocate
+gigabytes. The work is run in a child process with a CPU-time limit
+(RLIMIT_CPU) and an address-space limit (RLIMIT_AS), plus a wall-clock
+timeout enforced by the parent, so a bad file costs at most one short-lived
+process. Limits are applied where the ``resource`` module exists (POSIX);
+elsewhere only the wall-clock timeout applies.
+
+Long-lived pool workers (bulk ingestion, the PDF page pool) run each task
+through run_forked, which gives it the same limits in a fork of the worker.
+"""
+
+import functools
+import gc
+import multiprocessing
+import os
+import pickle
+import signal
+from typing import Any, Callable, Optional
+
+from ..config.settings import EXTRACTION_SANDBOX_CONFIG
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class SandboxError(Exception):
+    """Raised when sandboxed work exceeds its limits or crashes."""
+
+
+class CPUTimeExceeded(Exception):
+    """Raised inside a limited process when a file uses up its CPU-time allowance."""
+
+
+def _context():
+    # forkserver forks from a clean helper process: cheap, and safe in a threaded parent
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _apply_limits(cpu_seconds: int, memory_bytes: int) -> None:
+    if resource is None:
+        return
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+
+
+def _on_cpu_limit(cpu_seconds: int, signum, frame):
+    raise CPUTimeExceeded(f"file used more than {cpu_seconds}s of CPU")
+
+
+def run_forked(target: Callable, *args, cpu_seconds: Optional[int] = None,
+               memory_mb: Optional[int] = None) -> Any:
+    """
+    Call target(*args) in a fork of this process, with CPU and memory limits.
+
+    For long-lived pool workers. A process cannot raise its hard CPU limit
+    once it has lowered it, so a worker cannot give every task a fresh one.
+    Each task runs in a fork instead, which starts from zero CPU time and
+    gets the same soft and hard limits as run_sandboxed's child. Forking a
+    warm worker costs about a millisecond. SIGXCPU at the soft limit raises
+    CPUTimeExceeded in Python code, and code stuck in C is killed at the hard
+    limit. There is no wall-clock timeout. Without the ``resource`` module,
+    target runs in-process.
+
+    Args:
+        target (Callable): Function to call
+        *args: Arguments (the result must be picklable)
+        cpu_seconds (Optional[int]): CPU-time limit, defaults to EXTRACTION_SANDBOX_CONFIG
+        memory_mb (Optional[int]): Address-space limit, defaults to EXTRACTION_SANDBOX_CONFIG
+
+    Returns:
+        Any: The return value of target
+
+    Raises:
+        SandboxError: If target raised, or the fork was killed
+    """
+    if resource is None:
+        return target(*args)
+    cpu_seconds = cpu_seconds or EXTRACTION_SANDBOX_CONFIG["cpu_seconds"]
+    memory_mb = memory_mb or EXTRACTION_SANDBOX_CONFIG["memory_mb"]
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Keep the collector off the inherited heap, which would copy every page it touches
+        gc.freeze()
+        os.close(read_fd)
+        code = 1
+        try:
+            with os.fdopen(write_fd, "wb") as f:
+                try:
+                    signal.signal(signal.SIGXCPU, functools.partial(_on_cpu_limit, cpu_seconds))
+                    _apply_limits(cpu_seconds, memory_mb * 1024 * 1024)
+                    outcome = ("ok", target(*args))
+                except MemoryError:
+                    outcome = ("error", "document needs more memory than allowed")
+                except BaseException as e:
+                    outcome = ("error", str(e) or type(e).__name__)
+                pickle.dump(outcome, f)
+            code = 0
+        finally:
+            # Skip the parent's cleanup (atexit, buffered output) in the fork
+            os._exit(code)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        data = f.read()
+    _, status = os.waitpid(pid, 0)
+    if not data:
+        raise SandboxError(
+            f"document processing was stopped (wait status {status}); "
+            f"limits are {cpu_seconds}s CPU and {memory_mb} MB"
+        )
+    outcome, value = pickle.loads(data)
+    if outcome == "error":
+        raise SandboxError(value)
+    return value
+
+
+def _child(conn, target: Callable, args: tuple, cpu_seconds: int, memory_bytes: int) -> None:
+    try:
+        _apply_limits(cpu_seconds, memory_bytes)
+        conn.send(("ok", target(*args)))
+    except MemoryError:
+        conn.send(("error", "document needs more memory than allowed"))
+    except BaseException as e:
+        conn.send(("error", str(e) or type(e).__name__))
+    finally:
+        conn.close()
+
+
+def run_sandboxed(target: Callable, *args, cpu_seconds: Optional[int] = None,
+                  memory_mb: Optional[int] = None, timeout: Optional[float] = None) -> Any:
+    """
+    Call target(*args) in a child process with CPU, memory and time limits.
+
+    Args:
+        target (Callable): Module-level function (must be picklable)
+        *args: Picklable arguments
+        cpu_seconds (Optional[int]): CPU-time limit, defaults to EXTRACTION_SANDBOX_CONFIG
+        memory_mb (Optional[int]): Address-space limit, defaults to EXTRACTION_SANDBOX_CONFIG
+        timeout (Optional[float]): Wall-clock limit, defaults to EXTRACTION_SANDBOX_CONFIG
+
+    Returns:
+        Any: The return value of target
+
+    Raises:
+        SandboxError: If the child raised, was killed, or ran out of time
+    """
+    cpu_seconds = cpu_seconds or EXTRACTION_SANDBOX_CONFIG["cpu_seconds"]
+    memory_mb = memory_mb or EXTRACTION_SANDBOX_CONFIG["memory_mb"]
+    timeout = timeout or EXTRACTION_SANDBOX_CONFIG["timeout"]
+
+    ctx = _context()
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(
+        target=_child,
+        args=(child_conn, target, args, cpu_seconds, memory_mb * 1024 * 1024),
+        daemon=True
+    )
+    process.start()
+    child_conn.close()
+    try:
+        if not parent_conn.poll(timeout):
+            raise SandboxError(f"document took longer than {timeout:.0f}s to process")
+        try:
+            status, value = parent_conn.recv()
+        except EOFError:
+            # Killed before reporting, e.g. SIGXCPU at the CPU limit
+            process.join(1)
+            raise SandboxError(
+                f"document processing was stopped (exit code {process.exitcode}); "
+                f"limits are {cpu_seconds}s CPU and {memory_mb} MB"
+            )
+        if status == "error":
+            raise SandboxError(value)
+        return value
+    finally:
+        parent_conn.close()
+        if process.is_alive():
+            process.kill()
+        process.join(1)
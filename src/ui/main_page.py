@@ -6,14 +6,24 @@ import base64
 import tempfile
 import pdfkit
 from .sidebar import render_sidebar
+from ..core.cancellation import get_session_cancellation
+from ..core.llm_client import ContentStream
 from ..service.file_processor import FileProcessor
 from ..service.cover_letter_generation import get_cover_letter_generator
+from ..service.prefetch import get_session_prefetcher
 from ..service.resume_analyzer import get_resume_analyzer
 from ..utils.export import ExportManager, create_cover_letter_docx, convert_to_pdf, export_resume_docx
 from .components import (
     render_header, render_input_section, render_results_section,
     render_analysis_section, show_success_message, show_error_message
 )                     
+ANALYSIS_DETAIL_SECTIONS = [
+    ('match_score', "📊 Match Score"),
+    ('keyword_suggestions', "🔑 Keyword Suggestions"),
+    ('formatting_suggestions', "📝 Formatting Suggestions"),
+    ('improvement_priority', "📋 Prioritized Action Plan"),
+]
+
 def render_main_page(sidebar_options: Optional[Dict] = None):
     """Render the main page content with input handling and validation."""
     options = sidebar_options or render_sidebar()
@@ -43,10 +53,14 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
             if resume_file:
                 try:
                     file_processor = FileProcessor()
-                    resume_text = file_processor.extract_text(resume_file)
+                    resume_document = file_processor.extract_document(resume_file)
+                    resume_text = resume_document.text
                     st.session_state.resume_text = resume_text  # Store in session state
                     st.success("Resume uploaded successfully!")
                     with st.expander("Preview Resume Content"):
+                        headings = [s.heading for s in resume_document.sections if s.heading]
+                        if headings:
+                            st.caption("Sections found: " + " · ".join(headings))
                         st.text(resume_text[:500] + "..." if len(resume_text) > 500 else resume_text)
                 except Exception as e:
                     st.error(f"Error processing resume: {str(e)}")
@@ -106,10 +120,28 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
         'custom_notes': custom_notes
     }
     
+    # Speculatively generate what the buttons below will ask for
+    prefetcher = None
+    if options.get("speculative_prefetch"):
+        prefetcher = get_session_prefetcher()
+        prefetcher.update(
+            st.session_state.resume_text,
+            st.session_state.job_desc,
+            fused=bool(options.get("fused_analysis"))
+        )
+    elif 'prefetcher' in st.session_state:
+        st.session_state.prefetcher.cancel()
+    
+    # Drop requests still running for inputs that have since changed
+    cancellation = get_session_cancellation()
+    cancellation.supersede(st.session_state.resume_text, st.session_state.job_desc)
+    
     # Horizontal line for visual separation
     st.markdown("---")
     
     # Action Buttons
+    # Long generations are streamed into the result tabs below
+    streams = {}
     col1, col2, col3 = st.columns(3)
     
     with col1:
@@ -119,15 +151,20 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
             elif not st.session_state.job_desc:
                 st.error("Please provide the job description")
             else:
-                with st.spinner("Generating cover letter..."):
-                    generator = get_cover_letter_generator()
-                    cover_letter = generator.generate(
-                        st.session_state.resume_text,
-                        st.session_state.job_desc
-                    )
-                    if cover_letter:
-                        st.session_state.generated_content['cover_letter'] = cover_letter
-                        st.success("Cover letter generated successfully!")
+                cancel_token = cancellation.token(
+                    'cover_letter', st.session_state.resume_text, st.session_state.job_desc
+                )
+                if prefetcher is not None:
+                    prefetcher.wait('cover_letter', cancel_token=cancel_token)
+                generator = get_cover_letter_generator()
+                cover_letter_stream = generator.generate(
+                    st.session_state.resume_text,
+                    st.session_state.job_desc,
+                    stream=True,
+                    cancel_token=cancel_token
+                )
+                if cover_letter_stream is not None:
+                    streams['cover_letter'] = cover_letter_stream
     
     with col2:
         if st.button("🔍 Analyze Match", type="secondary", use_container_width=True):
@@ -135,16 +172,37 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
                 st.error("Please upload your resume")
             elif not st.session_state.job_desc:
                 st.error("Please provide the job description")
+            elif options.get("fused_analysis"):
+                cancel_token = cancellation.token(
+                    'analysis', st.session_state.resume_text, st.session_state.job_desc
+                )
+                if prefetcher is not None:
+                    prefetcher.wait('analysis', cancel_token=cancel_token)
+                analyzer = get_resume_analyzer()
+                sections = analyzer.analyze_all(
+                    st.session_state.resume_text,
+                    st.session_state.job_desc,
+                    cancel_token=cancel_token
+                )
+                if sections:
+                    if 'quick_tips' in sections:
+                        sections['tips'] = sections.pop('quick_tips')
+                    st.session_state.generated_content.update(sections)
             else:
-                with st.spinner("Analyzing resume..."):
-                    analyzer = get_resume_analyzer()
-                    analysis = analyzer.analyze(
-                        st.session_state.resume_text,
-                        st.session_state.job_desc
-                    )
-                    if analysis:
-                        st.session_state.generated_content['analysis'] = analysis
-                        st.success("Analysis complete!")
+                cancel_token = cancellation.token(
+                    'analysis', st.session_state.resume_text, st.session_state.job_desc
+                )
+                if prefetcher is not None:
+                    prefetcher.wait('analysis', cancel_token=cancel_token)
+                analyzer = get_resume_analyzer()
+                analysis_stream = analyzer.analyze(
+                    st.session_state.resume_text,
+                    st.session_state.job_desc,
+                    stream=True,
+                    cancel_token=cancel_token
+                )
+                if analysis_stream is not None:
+                    streams['analysis'] = analysis_stream
     
     with col3:
         if st.button("💡 Quick Tips", type="secondary", use_container_width=True):
@@ -157,21 +215,27 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
                     generator = get_cover_letter_generator()
                     tips = generator.get_quick_improvements(
                         st.session_state.resume_text,
-                        st.session_state.job_desc
+                        st.session_state.job_desc,
+                        cancel_token=cancellation.token(
+                            'tips', st.session_state.resume_text, st.session_state.job_desc
+                        )
                     )
                     if tips:
                         st.session_state.generated_content['tips'] = tips
                         st.success("Tips generated!")
 
     # Display results if available
-    if st.session_state.get('generated_content'):
+    if st.session_state.get('generated_content') or streams:
         st.markdown("### Results")
         tab1, tab2, tab3 = st.tabs(["📝 Cover Letter", "🎯 Resume Analysis", "💡 Quick Tips"])
         
         # Cover Letter Tab
         with tab1:
+            if 'cover_letter' in streams:
+                render_stream(streams['cover_letter'], 'cover_letter')
             if 'cover_letter' in st.session_state.generated_content:
-                st.markdown(st.session_state.generated_content['cover_letter'])
+                if 'cover_letter' not in streams:
+                    st.markdown(st.session_state.generated_content['cover_letter'])
                 
                 col1, col2 = st.columns(2)
                 with col1:
@@ -234,10 +298,18 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
 
         # Resume Analysis Tab
         with tab2:
-            if 'analysis' in st.session_state.generated_content:
+            if 'analysis' in streams:
+                render_stream(streams['analysis'], 'analysis')
+            elif 'analysis' in st.session_state.generated_content:
                 st.markdown(st.session_state.generated_content['analysis'])
             else:
                 st.info("Analyze your resume to see insights here!")
+            
+            # Extra sections produced by the single-request analysis
+            for key, title in ANALYSIS_DETAIL_SECTIONS:
+                if key in st.session_state.generated_content:
+                    with st.expander(title):
+                        st.markdown(st.session_state.generated_content[key])
 
         # Quick Tips Tab
         with tab3:
@@ -246,6 +318,32 @@ def render_main_page(sidebar_options: Optional[Dict] = None):
             else:
                 st.info("Generate quick tips to see suggestions here!")
 
+def render_stream(stream: ContentStream, key: str) -> Optional[str]:
+    """
+    Render a streamed response as it arrives and store the final text.
+    
+    Args:
+        stream (ContentStream): Stream of generated text chunks
+        key (str): Key under which to store the result in generated_content
+        
+    Returns:
+        Optional[str]: The complete text, or None if nothing was generated
+    """
+    placeholder = st.empty()
+    for _ in stream:
+        placeholder.markdown(stream.text + "▌")
+    
+    text = stream.text
+    if stream.error is not None or not text:
+        placeholder.empty()
+        return None
+    
+    placeholder.markdown(text)
+    st.session_state.generated_content[key] = text
+    if stream.ttft is not None:
+        st.caption(f"⚡ First token in {stream.ttft:.2f}s")
+    return text
+
 def render_input_section() -> Tuple[str, str]:
     """
     Render the input section for resume upload and job description text.
@@ -1,4 +1,12 @@
+import json
 import streamlit as st
+from ..config.settings import FEATURES, MODEL_TIERS
+from ..core.cache import get_response_cache
+from ..core.health import get_health_monitor
+from ..core.ledger import HARD_LIMIT, SOFT_LIMIT, current_session_id, get_usage_ledger
+from ..core.metrics import get_metrics_registry
+from ..core.resilience import get_resilience_policy
+from ..service.file_processor import get_extraction_cache
 
 def render_sidebar():
     """Render the sidebar navigation and options."""
@@ -21,6 +29,22 @@ def render_sidebar():
             help="Higher values make the output more creative but less focused"
         )
         
+        fused_analysis = st.checkbox(
+            "⚡ Full analysis in one request",
+            value=False,
+            help="Analyze Match also produces quick tips, keywords, formatting, match score "
+                 "and priorities in a single AI call, shown when it completes instead of streamed"
+        )
+        
+        speculative_prefetch = False
+        if FEATURES.get("speculative_prefetch"):
+            speculative_prefetch = st.checkbox(
+                "🚀 Prefetch results in the background",
+                value=False,
+                help="Start the cover letter and analysis as soon as both inputs are set, "
+                     "so the buttons respond instantly. Uses API quota even if you never click."
+            )
+        
         # Export Options
         st.subheader("Export Format")
         export_format = st.selectbox(
@@ -28,8 +52,92 @@ def render_sidebar():
             ["DOCX", "PDF", "Both"]
         )
         
+        with st.expander("🧾 Token Usage"):
+            render_token_usage()
+        
+        # Response cache statistics
+        with st.expander("📈 AI Service Stats"):
+            render_health_status()
+            stats = get_response_cache().stats()
+            st.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+            st.caption(
+                f"Memory hits: {stats['memory_hits']} · Disk hits: {stats['disk_hits']} · "
+                f"Misses: {stats['misses']} · Entries: {stats['memory_entries']}"
+            )
+            extraction = get_extraction_cache().stats()
+            saved = get_metrics_registry().counter("file_extraction_seconds_saved_total").snapshot()
+            st.caption(
+                f"Resume parses reused: {extraction['memory_hits'] + extraction['disk_hits']} · "
+                f"Parse time saved: {sum(saved.values()):.1f}s"
+            )
+            for tier, model in MODEL_TIERS.items():
+                resilience = get_resilience_policy(tier).stats()
+                st.caption(
+                    f"{model} circuit: {resilience['breaker_state']} · Retries: {resilience['retries']} · "
+                    f"Failures: {resilience['failures']} · Rate-limit waits: {resilience['rate_limit_waits']}"
+                )
+            st.download_button(
+                "⬇️ Download Metrics (JSON)",
+                data=json.dumps(get_metrics_registry().to_json(), indent=2, default=str),
+                file_name="llm_metrics.json",
+                mime="application/json"
+            )
+        
         return {
             "mode": mode,
             "temperature": temperature,
+            "fused_analysis": fused_analysis,
+            "speculative_prefetch": speculative_prefetch,
             "export_format": export_format
-        }
\ No newline at end of file
+        }
+
+def render_token_usage():
+    """Show this session's token usage against its budgets, with export."""
+    ledger = get_usage_ledger()
+    session = current_session_id()
+    used = ledger.session_tokens(session)
+    
+    if ledger.session_hard:
+        st.progress(min(1.0, used / ledger.session_hard))
+        st.caption(f"{used:,} of {ledger.session_hard:,} session tokens")
+    else:
+        st.caption(f"{used:,} session tokens")
+    state = ledger.budget_state(session)
+    if state == SOFT_LIMIT:
+        st.caption("🟡 Near the token budget: using the faster model")
+    elif state == HARD_LIMIT:
+        st.caption("🔴 Token budget spent: only cached results are available")
+    
+    for task, totals in sorted(ledger.session_summary(session).items()):
+        st.caption(
+            f"{task}: {int(totals['calls'])} calls · {int(totals['prompt_tokens']):,} in · "
+            f"{int(totals['output_tokens']):,} out · ${totals['cost_usd']:.4f}"
+        )
+    
+    st.download_button(
+        "⬇️ Download Usage (CSV)",
+        data=ledger.to_csv(session),
+        file_name="llm_usage.csv",
+        mime="text/csv"
+    )
+
+HEALTH_ICONS = {"ok": "🟢", "degraded": "🟡", "down": "🔴"}
+
+def render_health_status():
+    """Show the cached backend health without blocking on a probe."""
+    try:
+        monitor = get_health_monitor()
+    except Exception as e:
+        st.caption(f"🔴 AI service not configured: {str(e)}")
+        return
+    
+    # The background monitor keeps this fresh; probe here only if it is disabled
+    status = monitor.status() if monitor.interval else monitor.check()
+    if status is None:
+        st.caption("⚪ AI service: checking...")
+        return
+    
+    st.caption(f"{HEALTH_ICONS[status.status]} AI service: {status.status} (checked {status.age:.0f}s ago)")
+    for tier, result in status.tiers.items():
+        detail = f"{result.latency_ms:.0f} ms" if result.healthy else result.error
+        st.caption(f"  {tier} · {result.model}: {detail}")
@@ -4,37 +4,20 @@ from datetime import datetime
 import json
 from pathlib import Path
 import streamlit as st
+from ..core.resume_document import get_resume_document
+from .normalization import normalize_text
 
 def extract_contact_info(text: str) -> Dict[str, str]:
-    """Extract contact information from text."""
-    contact_info = {
-        'email': '',
-        'phone': '',
-        'linkedin': ''
+    """Extract contact information from the header of a resume."""
+    contact = get_resume_document(text).contact
+    return {
+        'email': contact.email,
+        'phone': contact.phone,
+        'linkedin': contact.linkedin
     }
-    
-    # Email pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text)
-    if emails:
-        contact_info['email'] = emails[0]
-    
-    # Phone pattern
-    phone_pattern = r'\b(?:\+\d{1,2}\s?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}\b'
-    phones = re.findall(phone_pattern, text)
-    if phones:
-        contact_info['phone'] = phones[0]
-    
-    # LinkedIn pattern
-    linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-    linkedin = re.findall(linkedin_pattern, text)
-    if linkedin:
-        contact_info['linkedin'] = linkedin[0]
-    
-    return contact_info
 
 def extract_skills(text: str) -> List[str]:
-    """Extract skills from text using common skill keywords."""
+    """Extract skills from the skills section (or the whole text) using common skill keywords."""
     # Example skill keywords (expand as needed)
     skill_keywords = [
         'python', 'java', 'javascript', 'react', 'node.js', 'sql',
@@ -42,12 +25,15 @@ def extract_skills(text: str) -> List[str]:
         'leadership', 'communication', 'problem solving'
     ]
     
-    found_skills = []
-    for skill in skill_keywords:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text.lower()):
-            found_skills.append(skill)
+    def find(scope: str) -> List[str]:
+        scope = scope.lower()
+        return [skill for skill in skill_keywords if re.search(r'\b' + re.escape(skill) + r'\b', scope)]
     
-    return found_skills
+    # Match against the skills section when it lists skills; a resume without
+    # one, or whose skills section matches nothing, is searched in full as before
+    document = get_resume_document(text)
+    found_skills = find(document.section_text('skills')) if document.skills else []
+    return found_skills or find(text)
 
 def format_date(date_str: str = None) -> str:
     """Format date string or return current date."""
@@ -60,20 +46,8 @@ def format_date(date_str: str = None) -> str:
     return datetime.now().strftime('%B %d, %Y')
 
 def clean_text(text: str) -> str:
-    """Clean and normalize text content."""
-    if not text:
-        return ""
-    
-    # Remove multiple spaces
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Remove special characters
-    text = re.sub(r'[^\w\s@.-]', '', text)
-    
-    # Convert multiple newlines to single newline
-    text = re.sub(r'\n+', '\n', text)
-    
-    return text.strip()
+    """Clean and normalize text content, keeping line and paragraph breaks."""
+    return normalize_text(text)
 
 def save_to_json(data: Dict[str, Any], filename: str) -> bool:
     """Save data to JSON file."""
@@ -0,0 +1,319 @@
+"""
+Structure-preserving text normalization.
+
+Each enabled stage is one or two precompiled patterns (or C-level string
+methods) applied over the whole text, in a fixed order. Line structure is
+kept: single line breaks survive, runs of blank lines become one paragraph
+break, so resume sections stay recognizable.
+
+Stages, in the order they run:
+    control     Remove control and zero-width characters; vertical tab and
+                form feed (page breaks) become line breaks.
+    html        Drop <script>/<style> blocks, comments and common inline tags,
+                turn block tags into line breaks (<li> into a bullet) and
+                decode entities.
+    bullets     Rewrite bullet glyphs at the start of a line ("•", "▪",
+                Wingdings private-use glyphs...) as "- ".
+    whitespace  Normalize line endings, collapse runs of spaces and tabs,
+                strip spaces around line breaks and collapse blank lines into
+                one paragraph break.
+
+Normalization is idempotent. Control characters go first, so removing them
+cannot form markup after the html stage has run. When a decoded entity is
+or completes markup, an entity or a control character ("&lt;b&gt;",
+"<b&gt;", "&amp;amp;", "&#8203;"), the control and html stages run again
+until none is produced.
+Both later stages only remove or rewrite whitespace and bullets, which can
+neither form markup nor expose another bullet.
+
+Run ``python -m src.utils.normalization [text file]`` to measure throughput
+on a large input and check idempotence on splices of it.
+"""
+
+import argparse
+import html
+import itertools
+import random
+import re
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config.settings import NORMALIZATION_CONFIG
+
+NORMALIZATION_STAGES = ("control", "html", "bullets", "whitespace")
+
+# Horizontal whitespace: every character str.split() splits on, except line breaks
+_H = r" \t\x1c-\x1f\x85\xa0\u1680\u2000-\u200a\u202f\u205f\u3000"
+_LINE_BREAKS = r"\r\n\u2028\u2029\x0b\x0c"
+_CONTROL = r"\x00-\x08\x0e-\x1f\x7f\xad\u200b-\u200d\u2060\ufeff"
+# Glyphs that stand for a bullet, including Symbol/Wingdings code points PDF extraction leaves behind
+_BULLET_GLYPHS = r"[•●○◦▪▫■□‣⁃∙·➢➤►▸▹✓✔❖\uf076\uf0a7\uf0b7\uf0d8\uf0fc]"
+_ENTITY = r"(?:[A-Za-z][A-Za-z0-9]{1,31}|#[0-9]{1,7}|#[xX][0-9A-Fa-f]{1,6});"
+_BLOCK_TAGS = (
+    "address|article|aside|blockquote|br|dd|div|dl|dt|footer|h[1-6]|header|hr|ol|p|pre|section|table|tr|ul"
+)
+_INLINE_TAGS = (
+    "a|abbr|b|body|code|em|font|head|html|i|img|label|link|meta|small|span|strong|sub|sup|"
+    "tbody|td|tfoot|th|thead|title|u"
+)
+
+_CONTROL_CHARS = re.compile(f"[{_CONTROL}]+")
+_PAGE_BREAKS = re.compile(r"[\x0b\x0c]")
+_TAGS = re.compile(
+    r"<(?:(?P<dropped>(?is:(?P<raw>script|style)\b[^>]*>.*?</(?P=raw)\s*>|!--.*?-->))"
+    r"|(?P<list_item>(?i:li\b[^<>]*>))"
+    rf"|(?P<block_tag>(?i:/?(?:{_BLOCK_TAGS})\b[^<>]*>))"
+    rf"|(?P<inline_tag>(?i:/li\b[^<>]*>|/?(?:{_INLINE_TAGS})\b[^<>]*>)))"
+)
+_ENTITIES = re.compile(f"&{_ENTITY}")
+# Decoded characters the control stage would rewrite on another run
+_REACTIVE_CONTROL = re.compile(f"[{_CONTROL}\x0b\x0c]")
+# ASCII bullets only count when followed by a space ("*bold*" is not a bullet)
+_BULLET = rf"[{_H}]*(?:{_BULLET_GLYPHS}[{_H}]*|[*\-][{_H}]+)"
+_BULLET_LINE = re.compile(f"([{_LINE_BREAKS}]){_BULLET}")
+_BULLET_START = re.compile(_BULLET)
+_OTHER_LINE_BREAKS = re.compile(r"[\u2028\u2029\x0b\x0c]")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def _control(text: str) -> str:
+    if "\x0b" in text or "\x0c" in text:
+        text = _PAGE_BREAKS.sub("\n", text)
+    return _CONTROL_CHARS.sub("", text)
+
+
+def _whitespace(text: str) -> str:
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _OTHER_LINE_BREAKS.sub("\n", text)
+    # str.split() collapses every run of whitespace and drops it at both ends of the line
+    text = "\n".join([" ".join(line.split()) for line in text.split("\n")])
+    return _BLANK_LINES.sub("\n\n", text) if "\n\n\n" in text else text
+
+
+class TextNormalizer:
+    """Normalize text with the selected stages, one precompiled pass per stage."""
+
+    def __init__(self, stages: Optional[Iterable[str]] = None, bullet: Optional[str] = None):
+        """
+        Initialize the normalizer.
+
+        Args:
+            stages (Optional[Iterable[str]]): Subset of NORMALIZATION_STAGES,
+                defaults to NORMALIZATION_CONFIG; they always run in the
+                order of NORMALIZATION_STAGES
+            bullet (Optional[str]): Replacement for bullet glyphs, defaults to NORMALIZATION_CONFIG
+        """
+        stages = tuple(NORMALIZATION_CONFIG["stages"] if stages is None else stages)
+        unknown = set(stages) - set(NORMALIZATION_STAGES)
+        if unknown:
+            raise ValueError(
+                f"Unknown normalization stages: {', '.join(sorted(unknown))} "
+                f"(expected some of {', '.join(NORMALIZATION_STAGES)})"
+            )
+        self.stages = tuple(stage for stage in NORMALIZATION_STAGES if stage in stages)
+        self.bullet = NORMALIZATION_CONFIG["bullet"] if bullet is None else bullet
+        self._tag_replacements = {"dropped": "", "list_item": "\n" + self.bullet, "block_tag": "\n", "inline_tag": ""}
+        # Substitution template; a backslash in the bullet is literal
+        self._bullet_template = r"\1" + self.bullet.replace("\\", "\\\\")
+
+    def _html(self, text: str) -> Tuple[str, bool]:
+        """Strip tags and decode entities; also returns whether the result needs another run."""
+        removed = 1
+        while removed:
+            # Removing "<b>" from "<<b>b>" forms a new tag
+            text, removed = _TAGS.subn(lambda match: self._tag_replacements[match.lastgroup], text)
+        decoded_any = decoded_control = False
+
+        def decode(match: re.Match) -> str:
+            nonlocal decoded_any, decoded_control
+            decoded = html.unescape(match.group())
+            if decoded != match.group():
+                decoded_any = True
+                decoded_control = decoded_control or _REACTIVE_CONTROL.search(decoded) is not None
+            return decoded
+
+        text = _ENTITIES.sub(decode, text)
+        # Any decoded character can complete markup around it ("<A&gt;", "&am&#112;;"), but
+        # rarely does ("&amp;" in plain text); look before running again
+        again = decoded_control or (decoded_any and (
+            _TAGS.search(text) is not None or _ENTITIES.search(text) is not None
+        ))
+        return text, again
+
+    def _bullets(self, text: str) -> str:
+        text = _BULLET_LINE.sub(self._bullet_template, text)
+        first = _BULLET_START.match(text)
+        if first is not None:
+            text = self.bullet + text[first.end():]
+        return text
+
+    def normalize(self, text: str) -> str:
+        """
+        Normalize text.
+
+        normalize(normalize(text)) == normalize(text) for any text.
+
+        Args:
+            text (str): Raw text (extracted, pasted or HTML)
+
+        Returns:
+            str: Normalized text, stripped at both ends
+        """
+        if not text:
+            return ""
+        control = "control" in self.stages
+        if "html" in self.stages:
+            again = True
+            while again:
+                # Rare after the first run: a decoded entity was markup or a control character
+                if control:
+                    text = _control(text)
+                text, again = self._html(text)
+        elif control:
+            text = _control(text)
+        if "bullets" in self.stages:
+            text = self._bullets(text)
+        if "whitespace" in self.stages:
+            text = _whitespace(text)
+        return text.strip()
+
+
+# Normalizers by stage set and bullet, created once per process
+_normalizers: Dict[Tuple[Optional[Tuple[str, ...]], Optional[str]], TextNormalizer] = {}
+
+def get_normalizer(stages: Optional[Iterable[str]] = None, bullet: Optional[str] = None) -> TextNormalizer:
+    """Get the shared normalizer for a stage set, creating it on first use."""
+    key = (tuple(stages) if stages is not None else None, bullet)
+    normalizer = _normalizers.get(key)
+    if normalizer is None:
+        normalizer = _normalizers[key] = TextNormalizer(stages, bullet)
+    return normalizer
+
+
+def normalize_text(text: str, stages: Optional[Iterable[str]] = None) -> str:
+    """
+    Normalize text, keeping line and paragraph breaks.
+
+    Args:
+        text (str): Raw text
+        stages (Optional[Iterable[str]]): Subset of NORMALIZATION_STAGES,
+            defaults to NORMALIZATION_CONFIG
+
+    Returns:
+        str: Normalized text
+    """
+    return get_normalizer(stages).normalize(text)
+
+
+_SAMPLE = (
+    "<div class=\"resume\"><h2>Experience</h2>\r\n"
+    "Senior Engineer &amp; Team Lead \t\t Acme&nbsp;Corp\r\n"
+    "Jan 2019 –  Present\r\n"
+    "\uf0b7   Built   the ingestion   pipeline\u200b for 40M documents\r\n"
+    "  •  Cut p99 latency by 35% <b>across</b> services\x0c\r\n"
+    "\r\n   \r\n\r\n"
+    "<ul><li>Mentored 6 engineers</li><li>Python, Go, SQL</li></ul>\r\n"
+    "Plain prose with ordinary single spaces makes up most of a real resume, and each "
+    "stage copies it in C without calling back into Python for every word.\r\n</div>\r\n"
+)
+
+
+def benchmark(text: str, repeat: int = 3) -> List[Tuple[str, float]]:
+    """
+    Measure normalization throughput of each stage and of all stages.
+
+    Args:
+        text (str): Input text
+        repeat (int): Runs per measurement; the fastest is reported
+
+    Returns:
+        List[Tuple[str, float]]: (label, MB/s) per measurement
+    """
+    def best_of(normalize) -> float:
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            normalize(text)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return len(text) / best / 1e6
+
+    results = [(stage, best_of(TextNormalizer((stage,)).normalize)) for stage in NORMALIZATION_STAGES]
+    results.append(("all stages", best_of(TextNormalizer(NORMALIZATION_STAGES).normalize)))
+    return results
+
+
+# Fragments spliced into idempotence checks, besides pieces of the checked text
+_CHECK_PIECES = (
+    " ", "  ", "\t", "\xa0", "\u2003", "\x85", "\x1f", "\n", "\r\n", "\r", "\n\n", "\x0b", "\x0c", "\u2028",
+    "\x00", "\xad", "\u200b", "&nbsp;", "&amp;", "&lt;", "&gt;", "&#32;", "&#10;", "&#12;", "&bull;", "&shy;",
+    "&#45;", "&#59;", "&#98;", "<br>", "<p>", "</p>", "<b>", "</b>", "<li>", "<ul>", "</li>", "<!-- x -->", "<script>x</script>",
+    "•", "\uf0b7", "·", "- ", "* ", "-", "*", "<", ">", "&", ";", "amp;", "&am", "lt;", "b>", "<A", "A", "word",
+)
+
+
+def check_idempotent(text: str, cases: int = 1000, seed: int = 0) -> List[Tuple[Tuple[str, ...], str]]:
+    """
+    Check normalize(normalize(x)) == normalize(x) for every stage combination.
+
+    Inputs are text itself and random splices of its pieces (tags, entities,
+    whitespace runs, words) with markup, control and bullet fragments.
+
+    Args:
+        text (str): Text to take pieces from
+        cases (int): Random splices per stage combination
+        seed (int): Random seed
+
+    Returns:
+        List[Tuple[Tuple[str, ...], str]]: (stages, input) for each failure
+    """
+    rng = random.Random(seed)
+    pieces = list(dict.fromkeys(re.findall(r"<[^<>]*>|&#?\w+;|\s+|[^\s<&]+|[<&]", text[:100000])))
+    pieces += _CHECK_PIECES
+    failures = []
+    for size in range(1, len(NORMALIZATION_STAGES) + 1):
+        for stages in itertools.combinations(NORMALIZATION_STAGES, size):
+            normalizer = TextNormalizer(stages)
+            samples = [text[:100000]] + [
+                "".join(rng.choice(pieces) for _ in range(rng.randint(1, 24))) for _ in range(cases)
+            ]
+            for sample in samples:
+                once = normalizer.normalize(sample)
+                if normalizer.normalize(once) != once:
+                    failures.append((stages, sample))
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure text normalization throughput")
+    parser.add_argument("file", nargs="?", help="UTF-8 text file to repeat up to --size (default: built-in sample)")
+    parser.add_argument("--size", type=float, default=8.0, help="Input size in MB")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--cases", type=int, default=1000,
+                        help="Random inputs per stage combination for the idempotence check")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            sample = f.read()
+    else:
+        sample = _SAMPLE
+    text = sample * max(1, int(args.size * 1e6 / max(len(sample), 1)))
+    print(f"{len(text) / 1e6:.1f} MB input")
+    for label, throughput in benchmark(text, args.repeat):
+        print(f"{label:32s} {throughput:7.1f} MB/s")
+
+    failures = check_idempotent(sample, args.cases)
+    if failures:
+        print(f"normalize(normalize(x)) != normalize(x) for {len(failures)} inputs, for example:")
+        for stages, failed in failures[:5]:
+            print(f"  {','.join(stages)}: {failed!r}")
+        return 1
+    print(f"idempotence: {args.cases} random inputs per stage combination, all passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,17 @@ Input validation utilities.
 from typing import Tuple
 import re
 from ..config.settings import VALIDATION_RULES
+from .normalization import get_normalizer
+
+# Markup sanitize_text removes: script/style blocks with their content, comments, any tag
+# (one left unclosed at the end too). Block-level tags become line breaks.
+_SCRIPT_BLOCK = re.compile(r'<(script|style)\b.*?(?:</\1\s*>|\Z)|<!--.*?(?:-->|\Z)', re.DOTALL | re.IGNORECASE)
+_BLOCK_TAG = re.compile(r'</?(?:br|p|div|li|ul|ol|tr|table|h[1-6]|hr|section|article|header|footer)\b[^>]*>',
+                        re.IGNORECASE)
+_TAG = re.compile(r'<[A-Za-z!/?][^>]*>|<[A-Za-z!/?][^<>]*\Z')
+# Fixed stages, so sanitizing never depends on TEXT_NORMALIZATION_STAGES;
+# "html" is left out because it decodes entities such as &lt;script&gt; into markup
+_SANITIZE_STAGES = ("control", "bullets", "whitespace")
 
 def validate_inputs(resume: str, job_description: str) -> Tuple[bool, str]:
     """
@@ -94,7 +105,10 @@ def validate_url(url: str) -> bool:
 
 def sanitize_text(text: str) -> str:
     """
-    Sanitize text input by removing potentially harmful content.
+    Sanitize text input by removing markup, control characters and excess whitespace.
+    
+    Every tag is removed and entities are left encoded. Line and paragraph
+    breaks are kept.
     
     Args:
         text (str): Text to sanitize
@@ -104,17 +118,16 @@ def sanitize_text(text: str) -> str:
     """
     if not text:
         return ""
-    
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Remove script tags and content
-    text = re.sub(r'<script.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    normalizer = get_normalizer(_SANITIZE_STAGES, "- ")
+    # Control characters go first so "<scr\x00ipt>" cannot turn into a tag afterwards
+    text = normalizer.normalize(text)
+    removed = 1
+    while removed:
+        # Repeat until nothing is left: removing "<b>" from "<<b>script>" makes a new tag
+        text = _SCRIPT_BLOCK.sub('', text)
+        text = _BLOCK_TAG.sub('\n', text)
+        text, removed = _TAG.subn('', text)
+    return normalizer.normalize(text)
 
 def validate_file_content(content: str, content_type: str) -> Tuple[bool, str]:
     """
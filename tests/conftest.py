@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from src.core.stub_server import serve
+
+# Instant responses, so tests measure the client and not simulated latency
+FAST_STUB = {
+    "latency_distribution": "fixed",
+    "latency_median_ms": 0,
+    "tokens_per_second": 1e6,
+    "error_rate": 0.0,
+}
+
+
+@pytest.fixture
+def stub_server():
+    """Start stub servers on free ports; call with config overrides, get the base URL."""
+    servers = []
+
+    def start(**config):
+        server = serve("127.0.0.1", 0, dict(FAST_STUB, **config))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from src.service.match_score import MatchScore, MatchScoreError, parse_match_score
+
+VALID = {
+    "overall_score": 7,
+    "skills_match": 80,
+    "experience_match": 65.5,
+    "education_match": 90,
+    "strengths": ["Python", "APIs"],
+    "gaps": ["Kubernetes"],
+}
+
+
+def test_valid_json():
+    score = parse_match_score(json.dumps(VALID))
+    assert score == MatchScore(7, 80.0, 65.5, 90.0, ["Python", "APIs"], ["Kubernetes"])
+
+
+def test_code_fence_and_prose_are_tolerated():
+    raw = "Here is the score:\n```json\n" + json.dumps(VALID) + "\n```\nLet me know if you need more."
+    assert parse_match_score(raw).overall_score == 7
+
+
+def test_numbers_given_as_strings_are_repaired():
+    data = dict(VALID, overall_score="7/10", skills_match="80%", experience_match=" 65.5 ")
+    score = parse_match_score(json.dumps(data))
+    assert (score.overall_score, score.skills_match, score.experience_match) == (7, 80.0, 65.5)
+
+
+def test_overall_score_is_rounded():
+    assert parse_match_score(json.dumps(dict(VALID, overall_score=6.6))).overall_score == 7
+
+
+def test_lists_are_cleaned():
+    data = dict(VALID, strengths="Python", gaps=["  Go ", "", "   "])
+    score = parse_match_score(json.dumps(data))
+    assert score.strengths == ["Python"]
+    assert score.gaps == ["Go"]
+
+
+def test_missing_lists_default_to_empty():
+    data = {k: v for k, v in VALID.items() if k not in ("strengths", "gaps")}
+    score = parse_match_score(json.dumps(data))
+    assert score.strengths == [] and score.gaps == []
+
+
+@pytest.mark.parametrize("raw, message", [
+    ("", "empty response"),
+    ("no json here", "no JSON object found"),
+    ("{overall_score: 7}", "invalid JSON"),
+    ("[1, 2, 3]", "expected a JSON object"),
+    (json.dumps(dict(VALID, overall_score=11)), "'overall_score' must be between 1 and 10"),
+    (json.dumps(dict(VALID, skills_match=-5)), "'skills_match' must be between 0 and 100"),
+    (json.dumps(dict(VALID, education_match=True)), "'education_match' must be a number"),
+    (json.dumps(dict(VALID, experience_match="n/a")), "'experience_match' must be a number"),
+    (json.dumps({k: v for k, v in VALID.items() if k != "skills_match"}), "'skills_match' must be a number"),
+    (json.dumps(dict(VALID, gaps={"a": 1})), "'gaps' must be a list of strings"),
+])
+def test_invalid_output_is_rejected(raw, message):
+    with pytest.raises(MatchScoreError, match=message):
+        parse_match_score(raw)
+
+
+def test_error_is_a_value_error():
+    assert issubclass(MatchScoreError, ValueError)
@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+
+from src.utils.normalization import (
+    _SAMPLE, NORMALIZATION_STAGES, TextNormalizer, check_idempotent, normalize_text,
+)
+
+ALL_STAGE_SETS = [
+    stages
+    for size in range(1, len(NORMALIZATION_STAGES) + 1)
+    for stages in itertools.combinations(NORMALIZATION_STAGES, size)
+]
+
+# Inputs where one pass used to leave work for a second one
+TRICKY = [
+    "<A&gt;",
+    "<<b>b>bold",
+    "&am&#112;;lt;",
+    "&#60;p&#62;paragraph",
+    "line&#12;next",
+    "x&shy;y",
+    "• &bull; item",
+    "<li>&#8226; item</li>",
+    "a \r\n\r\n\r\n b c",
+    "&lt;script&gt;alert(1)&lt;/script&gt;",
+]
+
+
+def test_full_normalization():
+    text = normalize_text(_SAMPLE)
+    assert text.startswith("Experience\n\nSenior Engineer & Team Lead Acme Corp\nJan 2019 – Present\n")
+    assert "- Built the ingestion pipeline for 40M documents" in text
+    assert "- Cut p99 latency by 35% across services" in text
+    assert "- Mentored 6 engineers\n- Python, Go, SQL" in text
+    assert "\r" not in text and "\u200b" not in text and "\n\n\n" not in text
+
+
+def test_stages_always_run_in_canonical_order():
+    normalizer = TextNormalizer(["whitespace", "html", "control"])
+    assert normalizer.stages == ("control", "html", "whitespace")
+
+
+def test_unknown_stage_is_rejected():
+    with pytest.raises(ValueError, match="Unknown normalization stages: spelling"):
+        TextNormalizer(["html", "spelling"])
+
+
+def test_ascii_bullets_need_a_space():
+    normalizer = TextNormalizer(["bullets"])
+    assert normalizer.normalize("* one\n*bold* two\n- three") == "- one\n*bold* two\n- three"
+
+
+def test_custom_bullet_is_literal():
+    assert TextNormalizer(["bullets"], bullet="\\1 ").normalize("• item") == "\\1 item"
+
+
+def test_empty_text():
+    assert normalize_text("") == ""
+
+
+@pytest.mark.parametrize("stages", ALL_STAGE_SETS, ids="+".join)
+@pytest.mark.parametrize("text", TRICKY)
+def test_tricky_inputs_are_idempotent(stages, text):
+    normalizer = TextNormalizer(stages)
+    once = normalizer.normalize(text)
+    assert normalizer.normalize(once) == once
+
+
+def test_random_splices_are_idempotent():
+    for seed in range(3):
+        assert check_idempotent(_SAMPLE, cases=300, seed=seed) == []
@@ -0,0 +1,86 @@
+from src.core.prompt_builder import TRUNCATION_MARKER, estimate_tokens, fit_to_budget
+
+RESUME = """Jane Doe
+
+Experience
+
+Senior Engineer
+2020 - Present
+- Led the migration of the billing platform to event sourcing across four teams
+- Cut p99 checkout latency from 900ms to 250ms
+
+Engineer
+2015 - 2019
+- Built the internal metrics pipeline processing two billion events a day
+- Mentored six new hires through their first year
+
+Intern
+2010 - 2012
+- Wrote integration tests for the payments service and its partner APIs
+- Maintained the on-call runbook for the support tooling
+
+Education
+
+BSc Computer Science
+State University, 2010
+"""
+
+JOB = """We are hiring a backend engineer to own our order service.
+You will design APIs and run them in production.
+We are an equal opportunity employer and all qualified applicants will be considered.
+Click apply to send us your resume.
+You will design APIs and run them in production."""
+
+
+def test_text_within_budget_is_untouched():
+    text, report = fit_to_budget(RESUME, estimate_tokens(RESUME))
+    assert text == RESUME
+    assert report.stages == []
+    assert not report.trimmed
+
+
+def test_whitespace_runs_first_and_stops_once_it_fits():
+    padded = RESUME.replace("\n\n", "\n\n\n\n").replace(" - ", "    -    ")
+    text, report = fit_to_budget(padded, estimate_tokens(RESUME))
+    assert report.stages == ["whitespace"]
+    assert "Intern" in text
+    assert report.tokens_after <= report.budget
+
+
+def test_boilerplate_is_dropped_before_truncating():
+    budget = estimate_tokens(JOB) - 20
+    text, report = fit_to_budget(JOB, budget)
+    assert report.stages == ["boilerplate"]
+    assert "equal opportunity" not in text
+    assert "Click apply" not in text
+    # Repeated lines are dropped too, the first copy is kept
+    assert text.count("You will design APIs") == 1
+    assert not text.endswith(TRUNCATION_MARKER)
+
+
+def test_older_experience_is_dropped_oldest_first():
+    intern = RESUME.index("Intern")
+    budget = estimate_tokens(RESUME) - estimate_tokens(RESUME[intern:RESUME.index("Education")]) + 2
+    text, report = fit_to_budget(RESUME, budget, allow_drop_experience=True)
+    assert "older_experience" in report.stages
+    assert "truncate" not in report.stages
+    assert "Intern" not in text
+    assert "Engineer\n2015 - 2019" in text
+    assert "BSc Computer Science" in text
+
+
+def test_older_experience_needs_opt_in():
+    budget = estimate_tokens(RESUME) - 40
+    text, report = fit_to_budget(RESUME, budget)
+    assert "older_experience" not in report.stages
+    assert report.stages[-1] == "truncate"
+    assert text.endswith(TRUNCATION_MARKER)
+
+
+def test_stages_run_in_order_and_truncation_is_last_resort():
+    padded = "\n\n\n".join([JOB, RESUME.replace("\n", "  \n")])
+    text, report = fit_to_budget(padded, 40, allow_drop_experience=True)
+    assert report.stages == ["whitespace", "boilerplate", "older_experience", "truncate"]
+    assert text.endswith(TRUNCATION_MARKER)
+    assert report.tokens_after <= 40
+    assert report.tokens_before == estimate_tokens(padded)
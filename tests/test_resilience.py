@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.backends import BackendHTTPError, HttpStubBackend
+from src.core.resilience import CircuitOpenError, ResiliencePolicy, retry_after_seconds
+
+
+def make_policy(**overrides):
+    config = {
+        "max_attempts": 3,
+        "base_delay": 0.01,
+        "max_delay": 0.05,
+        "max_retry_after": 60.0,
+        "requests_per_minute": 6000,
+        "burst": 100,
+        "failure_threshold": 10,
+        "recovery_timeout": 30.0,
+    }
+    config.update(overrides)
+    return ResiliencePolicy(config)
+
+
+def generate(url):
+    backend = HttpStubBackend("test", url)
+    return lambda: backend.generate("hello", {"max_output_tokens": 5})
+
+
+def test_success_needs_one_attempt(stub_server):
+    policy = make_policy()
+    response = asyncio.run(policy.call(generate(stub_server())))
+    assert response.text
+    assert policy.stats()["attempts"] == 1
+    assert policy.stats()["breaker_state"] == "closed"
+
+
+def test_retries_honor_retry_after(stub_server):
+    policy = make_policy(max_attempts=2)
+    started = time.monotonic()
+    with pytest.raises(BackendHTTPError) as excinfo:
+        asyncio.run(policy.call(generate(stub_server(error_rate=1.0))))
+    assert excinfo.value.code == 503
+    assert retry_after_seconds(excinfo.value) == 1.0
+    stats = policy.stats()
+    assert stats["attempts"] == 2
+    assert stats["retries"] == 1
+    # The server asked for 1s, far above the jittered backoff
+    assert stats["retry_wait_seconds"] >= 1.0
+    assert time.monotonic() - started >= 1.0
+
+
+def test_no_retry_past_the_deadline(stub_server):
+    policy = make_policy(max_attempts=5)
+    started = time.monotonic()
+    with pytest.raises(BackendHTTPError):
+        asyncio.run(policy.call(generate(stub_server(error_rate=1.0)), timeout=0.5))
+    # Waiting out Retry-After would end past the deadline, so the first error is raised
+    assert policy.stats()["attempts"] == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_retry_after_above_limit_is_not_retried(stub_server):
+    policy = make_policy(max_retry_after=0.5)
+    with pytest.raises(BackendHTTPError):
+        asyncio.run(policy.call(generate(stub_server(error_rate=1.0))))
+    assert policy.stats()["attempts"] == 1
+
+
+def test_non_retryable_error_is_raised_at_once():
+    policy = make_policy()
+
+    async def fail():
+        raise BackendHTTPError(400, "bad request")
+
+    with pytest.raises(BackendHTTPError):
+        asyncio.run(policy.call(fail))
+    stats = policy.stats()
+    assert stats["attempts"] == 1
+    assert stats["consecutive_failures"] == 0
+
+
+def test_breaker_opens_and_stops_retrying(stub_server):
+    policy = make_policy(max_attempts=5, failure_threshold=2, max_retry_after=0.5)
+    fn = generate(stub_server(error_rate=1.0))
+
+    async def scenario():
+        # Retry-After is above max_retry_after, so each call makes one attempt
+        for _ in range(2):
+            with pytest.raises(BackendHTTPError):
+                await policy.call(fn)
+        with pytest.raises(CircuitOpenError):
+            await policy.call(fn)
+
+    asyncio.run(scenario())
+    stats = policy.stats()
+    assert stats["attempts"] == 2
+    assert stats["breaker_state"] == "open"
+    assert stats["breaker_opens"] == 1
+    assert stats["breaker_rejections"] == 1
+
+
+def test_open_breaker_ends_the_retry_loop(stub_server):
+    policy = make_policy(max_attempts=5, failure_threshold=2, max_retry_after=60.0)
+    with pytest.raises(BackendHTTPError):
+        asyncio.run(policy.call(generate(stub_server(error_rate=1.0))))
+    # The second failure opened the circuit; a third attempt would only be rejected
+    stats = policy.stats()
+    assert stats["attempts"] == 2
+    assert stats["breaker_rejections"] == 0
+
+
+def test_half_open_trial_closes_the_breaker(stub_server):
+    policy = make_policy(failure_threshold=1, recovery_timeout=0.05, max_retry_after=0.5)
+    failing = generate(stub_server(error_rate=1.0))
+    healthy = generate(stub_server())
+
+    async def scenario():
+        with pytest.raises(BackendHTTPError):
+            await policy.call(failing)
+        assert policy.breaker.is_open
+        await asyncio.sleep(0.06)
+        return await policy.call(healthy)
+
+    assert asyncio.run(scenario()).text
+    assert policy.stats()["breaker_state"] == "closed"
@@ -0,0 +1,126 @@
+import numpy as np
+
+from src.core.similarity import LSHIndex, MinHasher, NearDuplicateIndex
+
+CONFIG = {
+    "enabled": True,
+    "threshold": 0.85,
+    "num_perm": 128,
+    "bands": 16,
+    "shingle_size": 3,
+    "max_entries": 1000,
+    "max_entries_per_resume": 100,
+    "max_chars": 1_000_000,
+}
+
+RESUME = "Jane Doe\nSenior backend engineer, Python and Go, eight years in payments."
+
+JOB = (
+    "Acme is hiring a senior backend engineer to build and operate the services behind our checkout. "
+    "You will design APIs in Python and Go, own their reliability in production, review code, "
+    "mentor engineers on the team and work with product managers on the roadmap. We need 5+ years of "
+    "experience with distributed systems, relational databases and message queues. The salary is "
+    "$150,000 plus equity, with remote work across Europe and a yearly learning budget. "
+    "Apply at https://acme.example/jobs/123 before 2024-06-30."
+)
+# Same posting, different link and date: shingles on both are ignored
+JOB_REPOSTED = JOB.replace("jobs/123", "jobs/456").replace("2024-06-30", "2024-07-31")
+JOB_OTHER = (
+    "Globex is looking for a data analyst to join the marketing team. You will build dashboards, "
+    "clean data from our CRM, run experiments and present findings to stakeholders every week. "
+    "Experience with SQL and spreadsheets required."
+)
+
+
+def test_reposted_job_is_a_hit():
+    index = NearDuplicateIndex(CONFIG)
+    index.add(RESUME, JOB)
+    match = index.find(RESUME, JOB_REPOSTED)
+    assert match is not None
+    text, similarity = match
+    assert text == JOB
+    assert similarity >= CONFIG["threshold"]
+    assert index.stats()["hits"] == 1
+
+
+def test_different_job_is_a_miss():
+    index = NearDuplicateIndex(CONFIG)
+    index.add(RESUME, JOB)
+    assert index.find(RESUME, JOB_OTHER) is None
+    assert index.stats()["hits"] == 0
+
+
+def test_exact_repeat_is_left_to_the_caches():
+    index = NearDuplicateIndex(CONFIG)
+    index.add(RESUME, JOB)
+    assert index.find(RESUME, JOB) is None
+
+
+def test_other_resume_is_a_miss():
+    index = NearDuplicateIndex(CONFIG)
+    index.add(RESUME, JOB)
+    assert index.find("John Roe\nData analyst.", JOB_REPOSTED) is None
+
+
+def test_changed_salary_falls_through_to_the_next_match():
+    index = NearDuplicateIndex(CONFIG)
+    other_salary = JOB.replace("$150,000", "$190,000")
+    index.add(RESUME, other_salary)
+    # The repost with a different salary is skipped even if it is the closest match
+    assert index.find(RESUME, JOB_REPOSTED) is None
+    index.add(RESUME, JOB)
+    text, _ = index.find(RESUME, JOB_REPOSTED)
+    assert text == JOB
+
+
+def test_disabled_index_never_matches():
+    index = NearDuplicateIndex(dict(CONFIG, enabled=False))
+    index.add(RESUME, JOB)
+    assert index.find(RESUME, JOB_REPOSTED) is None
+    assert index.entries == 0
+
+
+def test_per_resume_cap_evicts_least_recently_used():
+    index = NearDuplicateIndex(dict(CONFIG, max_entries_per_resume=2))
+    index.add(RESUME, JOB)
+    index.add(RESUME, JOB_OTHER)
+    # Using JOB makes JOB_OTHER the least recently used
+    assert index.find(RESUME, JOB_REPOSTED) is not None
+    index.add(RESUME, "A third, unrelated posting for a warehouse supervisor on night shifts.")
+    assert index.entries == 2
+    assert index.stats()["evictions"] == 1
+    assert index.find(RESUME, JOB_REPOSTED) is not None
+
+
+def test_lsh_remove_keeps_the_other_entries_queryable():
+    hasher = MinHasher(num_perm=64)
+    index = LSHIndex(64, 16)
+    texts = [JOB, JOB_OTHER, "Night shift warehouse supervisor, forklift license required."]
+    for i, text in enumerate(texts):
+        index.add(str(i), hasher.signature(text), text)
+    # Removing the first entry moves the last one into its position
+    index.remove("0")
+    assert index.keys == ["2", "1"]
+    assert index.chars == len(texts[1]) + len(texts[2])
+    for i in (1, 2):
+        key, text, similarity = index.query(hasher.signature(texts[i]))[0]
+        assert (key, text, similarity) == (str(i), texts[i], 1.0)
+    assert index.query(hasher.signature(JOB), threshold=0.5) == []
+
+
+def test_lsh_query_orders_by_similarity():
+    hasher = MinHasher()
+    index = LSHIndex(128, 16)
+    edited = JOB.replace("review code, ", "")
+    index.add("edited", hasher.signature(edited), edited)
+    index.add("exact", hasher.signature(JOB), JOB)
+    matches = index.query(hasher.signature(JOB))
+    assert [key for key, _, _ in matches] == ["exact", "edited"]
+    assert matches[0][2] == 1.0 > matches[1][2]
+
+
+def test_signature_is_deterministic():
+    first = MinHasher().signature(JOB)
+    second = MinHasher().signature(JOB)
+    assert first.dtype == np.uint32
+    assert np.array_equal(first, second)
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from src.core.singleflight import SingleFlight
+
+
+def counting_call(calls, result, delay=0.01):
+    async def fn():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return fn
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", counting_call(calls, "answer")) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["answer"] * 5
+    assert calls == ["answer"]
+    assert flight.stats() == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.do("a", counting_call(calls, "a")),
+            flight.do("b", counting_call(calls, "b")),
+        )
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_finished_call_is_not_reused():
+    flight = SingleFlight()
+    calls = []
+
+    async def scenario():
+        await flight.do("key", counting_call(calls, 1))
+        await flight.do("key", counting_call(calls, 2))
+
+    asyncio.run(scenario())
+    assert calls == [1, 2]
+    assert flight.stats()["leaders"] == 2
+
+
+def test_error_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.in_flight == 0
+
+
+def test_shared_call_survives_one_cancelled_caller():
+    flight = SingleFlight()
+    calls = []
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("key", counting_call(calls, "answer", delay=0.05)))
+        second = asyncio.ensure_future(flight.do("key", counting_call(calls, "answer")))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "answer"
+    assert calls == ["answer"]
+
+
+def test_shared_call_is_cancelled_with_its_last_caller():
+    flight = SingleFlight()
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def scenario():
+        callers = [asyncio.ensure_future(flight.do("key", slow)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.06)
+
+    asyncio.run(scenario())
+    assert finished == []
+    assert flight.in_flight == 0
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import pytest
+
+from src.core.backends import BackendHTTPError, HttpStubBackend, StubModel
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def collect(stream):
+    return "".join([chunk async for chunk in await stream])
+
+
+def test_generate_is_deterministic(stub_server):
+    backend = HttpStubBackend("test", stub_server())
+    first = run(backend.generate("same prompt", {}))
+    second = run(backend.generate("same prompt", {}))
+    other = run(backend.generate("other prompt", {}))
+    assert first.text == second.text
+    assert first.text != other.text
+    assert first.usage["output_tokens"] == StubModel().config["output_tokens"]
+
+
+def test_stream_matches_generate(stub_server):
+    backend = HttpStubBackend("test", stub_server(chunk_tokens=4))
+    config = {"max_output_tokens": 20}
+    text = run(backend.generate("prompt", config)).text
+    assert run(collect(backend.open_stream("prompt", config))) == text
+
+
+def test_response_schema_yields_json(stub_server):
+    backend = HttpStubBackend("test", stub_server())
+    schema = {
+        "type": "object",
+        "properties": {
+            "overall_score": {"type": "integer", "minimum": 1, "maximum": 10},
+            "strengths": {"type": "array", "items": {"type": "string"}},
+        },
+    }
+    data = json.loads(run(backend.generate("prompt", {"response_schema": schema})).text)
+    assert 1 <= data["overall_score"] <= 10
+    assert len(data["strengths"]) == 3
+
+
+def test_injected_failure_carries_retry_after(stub_server):
+    backend = HttpStubBackend("test", stub_server(error_rate=1.0))
+    with pytest.raises(BackendHTTPError) as excinfo:
+        run(backend.generate("prompt", {}))
+    assert excinfo.value.code == 503
+    assert excinfo.value.retry_after == 1.0
+
+
+def test_health_probe(stub_server):
+    backend = HttpStubBackend("test", stub_server(error_rate=1.0))
+    # Health checks are not subject to fault injection
+    assert run(backend.health_probe()) == {"status": "ok", "model": "stub/test"}
+
+
+def test_unknown_path_is_not_found(stub_server):
+    backend = HttpStubBackend("test", stub_server())
+    with pytest.raises(BackendHTTPError) as excinfo:
+        run(backend._request("/missing", {}))
+    assert excinfo.value.code == 404